@@ -0,0 +1,12 @@
+"""
+Portfolio Benchmarks
+---------------------------
+Performance benchmarks for the content tools and the page, run against
+deterministic synthetic portfolios (see synth.py).
+
+Usage:
+    python -m benchmarks                                  # Run all, print results
+    python -m benchmarks --out results.json               # Save results
+    python -m benchmarks --baseline baseline.json         # Fail on regressions
+    python -m benchmarks --projects 2000 --skills 50 --only cli,render
+"""
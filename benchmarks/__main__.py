@@ -0,0 +1,76 @@
+"""Command-line entry point: python -m benchmarks"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+
+from . import bench_cli, bench_gui, bench_render, synth
+from .harness import Skip, compare, format_seconds, make_report
+
+SUITES = {
+    'cli': bench_cli,
+    'gui': bench_gui,
+    'render': bench_render,
+}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m benchmarks', description="Run the portfolio benchmarks")
+    parser.add_argument('--projects', type=int, default=500, help="Synthetic projects (default: 500)")
+    parser.add_argument('--skills', type=int, default=40, help="Synthetic skills (default: 40)")
+    parser.add_argument('--image-kb', type=int, default=64, help="Dummy thumbnail size in KB")
+    parser.add_argument('--video-kb', type=int, default=512, help="Dummy video size in KB")
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--repeat', type=int, default=7, help="Timed runs per benchmark")
+    parser.add_argument('--only', help=f"Comma-separated suites ({', '.join(SUITES)})")
+    parser.add_argument('--out', help="Write results JSON here")
+    parser.add_argument('--baseline', help="Compare against a previous results JSON")
+    parser.add_argument('--threshold', type=float, default=0.15,
+                        help="Allowed slowdown vs baseline as a fraction (default: 0.15)")
+    args = parser.parse_args(argv)
+
+    params = {'projects': args.projects, 'skills': args.skills, 'imageKb': args.image_kb,
+              'videoKb': args.video_kb, 'seed': args.seed, 'repeat': args.repeat}
+    suites = args.only.split(',') if args.only else list(SUITES)
+
+    results = {}
+    with tempfile.TemporaryDirectory(prefix='portfolio-bench-') as site_root:
+        synth.write_site(site_root, args.projects, args.skills, args.image_kb, args.video_kb, args.seed)
+        for name in suites:
+            try:
+                results.update(SUITES[name].run(site_root, params))
+                print(f"✓ {name}")
+            except Skip as e:
+                print(f"⚠ {name} skipped: {e}")
+
+    report = make_report(results, params)
+    if args.out:
+        os.makedirs(os.path.dirname(os.path.abspath(args.out)), exist_ok=True)
+        with open(args.out, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"Results written to {args.out}")
+
+    if not args.baseline:
+        print()
+        for name, result in sorted(results.items()):
+            print(f"{name:<32} {format_seconds(result['median']):>12}  (min {format_seconds(result['min'])})")
+        return 0
+
+    with open(args.baseline, 'r', encoding='utf-8') as f:
+        baseline = json.load(f)
+    rows, regressions = compare(report, baseline, args.threshold)
+    print()
+    for name, median, base, change in rows:
+        change_text = f"{change:+.1%}" if change is not None else 'new'
+        flag = '  ✗ REGRESSION' if name in regressions else ''
+        print(f"{name:<32} {format_seconds(median):>12} {format_seconds(base):>12} {change_text:>8}{flag}")
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) above {args.threshold:.0%}")
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
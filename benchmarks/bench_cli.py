@@ -0,0 +1,43 @@
+"""
+Benchmarks for the CLI data path: load_data(), save_data() and backup_data(),
+on the JSON file and on the SQLite backend.
+"""
+
+import contextlib
+import io
+import os
+
+import content_manager
+import storage
+
+from .harness import measure
+
+
+def run(site_root, params):
+    data_file = os.path.join(site_root, 'data', 'portfolio-data.json')
+    content_manager.DATA_FILE = data_file
+    content_manager.BACKUP_DIR = os.path.join(site_root, 'data', 'backups')
+    content_manager.STORE = storage.open_store(data_file)
+    data = content_manager.load_data()
+    quiet = contextlib.redirect_stdout(io.StringIO())
+
+    results = {}
+    results['cli.load_data'] = measure(content_manager.load_data, repeat=params['repeat'])
+    with quiet:
+        # load() before each save so the version check takes the fast path
+        results['cli.save_data'] = measure(lambda: content_manager.save_data(data, create_backup=False),
+                                           repeat=params['repeat'], setup=content_manager.load_data)
+        results['cli.backup_data'] = measure(content_manager.backup_data, repeat=params['repeat'])
+
+    db_file = os.path.join(site_root, 'data', 'portfolio.db')
+    storage.migrate_json_to_sqlite(data_file, db_file)
+    content_manager.DATA_FILE = db_file
+    content_manager.STORE = storage.open_store(db_file)
+    data = content_manager.load_data()
+    results['cli.sqlite.load_data'] = measure(content_manager.load_data, repeat=params['repeat'])
+    data['projects'][0]['title'] += '!'
+    with quiet:
+        # After the first run this is the steady state of a one-field edit
+        results['cli.sqlite.save_data'] = measure(lambda: content_manager.save_data(data, create_backup=False),
+                                                  repeat=params['repeat'], setup=content_manager.load_data)
+    return results
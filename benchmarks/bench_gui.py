@@ -0,0 +1,37 @@
+"""
+Benchmarks for the PyQt manager: PortfolioApp construction and list refreshes,
+run headless on Qt's offscreen platform.
+"""
+
+import os
+
+from .harness import Skip, measure
+
+
+def run(site_root, params):
+    os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+    try:
+        from PyQt5.QtWidgets import QApplication
+    except ImportError:
+        raise Skip("PyQt5 is not installed")
+
+    import gui_app
+
+    data_file = os.path.join(site_root, 'data', 'portfolio-data.json')
+    gui_app.DATA_FILE = data_file
+    app = QApplication.instance() or QApplication([])
+
+    windows = []
+
+    def construct():
+        windows.append(gui_app.PortfolioApp())
+
+    results = {'gui.construct': measure(construct, repeat=params['repeat'])}
+    window = windows[-1]
+    results['gui.refresh_projects_list'] = measure(window.refresh_projects_list, repeat=params['repeat'])
+    results['gui.refresh_skills_list'] = measure(window.refresh_skills_list, repeat=params['repeat'])
+    for w in windows:
+        w.jobs.stop()
+        w.deleteLater()
+    app.processEvents()
+    return results
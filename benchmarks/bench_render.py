@@ -0,0 +1,28 @@
+"""
+Benchmark for page rendering: runs populateContent() from js/main.js under
+Node with a minimal DOM stand-in, timing the template work for the
+synthetic data. Layout and paint are not included.
+"""
+
+import json
+import os
+import shutil
+import subprocess
+
+from .harness import Skip
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+MAIN_JS = os.path.join(os.path.dirname(HERE), 'js', 'main.js')
+
+
+def run(site_root, params):
+    node = shutil.which('node')
+    if not node:
+        raise Skip("node is not installed")
+    data_file = os.path.join(site_root, 'data', 'portfolio-data.json')
+    result = subprocess.run(
+        [node, os.path.join(HERE, 'render_bench.js'), MAIN_JS, data_file, str(params['repeat'])],
+        capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip())
+    return {f'render.{name}': stats for name, stats in json.loads(result.stdout).items()}
@@ -0,0 +1,79 @@
+"""
+Timing, result files and baseline comparison for the benchmarks.
+"""
+
+import platform
+import statistics
+import sys
+import time
+from datetime import datetime
+
+
+class Skip(Exception):
+    """A benchmark cannot run here (missing optional dependency)"""
+
+
+def measure(fn, repeat=7, warmup=1, setup=None):
+    """Time fn() repeat times after warmup runs; setup() runs untimed before each call"""
+    for _ in range(warmup):
+        if setup:
+            setup()
+        fn()
+    samples = []
+    for _ in range(repeat):
+        if setup:
+            setup()
+        started = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - started)
+    return {
+        'median': statistics.median(samples),
+        'min': min(samples),
+        'mean': statistics.fmean(samples) if hasattr(statistics, 'fmean') else statistics.mean(samples),
+        'stdev': statistics.stdev(samples) if len(samples) > 1 else 0.0,
+        'runs': len(samples),
+    }
+
+
+def make_report(results, params):
+    return {
+        'meta': {
+            'timestamp': datetime.now().isoformat(timespec='seconds'),
+            'python': sys.version.split()[0],
+            'platform': platform.platform(),
+            'params': params,
+        },
+        'results': results,
+    }
+
+
+def compare(report, baseline, threshold):
+    """Return (rows, regressions) comparing medians against a baseline report.
+
+    A benchmark regresses when its median is more than threshold (a
+    fraction, e.g. 0.15) slower than the baseline median.
+    """
+    rows, regressions = [], []
+    base_results = baseline.get('results', {})
+    for name, result in sorted(report['results'].items()):
+        base = base_results.get(name)
+        if not base:
+            rows.append((name, result['median'], None, None))
+            continue
+        change = result['median'] / base['median'] - 1 if base['median'] else 0.0
+        rows.append((name, result['median'], base['median'], change))
+        if change > threshold:
+            regressions.append(name)
+    if baseline.get('meta', {}).get('params') != report['meta']['params']:
+        print("⚠ Baseline was recorded with different parameters; comparison may be meaningless")
+    return rows, regressions
+
+
+def format_seconds(value):
+    if value is None:
+        return '-'
+    if value < 1e-3:
+        return f"{value * 1e6:.1f} µs"
+    if value < 1:
+        return f"{value * 1e3:.2f} ms"
+    return f"{value:.3f} s"
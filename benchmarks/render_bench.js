@@ -0,0 +1,82 @@
+// Runs populateContent() from js/main.js against a minimal DOM stand-in.
+// Usage: node render_bench.js <main.js> <portfolio-data.json> <repeat>
+'use strict';
+
+const fs = require('fs');
+const vm = require('vm');
+const { performance } = require('perf_hooks');
+
+const [mainJs, dataFile, repeatArg] = process.argv.slice(2);
+const repeat = parseInt(repeatArg || '7', 10);
+
+class FakeElement {
+    constructor(tag) {
+        this.tagName = tag;
+        this.children = [];
+        this.style = { setProperty() {} };
+        this.classList = { add() {}, remove() {}, toggle() {}, contains() { return false; } };
+        this.attributes = {};
+        this.innerHTML = '';
+        this.textContent = '';
+    }
+    appendChild(child) { this.children.push(child); return child; }
+    addEventListener() {}
+    setAttribute(name, value) { this.attributes[name] = String(value); }
+    getAttribute(name) { return this.attributes[name]; }
+    querySelector() { return new FakeElement('div'); }
+    querySelectorAll() { return []; }
+}
+
+const elements = {};
+const document = {
+    documentElement: new FakeElement('html'),
+    head: new FakeElement('head'),
+    body: new FakeElement('body'),
+    getElementById(id) { return elements[id] || (elements[id] = new FakeElement('div')); },
+    createElement(tag) { return new FakeElement(tag); },
+    querySelector() { return new FakeElement('div'); },
+    querySelectorAll() { return []; },
+    addEventListener() {},
+};
+document.documentElement.style.scrollBehavior = 'auto';
+
+const context = vm.createContext({
+    document,
+    window: { addEventListener() {}, open() {}, scrollY: 0, matchMedia() { return { matches: false }; } },
+    navigator: {},
+    console,
+    setTimeout,
+    clearTimeout,
+    performance,
+});
+vm.runInContext(fs.readFileSync(mainJs, 'utf8'), context, { filename: 'main.js' });
+
+const data = JSON.parse(fs.readFileSync(dataFile, 'utf8'));
+context.__data = data;
+
+function time(fn) {
+    fn();  // warm-up
+    const samples = [];
+    for (let i = 0; i < repeat; i++) {
+        const start = performance.now();
+        fn();
+        samples.push((performance.now() - start) / 1000);
+    }
+    samples.sort((a, b) => a - b);
+    const mean = samples.reduce((a, b) => a + b, 0) / samples.length;
+    const variance = samples.reduce((a, b) => a + (b - mean) ** 2, 0) / Math.max(1, samples.length - 1);
+    const mid = samples.length >> 1;
+    return {
+        median: samples.length % 2 ? samples[mid] : (samples[mid - 1] + samples[mid]) / 2,
+        min: samples[0],
+        mean,
+        stdev: Math.sqrt(variance),
+        runs: samples.length,
+    };
+}
+
+const results = {
+    parse_data: time(() => JSON.parse(fs.readFileSync(dataFile, 'utf8'))),
+    populate_content: time(() => vm.runInContext('portfolioData = __data; populateContent();', context)),
+};
+process.stdout.write(JSON.stringify(results));
@@ -0,0 +1,132 @@
+"""
+Deterministic synthetic portfolio generator.
+
+The same seed always produces the same document and media files, so
+benchmark runs on different machines or commits measure the same work.
+Text mixes Indonesian and English with emoji and accented characters,
+like real bios do.
+"""
+
+import json
+import os
+import random
+
+WORDS_ID = [
+    'animasi', 'desain', 'kreatif', 'logo', 'bumper', 'perusahaan', 'usaha', 'visual',
+    'menarik', 'modern', 'acara', 'merek', 'cerita', 'gerak', 'video', 'pembuatan',
+    'klien', 'profesional', 'karya', 'warna', 'tipografi', 'produksi', 'ilustrasi',
+]
+WORDS_EN = [
+    'motion', 'graphics', 'brand', 'identity', 'animation', 'explainer', 'campaign',
+    'sequence', 'broadcast', 'package', 'character', 'product', 'launch', 'reel',
+    'transition', 'lower', 'thirds', 'title', 'design', 'story', 'studio', 'café',
+]
+EXTRAS = ['✨', '🎬', '🎨', '—', '“', '”', 'é', 'ñ', '№', '🚀', '✏️', '🎞️']
+TAGS = [
+    'Branding', '2D Animation', '3D Animation', 'After Effects', 'Cinema 4D', 'Blender',
+    'Logo', 'Motion', 'Social Media', 'Broadcast', 'Character', 'Explainer', 'Tipografi',
+    'Iklan', 'Event', 'UMKM',
+]
+CATEGORIES = ['2D Animation', '3D Modeling', 'Video Editing', 'Design', 'Compositing', 'Audio']
+ICONS = ['⚡', '🎞️', '✏️', '🖼️', '🎨', '🧊', '🎧', '💡']
+
+# Smallest valid-looking JPEG/MP4 framing so files are recognisable by type
+JPEG_HEAD, JPEG_TAIL = b'\xff\xd8\xff\xe0\x00\x10JFIF\x00', b'\xff\xd9'
+MP4_HEAD = b'\x00\x00\x00\x18ftypmp42\x00\x00\x00\x00mp42isom'
+
+
+def sentence(rng, words):
+    parts = []
+    for _ in range(words):
+        pool = WORDS_ID if rng.random() < 0.5 else WORDS_EN
+        word = rng.choice(pool)
+        if rng.random() < 0.08:
+            word += rng.choice(EXTRAS)
+        parts.append(word)
+    text = ' '.join(parts)
+    return text[0].upper() + text[1:] + '.'
+
+
+def generate_portfolio(projects=100, skills=20, seed=1, video_every=4):
+    """Return a portfolio document with the given number of projects and skills"""
+    rng = random.Random(seed)
+    data = {
+        'config': {
+            'theme': {
+                'primaryColor': '#2644c8', 'secondaryColor': '#c4c3cc',
+                'backgroundColor': '#ffffff', 'textColor': '#111827',
+                'fontHeading': 'Poppins', 'fontBody': 'Inter',
+            },
+            'logo': {'type': 'image', 'content': 'assets/logo.png'},
+        },
+        'personal': {
+            'name': 'Studio Sintetis',
+            'title': 'Motion Graphics Artist',
+            'tagline': sentence(rng, 4),
+            'heroDescription': sentence(rng, 18),
+        },
+        'about': {
+            'bio': ' '.join(sentence(rng, 25) for _ in range(4)),
+            'description': ' '.join(sentence(rng, 20) for _ in range(2)),
+            'expertise': [sentence(rng, 2).rstrip('.') for _ in range(8)],
+        },
+        'skills': [],
+        'projects': [],
+        'contact': {
+            'email': 'studio@example.com',
+            'location': 'Kota Malang, Jawa Timur',
+            'availability': 'Tersedia untuk proyek freelance',
+            'social': [
+                {'platform': p, 'url': f'https://{p.lower()}.com/sintetis', 'icon': i}
+                for p, i in [('Behance', '🎨'), ('Vimeo', '▶️'), ('Instagram', '📸'), ('LinkedIn', '💼')]
+            ],
+        },
+    }
+    for i in range(skills):
+        data['skills'].append({
+            'name': f"{rng.choice(WORDS_EN).title()} {rng.choice(WORDS_ID).title()} {i + 1}",
+            'category': rng.choice(CATEGORIES),
+            'proficiency': rng.randint(40, 100),
+            'icon': rng.choice(ICONS),
+        })
+    for i in range(projects):
+        has_video = video_every and i % video_every == 0
+        data['projects'].append({
+            'id': i + 1,
+            'title': sentence(rng, rng.randint(2, 5)).rstrip('.'),
+            'description': sentence(rng, rng.randint(10, 40)),
+            'thumbnail': f'assets/projects/project{i + 1}.jpg',
+            'videoUrl': f'assets/videos/project{i + 1}.mp4' if has_video else 'https://vimeo.com/000000',
+            'tags': rng.sample(TAGS, rng.randint(1, 4)),
+            'year': rng.choice([2021, 2022, 2023, 2024, 2025, '2025']),
+        })
+    return data
+
+
+def _write_dummy(path, size, head, tail=b'', seed=0):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    body = max(0, size - len(head) - len(tail))
+    rng = random.Random(seed)
+    with open(path, 'wb') as f:
+        f.write(head)
+        f.write(rng.getrandbits(body * 8).to_bytes(body, 'little') if body else b'')
+        f.write(tail)
+
+
+def write_site(root, projects=100, skills=20, image_kb=64, video_kb=512, seed=1, media=True):
+    """Write a synthetic site (data file and dummy media) under root; returns the data path"""
+    data = generate_portfolio(projects, skills, seed)
+    data_path = os.path.join(root, 'data', 'portfolio-data.json')
+    os.makedirs(os.path.dirname(data_path), exist_ok=True)
+    with open(data_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=2, ensure_ascii=False)
+
+    if media:
+        _write_dummy(os.path.join(root, 'assets', 'logo.png'), 4096, b'\x89PNG\r\n\x1a\n', seed=seed)
+        for i, project in enumerate(data['projects']):
+            _write_dummy(os.path.join(root, *project['thumbnail'].split('/')), image_kb * 1024,
+                         JPEG_HEAD, JPEG_TAIL, seed=seed + i)
+            if project['videoUrl'].startswith('assets/'):
+                _write_dummy(os.path.join(root, *project['videoUrl'].split('/')), video_kb * 1024,
+                             MP4_HEAD, seed=seed + i)
+    return data_path
@@ -0,0 +1,371 @@
+#!/usr/bin/env python3
+"""
+Portfolio Page-Weight Budget
+---------------------------
+Measures what a visitor's first load of the page costs, statically, and
+compares it to the site's budgets:
+
+    criticalPathBytes      HTML, blocking CSS and JS, and the data the page renders from
+    firstLoadRequests      requests made before the page is idle (shell, fonts, logo,
+                           hero backdrop and every showcase card's image or video)
+    imageBytes             the largest single image
+    imageOversize          how many times larger an image is than its rendered box
+                           needs at 2x pixel density
+    eagerVideoBytes        card videos, which the page loads without preload="none"
+    thirdPartyOrigins      other hosts the page contacts (fonts, polyfill CDN)
+
+Budgets default to DEFAULT_BUDGETS and can be overridden per site in the
+data file:
+
+    "config": { "budget": { "eagerVideoBytes": 20000000 } }
+
+Usage:
+    python budget.py                   # Check the built site in dist/
+    python budget.py public            # Check another build
+    python budget.py --source          # Check the data and assets without building
+    python budget.py --json            # Print the measurements as JSON
+"""
+
+import argparse
+import json
+import os
+import re
+import struct
+import sys
+from collections import namedtuple
+from html.parser import HTMLParser
+from urllib.parse import parse_qs, urlsplit
+
+import build_site
+import storage
+import tracing
+from console import Colors, format_bytes
+
+DEFAULT_BUDGETS = {
+    'criticalPathBytes': 400 * 1024,
+    'firstLoadRequests': 30,
+    'imageBytes': 500 * 1024,
+    'imageOversize': 2.0,
+    'eagerVideoBytes': 10 * 1024 * 1024,
+    'thirdPartyOrigins': 3,
+}
+
+PIXEL_DENSITY = 2
+# Rendered boxes (CSS px), from css/styles.css: a .project-thumbnail is
+# 250px high and, in the single-column layout below 768px, up to about
+# 720px wide; the logo is 40px high with its width following the image.
+CARD_BOX = (720, 250)
+LOGO_HEIGHT = 40
+# Namespace URIs appear in the markup but are never requested
+NOT_FETCHED = ('http://www.w3.org/',)
+
+Violation = namedtuple('Violation', 'metric value limit message')
+
+
+# ========================================
+# IMAGE HEADERS
+# ========================================
+
+def image_size(path):
+    """(width, height) read from a PNG or JPEG header, or None.
+
+    Raises ValueError for a truncated header.
+    """
+    with open(path, 'rb') as f:
+        try:
+            return _read_image_size(f)
+        except struct.error as e:
+            raise ValueError(f"Truncated image header: {path}") from e
+
+
+def _read_image_size(f):
+    head = f.read(26)
+    if head.startswith(b'\x89PNG\r\n\x1a\n'):
+        return struct.unpack('>II', head[16:24])
+    if not head.startswith(b'\xff\xd8'):
+        return None
+    f.seek(2)
+    while True:
+        marker = f.read(2)
+        if len(marker) < 2 or marker[0] != 0xff:
+            return None
+        if marker[1] in (0xd8, 0x01) or 0xd0 <= marker[1] <= 0xd7:
+            continue
+        length = struct.unpack('>H', f.read(2))[0]
+        # SOF0-SOF15 carry the frame size, except DHT (c4), JPG (c8) and DAC (cc)
+        if 0xc0 <= marker[1] <= 0xcf and marker[1] not in (0xc4, 0xc8, 0xcc):
+            height, width = struct.unpack('>xHH', f.read(5))
+            return width, height
+        f.seek(length - 2, os.SEEK_CUR)
+
+
+def oversize(size, box):
+    """How many times more pixels than needed, per axis, to cover box at PIXEL_DENSITY"""
+    width, height = size
+    box_width, box_height = box
+    # object-fit: cover scales until both axes fill the box, so the smaller ratio counts
+    return min(width / (box_width * PIXEL_DENSITY), height / (box_height * PIXEL_DENSITY))
+
+
+# ========================================
+# PAGE
+# ========================================
+
+class PageParser(HTMLParser):
+    """Collects the stylesheets, scripts and external URLs of a page"""
+
+    def __init__(self):
+        super().__init__()
+        self.stylesheets = []
+        self.scripts = []
+        self.preloads = []
+        self.urls = []
+        self.inline = []
+        self._in_script = False
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        url = attrs.get('href') or attrs.get('src')
+        if url:
+            self.urls.append(url)
+        # A stylesheet inside <noscript> is the fallback for one chosen by script
+        # (the lite stylesheet snippet), so it is counted like a plain <link>
+        if tag == 'link' and 'stylesheet' in attrs.get('rel', '').split() and attrs.get('media') != 'print':
+            self.stylesheets.append(attrs['href'])
+        elif tag == 'link' and attrs.get('rel') == 'preload' and attrs.get('href'):
+            self.preloads.append(attrs['href'])
+        elif tag == 'script':
+            self._in_script = True
+            if attrs.get('src') and 'async' not in attrs and 'defer' not in attrs:
+                self.scripts.append(attrs['src'])
+
+    def handle_endtag(self, tag):
+        if tag == 'script':
+            self._in_script = False
+
+    def handle_data(self, data):
+        if self._in_script:
+            self.inline.append(data)
+
+
+def is_external(url):
+    return url.startswith(('http://', 'https://', '//')) and not url.startswith(NOT_FETCHED)
+
+
+def origin(url):
+    parts = urlsplit(url if not url.startswith('//') else 'https:' + url)
+    return f"{parts.scheme}://{parts.netloc}"
+
+
+def script_urls(source):
+    """External URLs written as string literals in a script"""
+    return [url for url in re.findall(r"""['"`](https?://[^'"`\s$]+)""", source) if is_external(url)]
+
+
+def font_requests(url):
+    """Google Fonts stylesheets pull one font file per family (at least)"""
+    if urlsplit(url).netloc != 'fonts.googleapis.com':
+        return 0
+    return len(parse_qs(urlsplit(url).query).get('family', []))
+
+
+# ========================================
+# MEASUREMENT
+# ========================================
+
+def file_size(path):
+    try:
+        return os.path.getsize(path)
+    except OSError:
+        return 0
+
+
+@tracing.traced()
+def measure(page_dir, data, assets_dir, data_bytes):
+    """Measurements for the page in page_dir rendering data with assets from assets_dir"""
+    parser = PageParser()
+    page_path = os.path.join(page_dir, build_site.PAGE_FILE)
+    with open(page_path, 'r', encoding='utf-8') as f:
+        parser.feed(f.read())
+
+    local_css = list(dict.fromkeys(url for url in parser.stylesheets if not is_external(url)))
+    local_js = list(dict.fromkeys(url for url in parser.scripts if not is_external(url)))
+    critical = file_size(page_path) + data_bytes
+    critical += sum(file_size(os.path.join(page_dir, *url.split('/'))) for url in local_css + local_js)
+
+    external = [url for url in parser.urls if is_external(url)]
+    for script in local_js:
+        try:
+            with open(os.path.join(page_dir, *script.split('/')), 'r', encoding='utf-8') as f:
+                external += script_urls(f.read())
+        except OSError:
+            pass
+    for source in parser.inline:
+        external += script_urls(source)
+    origins = sorted(set(origin(url) for url in external))
+
+    # The page, its blocking files, the data fetch, then fonts (self-hosted ones are preloaded)
+    requests = 1 + len(local_css) + len(local_js) + 1 + len(set(parser.preloads))
+    for url in parser.stylesheets:
+        if is_external(url):
+            requests += 1 + font_requests(url)
+    if os.path.isdir(os.path.join(page_dir, *build_site.HERO_DIR.split('/'))):
+        requests += 1
+
+    images = []
+    videos = []
+    logo = data.get('config', {}).get('logo', {})
+    if logo.get('type') == 'image' and build_site.is_local_ref(logo.get('content', '')):
+        images.append(('logo', logo['content'], None))
+    for project in data.get('projects', []):
+        video = project.get('videoUrl', '')
+        # Mirrors createProjectCard: a card shows its video if it is a file, else its thumbnail
+        if video.endswith(('.mp4', '.webm')):
+            if build_site.is_local_ref(video):
+                videos.append(video)
+        elif build_site.is_local_ref(project.get('thumbnail', '')):
+            images.append((project.get('title', '?'), project['thumbnail'], CARD_BOX))
+    requests += len(images) + len(videos)
+
+    image_results = []
+    for label, ref, box in images:
+        path = build_site.resolve_asset(ref, assets_dir)
+        try:
+            size = image_size(path)
+        except OSError:
+            continue
+        except ValueError:
+            # A truncated file still counts towards the page weight
+            size = None
+        if size and box is None:
+            box = (size[0] * LOGO_HEIGHT / max(size[1], 1), LOGO_HEIGHT)
+        image_results.append({
+            'label': label,
+            'ref': ref,
+            'bytes': file_size(path),
+            'size': list(size) if size else None,
+            'box': [round(v) for v in box] if box else None,
+            'oversize': round(oversize(size, box), 2) if size and box else None,
+        })
+    image_results.sort(key=lambda image: -image['bytes'])
+    video_results = sorted(({'ref': ref, 'bytes': file_size(build_site.resolve_asset(ref, assets_dir))}
+                            for ref in dict.fromkeys(videos)), key=lambda video: -video['bytes'])
+
+    return {
+        'criticalPathBytes': critical,
+        'firstLoadRequests': requests,
+        'imageBytes': image_results[0]['bytes'] if image_results else 0,
+        'imageOversize': max((image['oversize'] or 0 for image in image_results), default=0),
+        'eagerVideoBytes': sum(video['bytes'] for video in video_results),
+        'thirdPartyOrigins': len(origins),
+        'images': image_results,
+        'videos': video_results,
+        'origins': origins,
+    }
+
+
+def budgets_for(data):
+    budgets = dict(DEFAULT_BUDGETS)
+    budgets.update(data.get('config', {}).get('budget', {}))
+    return budgets
+
+
+def check(measured, budgets):
+    """Violations of budgets by the measurements"""
+    violations = []
+    for metric, limit in budgets.items():
+        value = measured.get(metric)
+        if value is None or value <= limit:
+            continue
+        if metric == 'imageBytes':
+            worst = [image for image in measured['images'] if image['bytes'] > limit]
+            detail = ', '.join(f"{image['ref']} ({format_bytes(image['bytes'])})" for image in worst)
+            message = f"Images over {format_bytes(limit)}: {detail}"
+        elif metric == 'imageOversize':
+            worst = [image for image in measured['images'] if (image['oversize'] or 0) > limit]
+            detail = ', '.join(f"{image['ref']} ({image['size'][0]}x{image['size'][1]} for a "
+                               f"{image['box'][0]}x{image['box'][1]} box)" for image in worst)
+            message = f"Images more than {limit:g}x their rendered size: {detail}"
+        elif metric == 'thirdPartyOrigins':
+            message = f"{value} third-party origins (budget {limit}): {', '.join(measured['origins'])}"
+        elif metric.endswith('Bytes'):
+            message = f"{metric} is {format_bytes(value)} (budget {format_bytes(limit)})"
+        else:
+            message = f"{metric} is {value} (budget {limit})"
+        violations.append(Violation(metric, value, limit, message))
+    return violations
+
+
+def check_build(output_dir=build_site.OUTPUT_DIR):
+    """(measurements, violations) for a built site"""
+    data_path = os.path.join(output_dir, *build_site.SITE_DATA_PATH.split('/'))
+    with open(data_path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    measured = measure(output_dir, data, os.path.join(output_dir, 'assets'), file_size(data_path))
+    return measured, check(measured, budgets_for(data))
+
+
+def check_source(data, assets_dir=build_site.ASSETS_DIR):
+    """(measurements, violations) for the data and assets as they are, before a build"""
+    data_bytes = len(json.dumps(data, indent=2, ensure_ascii=False).encode('utf-8'))
+    measured = measure(build_site.CODE_DIR, data, assets_dir, data_bytes)
+    return measured, check(measured, budgets_for(data))
+
+
+# ========================================
+# CLI
+# ========================================
+
+def print_report(measured, violations):
+    print(f"{Colors.BOLD}Page weight{Colors.END}")
+    for metric in DEFAULT_BUDGETS:
+        value = measured[metric]
+        shown = format_bytes(value) if metric.endswith('Bytes') else f"{value:g}"
+        failed = any(violation.metric == metric for violation in violations)
+        color = Colors.RED if failed else Colors.GREEN
+        print(f"  {color}{metric:<20}{Colors.END} {shown:>10}")
+    if measured['images']:
+        print(f"\n{Colors.BOLD}Largest images{Colors.END}")
+        for image in measured['images'][:5]:
+            size = f"{image['size'][0]}x{image['size'][1]}" if image['size'] else '?'
+            print(f"  {image['ref']:<50} {format_bytes(image['bytes']):>10} {size:>11}  {image['oversize'] or '-'}x")
+    if measured['origins']:
+        print(f"\n{Colors.BOLD}Third-party origins{Colors.END}")
+        for host in measured['origins']:
+            print(f"  {host}")
+    print()
+    for violation in violations:
+        print(f"{Colors.RED}✗ {violation.message}{Colors.END}")
+    if not violations:
+        print(f"{Colors.GREEN}✓ Within budget{Colors.END}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Check the page weight of a portfolio against its budgets")
+    parser.add_argument('output', nargs='?', default=build_site.OUTPUT_DIR, help="Built site (default: dist)")
+    parser.add_argument('--source', action='store_true', help="Check the data file and assets instead of a build")
+    parser.add_argument('--data', default=build_site.DATA_FILE, help="Data file for --source")
+    parser.add_argument('--assets', default=build_site.ASSETS_DIR, help="Assets root for --source")
+    parser.add_argument('--json', action='store_true', help="Print the measurements as JSON")
+    args = parser.parse_args(argv)
+
+    try:
+        if args.source:
+            measured, violations = check_source(storage.open_store(args.data).load(), args.assets)
+        else:
+            measured, violations = check_build(args.output)
+    except (OSError, ValueError) as e:
+        print(f"{Colors.RED}✗ {e}{Colors.END}")
+        return 1
+
+    if args.json:
+        measured['violations'] = [violation.message for violation in violations]
+        print(json.dumps(measured, indent=2))
+    else:
+        print_report(measured, violations)
+    return 1 if violations else 0
+
+
+if __name__ == '__main__':
+    tracing.enable_from_argv(sys.argv)
+    sys.exit(main())
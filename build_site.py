@@ -0,0 +1,680 @@
+#!/usr/bin/env python3
+"""
+Portfolio Site Builder
+---------------------------
+Publishes one portfolio into a self-contained output directory: the page
+shell (index.html, css, js), the site-facing portfolio-data.json and only
+the asset files the data actually references.
+
+Usage:
+    python build_site.py                       # Build into dist/
+    python build_site.py --out public          # Build into another directory
+    python build_site.py --validate            # Check data and asset references
+    python build_site.py --optimize            # Re-encode media in the output
+    python build_site.py --explain             # Say why each target rebuilt or was skipped
+    python build_site.py --trace out.json      # Record a performance trace
+
+Builds are incremental: only outputs whose inputs changed are redone
+(see buildgraph.py).
+
+The data file and assets root default to PORTFOLIO_DATA_FILE and
+PORTFOLIO_ASSETS_DIR (or data/portfolio-data.json and assets/).
+"""
+
+import argparse
+import json
+import os
+import re
+import shutil
+import subprocess
+import sys
+
+import buildgraph
+import css_analyzer
+import detail_pages
+import facets
+import fonts
+import hero_backdrop
+import image_encode
+import placeholders
+import search_index
+import storage
+import tracing
+from console import format_bytes
+
+# Configuration
+DATA_FILE = os.environ.get('PORTFOLIO_DATA_FILE', 'data/portfolio-data.json')
+ASSETS_DIR = os.environ.get('PORTFOLIO_ASSETS_DIR', 'assets')
+OUTPUT_DIR = 'dist'
+SITE_DATA_PATH = 'data/portfolio-data.json'
+SEARCH_INDEX_PATH = 'data/search-index.json'
+
+# The page shell ships from the code checkout, not from the site
+CODE_DIR = os.path.dirname(os.path.abspath(__file__))
+SHELL_FILES = ['index.html', 'css/styles.css', 'js/main.js', 'js/search-worker.js']
+PAGE_FILE = 'index.html'
+LITE_STYLESHEET = 'css/styles.lite.css'
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png')
+VIDEO_EXTENSIONS = ('.mp4', '.webm', '.mov')
+# H.264 for broad support, faststart so playback begins before the download ends
+VIDEO_ENCODE_ARGS = ['-c:v', 'libx264', '-crf', '26', '-preset', 'slow', '-c:a', 'aac', '-b:a', '128k',
+                     '-movflags', '+faststart']
+
+
+# ========================================
+# ASSET REFERENCES
+# ========================================
+
+def is_local_ref(ref):
+    """True for paths into the site's own files (not URLs or data URIs)"""
+    return bool(ref) and not ref.startswith(('http://', 'https://', '//', 'data:'))
+
+
+def collect_asset_refs(data):
+    """Return the local asset paths referenced by the data, in document order"""
+    refs = []
+    logo = data.get('config', {}).get('logo', {})
+    if logo.get('type') == 'image' and is_local_ref(logo.get('content', '')):
+        refs.append(logo['content'])
+    for project in data.get('projects', []):
+        for key in ('thumbnail', 'videoUrl'):
+            ref = project.get(key, '')
+            if is_local_ref(ref):
+                refs.append(ref)
+    return list(dict.fromkeys(refs))
+
+
+def resolve_asset(ref, assets_dir):
+    """Map a reference such as 'assets/projects/a.jpg' onto the site's assets root"""
+    ref = ref.replace('\\', '/')
+    if ref.startswith('assets/'):
+        return os.path.join(assets_dir, *ref[len('assets/'):].split('/'))
+    return os.path.join(os.path.dirname(os.path.abspath(assets_dir)), *ref.split('/'))
+
+
+def directory_size(path):
+    """Total size in bytes and file count below a directory"""
+    total = count = 0
+    for dirpath, _, filenames in os.walk(path):
+        for name in filenames:
+            total += os.path.getsize(os.path.join(dirpath, name))
+            count += 1
+    return total, count
+
+
+# ========================================
+# BUILD
+# ========================================
+
+STATE_FILE = '.build-state.json'
+
+
+def copy_file(task):
+    shutil.copy2(task.inputs[0], task.outputs[0])
+
+
+def add_shell_tasks(graph, site):
+    for rel in SHELL_FILES:
+        if rel == PAGE_FILE:
+            continue
+        graph.add(buildgraph.Task(f"shell:{rel}", copy_file,
+                                  inputs=[os.path.join(CODE_DIR, rel)],
+                                  outputs=[os.path.join(site['outputDir'], rel)]))
+
+
+PLACEHOLDER_CACHE = '.placeholders.json'
+
+
+def add_placeholders(graph, site):
+    """Attach a blurred-preview placeholder to the logo and each thumbnail in the published data.
+
+    Runs before the data task so the placeholders are part of its inputs;
+    previews are only recomputed when an image's content hash changes.
+    """
+    if not site['haveQt']:
+        site['log']("PyQt5 not available, thumbnails are published without placeholders")
+        return
+    data = site['data']
+    targets = []
+    logo = data.get('config', {}).get('logo', {})
+    if logo.get('type') == 'image':
+        targets.append((logo, logo.get('content', '')))
+    for project in data.get('projects', []):
+        targets.append((project, project.get('thumbnail', '')))
+
+    cache = placeholders.PlaceholderCache(os.path.join(site['outputDir'], PLACEHOLDER_CACHE))
+    for entry, ref in targets:
+        if not is_local_ref(ref) or not ref.lower().endswith(placeholders.IMAGE_EXTENSIONS):
+            continue
+        src = resolve_asset(ref, site['assetsDir'])
+        source_hash = graph.files.hash(src)
+        if source_hash is None:
+            continue
+        with tracing.span('placeholder', ref=ref):
+            placeholder = cache.get(source_hash, src)
+        if placeholder:
+            entry['placeholder'] = placeholder
+    cache.save()
+
+
+def add_facets(graph, site):
+    """Precompute the showcase filter chips into the published data"""
+    site['data']['facets'] = facets.build_facets(site['data'].get('projects', []))
+
+
+def add_page_links(graph, site):
+    """Point each project at its detail page, for the showcase cards"""
+    for project in site['data'].get('projects', []):
+        project['page'] = detail_pages.page_path(project)
+
+
+def add_data_task(graph, site):
+    data = site['data']
+
+    def write_data(task):
+        storage.write_json_atomic(task.outputs[0], data)
+
+    # One value per section so the explanation names what changed
+    graph.add(buildgraph.Task('data', write_data,
+                              values={f"data:{key}": value for key, value in data.items()},
+                              outputs=[os.path.join(site['outputDir'], SITE_DATA_PATH)]))
+
+
+def add_search_index_task(graph, site):
+    fields = ['id'] + [field for field, _ in search_index.FIELD_WEIGHTS]
+    projects = [{key: project.get(key) for key in fields if key in project}
+                for project in site['data'].get('projects', [])]
+
+    def write_index(task):
+        storage.write_json_atomic(task.outputs[0], search_index.build_index(projects), indent=None)
+
+    graph.add(buildgraph.Task('search-index', write_index,
+                              values={'projects': projects},
+                              outputs=[os.path.join(site['outputDir'], SEARCH_INDEX_PATH)],
+                              version=str(search_index.INDEX_VERSION)))
+
+
+def add_asset_tasks(graph, site):
+    refs = []
+    for ref in collect_asset_refs(site['data']):
+        src = resolve_asset(ref, site['assetsDir'])
+        if not os.path.isfile(src):
+            site['log'](f"Missing asset: {ref}")
+            continue
+        refs.append((ref, src))
+
+    # JPEGs get the lowest quality that still meets the SSIM target (image_encode.py)
+    qualities = {}
+    if site['optimize'] and site['haveQt']:
+        jpegs = {src: graph.files.hash(src) for ref, src in refs if ref.lower().endswith(('.jpg', '.jpeg'))}
+        cache = image_encode.QualityCache(os.path.join(site['outputDir'], image_encode.QUALITY_CACHE))
+        with tracing.span('choose-qualities', images=len(jpegs)):
+            qualities = image_encode.choose_qualities(jpegs, cache)
+        cache.save()
+        report = image_encode.make_report(qualities)
+        if report['savedBytes']:
+            site['log'](f"Re-encoding JPEGs at SSIM ≥ {image_encode.TARGET_SSIM} saves "
+                        f"{format_bytes(report['savedBytes'])} of "
+                        f"{format_bytes(report['originalBytes'])}")
+
+    for ref, src in refs:
+        dest = os.path.join(site['outputDir'], *ref.split('/'))
+        ext = os.path.splitext(ref)[1].lower()
+        if qualities.get(src):
+            quality = qualities[src]['quality']
+            graph.add(buildgraph.Task(f"optimize:{ref}", encode_image_task, inputs=[src], outputs=[dest],
+                                      values={'quality': quality}, version=f"ssim-{image_encode.VERSION}"))
+        elif site['optimize'] and ext in IMAGE_EXTENSIONS and site['haveQt']:
+            graph.add(buildgraph.Task(f"optimize:{ref}", optimize_image_task,
+                                      inputs=[src], outputs=[dest], version='q82'))
+        elif site['optimize'] and ext in VIDEO_EXTENSIONS and site['haveFfmpeg']:
+            graph.add(buildgraph.Task(f"optimize:{ref}", optimize_video_task,
+                                      inputs=[src], outputs=[dest], version='crf26'))
+        else:
+            graph.add(buildgraph.Task(f"asset:{ref}", copy_file, inputs=[src], outputs=[dest]))
+
+
+LITE_STYLESHEET_SNIPPET = """<script>
+        // Low-end devices and visitors who prefer less motion get the
+        // low-cost stylesheet (css_analyzer.py); ?css=full or ?css=lite overrides
+        (function () {
+            var n = navigator;
+            var choice = new URLSearchParams(location.search).get('css');
+            var low = (n.connection && n.connection.saveData) || n.deviceMemory <= 2 || n.hardwareConcurrency <= 2 ||
+                (window.matchMedia && window.matchMedia('(prefers-reduced-motion: reduce)').matches);
+            var lite = choice ? choice === 'lite' : low;
+            document.write('<link rel="stylesheet" href="css/styles' + (lite ? '.lite' : '') + '.css">');
+        })();
+    </script>
+    <noscript><link rel="stylesheet" href="css/styles.css"></noscript>"""
+
+
+def add_lite_stylesheet_task(graph, site):
+    """styles.lite.css for low-end devices, and the page snippet that picks it"""
+    def write_lite(task):
+        css_analyzer.write_lite(task.inputs[0], task.outputs[0])
+
+    graph.add(buildgraph.Task('css:lite', write_lite,
+                              inputs=[os.path.join(CODE_DIR, 'css', 'styles.css')],
+                              outputs=[os.path.join(site['outputDir'], LITE_STYLESHEET)],
+                              version=css_analyzer.LITE_VERSION))
+
+    def choose_stylesheet(html):
+        return html.replace('<link rel="stylesheet" href="css/styles.css">', LITE_STYLESHEET_SNIPPET, 1)
+    site['pageRewrites'].append(('lite-stylesheet', choose_stylesheet, LITE_STYLESHEET_SNIPPET))
+    # Pages that pick the lite sheet need it offline as much as the full one
+    site['precache'].append(LITE_STYLESHEET)
+
+
+HERO_DIR = 'assets/hero'
+
+
+def add_hero_backdrop_tasks(graph, site):
+    """Render the hero orbs for the theme so the page can skip the live blur"""
+    if not site['haveQt']:
+        site['log']("PyQt5 not available, the hero keeps its live background")
+        return
+    theme = site['data'].get('config', {}).get('theme', {})
+    colours = {key: theme.get(key) for key in ('primaryColor', 'backgroundColor')}
+    for width, height in hero_backdrop.SIZES:
+        rel = f"{HERO_DIR}/{hero_backdrop.file_name(width, height)}"
+
+        def render(task, width=width, height=height):
+            hero_backdrop.render(colours, width, height, task.outputs[0])
+
+        # Only the theme colours are inputs, so other edits don't repaint it
+        graph.add(buildgraph.Task(f"hero:{width}x{height}", render,
+                                  values={'theme': colours},
+                                  outputs=[os.path.join(site['outputDir'], *rel.split('/'))],
+                                  version=hero_backdrop.VERSION))
+        site['media'].append(rel)
+
+    style = hero_backdrop.stylesheet(HERO_DIR, colours['backgroundColor'] or hero_backdrop.DEFAULT_BACKGROUND)
+    snippet = f"<style>\n        {style}\n    </style>\n</head>"
+
+    def add_style(html):
+        return html.replace('</head>', snippet, 1)
+    site['pageRewrites'].append(('hero-backdrop', add_style, snippet))
+
+
+FONTS_SOURCE = 'fonts'
+FONTS_DIR = 'fonts'
+GOOGLE_FONTS = re.compile(r'\n\s*<!-- Google Fonts -->.*?rel="stylesheet">', re.S)
+# CSS custom property -> config.theme key that overrides it (see applyTheme in main.js)
+FONT_VARIABLES = {'--font-heading': 'fontHeading', '--font-body': 'fontBody'}
+
+
+def add_font_tasks(graph, site):
+    """Serve the site's own fonts, subset to the characters it shows, instead of Google Fonts"""
+    source_dir = os.path.join(site['assetsDir'], FONTS_SOURCE)
+    if not os.path.isdir(source_dir):
+        return
+    shell = {}
+    for rel in ('css/styles.css', PAGE_FILE, 'js/main.js'):
+        with open(os.path.join(CODE_DIR, *rel.split('/')), 'r', encoding='utf-8') as f:
+            shell[rel] = f.read()
+    theme = site['data'].get('config', {}).get('theme', {})
+    defaults = fonts.css_families(shell['css/styles.css'])
+    wanted = {(theme.get(key) or defaults.get(variable, '')).lower() for variable, key in FONT_VARIABLES.items()}
+    weights = fonts.used_weights(shell['css/styles.css'])
+    codepoints = fonts.used_codepoints(site['data'], shell[PAGE_FILE], [shell['js/main.js']])
+
+    faces, preloads, found, local = [], [], set(), set()
+    for name in sorted(os.listdir(source_dir)):
+        if not name.lower().endswith(fonts.FONT_EXTENSIONS):
+            continue
+        src = os.path.join(source_dir, name)
+        try:
+            with open(src, 'rb') as f:
+                _, tables = fonts.read_font(f.read())
+            info = fonts.font_info(tables)
+            mapped = set(fonts.read_cmap(tables))
+        except fonts.FontError as e:
+            site['log'](f"Skipping font {name}: {e}")
+            continue
+        if info['family'].lower() not in wanted or info['weight'] not in weights:
+            continue
+        stem = fonts.file_stem(info)
+        if stem in found:
+            site['log'](f"Skipping font {name}: another file already provides {stem}")
+            continue
+        found.add(stem)
+        local.add(info['family'].lower())
+        rel = f"{FONTS_DIR}/{stem}.woff"
+        outputs = [os.path.join(site['outputDir'], *rel.split('/'))]
+
+        if fonts.can_subset(tables):
+            covered = codepoints & mapped
+            rest = {code for code in mapped - covered if code >= 0x20}
+            rest_rel = f"{FONTS_DIR}/{stem}.rest.woff"
+            outputs.append(os.path.join(site['outputDir'], *rest_rel.split('/')))
+            # The face for characters added after this build; only fetched if one shows up
+            if rest:
+                faces.append(fonts.font_face(info, rest_rel, rest))
+            faces.append(fonts.font_face(info, rel, covered))
+            site['media'] += [rel, rest_rel]
+        else:
+            site['log'](f"Font {name} has CFF outlines or variations, it is served whole")
+            covered = rest = None
+            faces.append(fonts.font_face(info, rel, None))
+            site['media'].append(rel)
+        preloads.append(rel)
+
+        def write_fonts(task, covered=covered, rest=rest):
+            with open(task.inputs[0], 'rb') as f:
+                data = f.read()
+            for path, part in zip(task.outputs, (covered, rest)):
+                with open(path, 'wb') as f:
+                    f.write(fonts.convert(data, part)[0])
+
+        graph.add(buildgraph.Task(f"font:{stem}", write_fonts, inputs=[src],
+                                  values={'codepoints': fonts.unicode_range(covered) if covered else None},
+                                  outputs=outputs, version=fonts.VERSION))
+
+    if not faces:
+        site['log']("No usable files in the fonts folder, the page keeps Google Fonts")
+        return
+    missing = sorted(wanted - local)
+    if missing:
+        site['log'](f"No local font files for {', '.join(missing)}; Google Fonts stays in the page")
+    links = ''.join(f'    <link rel="preload" href="{rel}" as="font" type="font/woff" crossorigin>\n'
+                    for rel in preloads)
+    snippet = f"{links}    <style>\n        " + '\n        '.join(faces) + "\n    </style>\n</head>"
+
+    def use_local_fonts(html):
+        if not missing:
+            html = GOOGLE_FONTS.sub('', html, 1)
+        return html.replace('</head>', snippet, 1)
+    site['pageRewrites'].append(('fonts', use_local_fonts, [snippet, missing]))
+
+
+def add_page_task(graph, site):
+    """index.html with the rewrites registered by earlier stages applied"""
+    rewrites = list(site['pageRewrites'])
+
+    def write_page(task):
+        with open(task.inputs[0], 'r', encoding='utf-8') as f:
+            html = f.read()
+        for _, rewrite, _ in rewrites:
+            html = rewrite(html)
+        with open(task.outputs[0], 'w', encoding='utf-8') as f:
+            f.write(html)
+
+    graph.add(buildgraph.Task(f"page:{PAGE_FILE}", write_page,
+                              inputs=[os.path.join(CODE_DIR, PAGE_FILE)],
+                              values={f"rewrite:{name}": value for name, _, value in rewrites},
+                              outputs=[os.path.join(site['outputDir'], PAGE_FILE)]))
+
+
+# The rewrites that apply to the detail pages; the hero backdrop is home-page only
+DETAIL_PAGE_REWRITES = ('lite-stylesheet', 'fonts')
+
+
+def add_detail_page_tasks(graph, site):
+    """One static page per project, with the same stylesheet and font rewrites as index.html"""
+    data = site['data']
+    projects = data.get('projects', [])
+    with open(os.path.join(CODE_DIR, PAGE_FILE), 'r', encoding='utf-8') as f:
+        match = GOOGLE_FONTS.search(f.read())
+    fonts_block = match.group(0).lstrip('\n') if match else ''
+    rewrites = [rewrite for rewrite in site['pageRewrites'] if rewrite[0] in DETAIL_PAGE_REWRITES]
+    shared = {
+        'personal': {key: data.get('personal', {}).get(key) for key in ('name',)},
+        'config': {key: data.get('config', {}).get(key) for key in ('logo', 'theme')},
+    }
+
+    for project in projects:
+        related = detail_pages.related_projects(project, projects)
+
+        def write_page(task, project=project, related=related):
+            html = detail_pages.render(project, shared, fonts_block, related)
+            for _, rewrite, _ in rewrites:
+                html = rewrite(html)
+            with open(task.outputs[0], 'w', encoding='utf-8') as f:
+                f.write(html)
+
+        values = {'project': project, 'site': shared, 'fonts': fonts_block,
+                  'related': [{key: other.get(key) for key in ('id', 'title', 'thumbnail')} for other in related]}
+        values.update({f"rewrite:{name}": value for name, _, value in rewrites})
+        graph.add(buildgraph.Task(f"page:{project['page']}", write_page,
+                                  values=values,
+                                  outputs=[os.path.join(site['outputDir'], *project['page'].split('/'))],
+                                  version=detail_pages.VERSION))
+
+
+SW_TEMPLATE = 'js/service-worker.js'
+SW_PATH = 'sw.js'
+MANIFEST_PATH = 'asset-manifest.json'
+MEDIA_CACHE_BYTES = 50 * 1024 * 1024
+
+
+def add_service_worker_task(graph, site):
+    """sw.js precaching the shell and logo, versioned by their content hashes.
+
+    Stages add generated files the page needs to site['precache'], and
+    other files worth caching on first use to site['media'].
+    """
+    data = site['data']
+    logo = data.get('config', {}).get('logo', {})
+    precache = list(SHELL_FILES) + site['precache']
+    if logo.get('type') == 'image' and is_local_ref(logo.get('content', '')):
+        if os.path.isfile(resolve_asset(logo['content'], site['assetsDir'])):
+            precache.append(logo['content'])
+    media = [ref for ref in collect_asset_refs(data) + site['media'] if ref not in precache]
+    pages = [project['page'] for project in data.get('projects', []) if project.get('page')]
+    output_dir = site['outputDir']
+
+    def write_service_worker(task):
+        files = [{'url': rel, 'hash': buildgraph.hash_file(path)[:16]}
+                 for rel, path in zip(precache, task.inputs[1:])]
+        manifest = {
+            'version': buildgraph.hash_value(files)[:12],
+            'precache': files,
+            'data': [SITE_DATA_PATH, SEARCH_INDEX_PATH],
+            'media': media,
+            'pages': pages,
+            'mediaCacheBytes': MEDIA_CACHE_BYTES,
+        }
+        storage.write_json_atomic(task.outputs[1], manifest)
+        with open(task.inputs[0], 'r', encoding='utf-8') as f:
+            template = f.read()
+        script = template.replace('{/* MANIFEST */}', json.dumps(manifest, ensure_ascii=False), 1)
+        with open(task.outputs[0], 'w', encoding='utf-8') as f:
+            f.write(script)
+
+    # The precached files are other tasks' outputs, so this runs after them
+    graph.add(buildgraph.Task('service-worker', write_service_worker,
+                              inputs=[os.path.join(CODE_DIR, SW_TEMPLATE)]
+                                     + [os.path.join(output_dir, *rel.split('/')) for rel in precache],
+                              values={'media': media, 'pages': pages, 'mediaCacheBytes': MEDIA_CACHE_BYTES},
+                              outputs=[os.path.join(output_dir, SW_PATH),
+                                       os.path.join(output_dir, MANIFEST_PATH)]))
+
+
+# Each stage adds its tasks to the build graph. Later pipeline steps
+# register themselves here; stages that change index.html append to
+# site['pageRewrites'] and must come before add_page_task and
+# add_detail_page_tasks.
+STAGES = [add_shell_tasks, add_placeholders, add_facets, add_page_links, add_data_task, add_search_index_task,
+          add_asset_tasks, add_lite_stylesheet_task, add_hero_backdrop_tasks, add_font_tasks, add_page_task,
+          add_detail_page_tasks, add_service_worker_task]
+
+
+def build_site(data_file=DATA_FILE, assets_dir=ASSETS_DIR, output_dir=OUTPUT_DIR, log=print,
+               optimize=False, explain=False, jobs=None):
+    """Bring output_dir up to date, redoing only the work whose inputs changed.
+
+    Returns the data that was published.
+    """
+    data = storage.open_store(data_file).load()
+    site = {
+        'data': data,
+        'dataFile': data_file,
+        'assetsDir': assets_dir,
+        'outputDir': output_dir,
+        'optimize': optimize,
+        'haveQt': have_qt(),
+        'haveFfmpeg': shutil.which('ffmpeg') is not None,
+        'log': log,
+        'pageRewrites': [],
+        'precache': [],
+        'media': [],
+    }
+    if optimize and not site['haveQt']:
+        log("PyQt5 not available, images are copied as-is")
+    if optimize and not site['haveFfmpeg']:
+        log("ffmpeg not found, videos are copied as-is")
+
+    graph = buildgraph.BuildGraph(os.path.join(output_dir, STATE_FILE))
+    for stage in STAGES:
+        stage(graph, site)
+    report = graph.run(jobs)
+    for line in buildgraph.format_report(report, explain):
+        log(line)
+    return data
+
+
+# ========================================
+# VALIDATION
+# ========================================
+
+def validate_data(data):
+    """Return a list of problems with the structure of a portfolio document"""
+    problems = []
+    for section in ('personal', 'about', 'skills', 'projects', 'contact'):
+        if section not in data:
+            problems.append(f"Missing section: {section}")
+    for key in ('name', 'title', 'heroDescription'):
+        if key not in data.get('personal', {}):
+            problems.append(f"personal.{key} is missing")
+
+    for i, skill in enumerate(data.get('skills', []), 1):
+        for key in ('name', 'category', 'proficiency', 'icon'):
+            if key not in skill:
+                problems.append(f"Skill {i} has no {key}")
+        proficiency = skill.get('proficiency', 0)
+        if not isinstance(proficiency, int) or not 0 <= proficiency <= 100:
+            problems.append(f"Skill {i} ({skill.get('name', '?')}) proficiency must be 0-100")
+
+    seen_ids = set()
+    for i, project in enumerate(data.get('projects', []), 1):
+        label = f"Project {i} ({project.get('title', '?')})"
+        for key in ('id', 'title', 'description', 'thumbnail', 'tags', 'year'):
+            if key not in project:
+                problems.append(f"{label} has no {key}")
+        if project.get('id') in seen_ids:
+            problems.append(f"{label} reuses id {project.get('id')}")
+        seen_ids.add(project.get('id'))
+        if not isinstance(project.get('tags', []), list):
+            problems.append(f"{label} tags must be a list")
+        if not project.get('thumbnail') and not project.get('videoUrl'):
+            problems.append(f"{label} has neither a thumbnail nor a video")
+
+    for i, social in enumerate(data.get('contact', {}).get('social', []), 1):
+        if not social.get('url'):
+            problems.append(f"Social link {i} ({social.get('platform', '?')}) has no url")
+    return problems
+
+
+def validate_site(data_file=DATA_FILE, assets_dir=ASSETS_DIR, log=print):
+    """Validate the data document and its asset references; returns the problems found"""
+    data = storage.open_store(data_file).load()
+    problems = validate_data(data)
+    for ref in collect_asset_refs(data):
+        if not os.path.isfile(resolve_asset(ref, assets_dir)):
+            problems.append(f"Referenced asset not found: {ref}")
+    for problem in problems:
+        log(f"Problem: {problem}")
+    log(f"Validation finished with {len(problems)} problem(s)")
+    return problems
+
+
+# ========================================
+# MEDIA OPTIMIZATION
+# ========================================
+
+def have_qt():
+    try:
+        import PyQt5.QtGui  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+def _keep_smaller(src, candidate, dest):
+    """Move the candidate into place if it beats the source, else copy the source"""
+    saved = os.path.getsize(src) - os.path.getsize(candidate)
+    if saved > 0:
+        os.replace(candidate, dest)
+        return saved
+    os.remove(candidate)
+    shutil.copy2(src, dest)
+    return 0
+
+
+def optimize_image(src, dest, quality=82):
+    """Re-encode an image with Qt into dest; returns the bytes saved"""
+    from PyQt5.QtGui import QImage
+
+    image = QImage(src)
+    tmp_path = f"{dest}.opt"
+    fmt = 'JPG' if src.lower().endswith(('.jpg', '.jpeg')) else 'PNG'
+    if image.isNull() or not image.save(tmp_path, fmt, quality if fmt == 'JPG' else -1):
+        shutil.copy2(src, dest)
+        return 0
+    return _keep_smaller(src, tmp_path, dest)
+
+
+def optimize_video(src, dest):
+    """Re-encode a video with ffmpeg (H.264, faststart) into dest; returns the bytes saved"""
+    tmp_path = f"{dest}.opt{os.path.splitext(dest)[1]}"
+    result = subprocess.run(['ffmpeg', '-y', '-loglevel', 'error', '-i', src, *VIDEO_ENCODE_ARGS, tmp_path],
+                            capture_output=True)
+    if result.returncode != 0 or not os.path.exists(tmp_path):
+        shutil.copy2(src, dest)
+        return 0
+    return _keep_smaller(src, tmp_path, dest)
+
+
+def optimize_image_task(task):
+    optimize_image(task.inputs[0], task.outputs[0])
+
+
+def encode_image_task(task):
+    image_encode.encode_file(task.inputs[0], task.outputs[0], 'jpeg', task.values['quality'])
+
+
+def optimize_video_task(task):
+    optimize_video(task.inputs[0], task.outputs[0])
+
+
+# ========================================
+# ENTRY POINT
+# ========================================
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build the portfolio site into an output directory")
+    parser.add_argument('--data', default=DATA_FILE, help="Data file (JSON or SQLite)")
+    parser.add_argument('--assets', default=ASSETS_DIR, help="Assets root directory")
+    parser.add_argument('--out', default=OUTPUT_DIR, help="Output directory")
+    parser.add_argument('--validate', action='store_true', help="Only validate data and asset references")
+    parser.add_argument('--optimize', action='store_true', help="Optimise media while building")
+    parser.add_argument('--explain', action='store_true', help="Report why each target rebuilt or was skipped")
+    parser.add_argument('--jobs', type=int, default=None, help="Parallel tasks (default: automatic)")
+    args = parser.parse_args(argv)
+
+    if args.validate:
+        return 1 if validate_site(args.data, args.assets) else 0
+    try:
+        build_site(args.data, args.assets, args.out, optimize=args.optimize,
+                   explain=args.explain, jobs=args.jobs)
+    except buildgraph.BuildError as e:
+        print(f"✗ {e}")
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    tracing.enable_from_argv(sys.argv)
+    sys.exit(main())
@@ -0,0 +1,275 @@
+"""
+Incremental build engine for the site pipeline.
+
+A build is a set of tasks. Each task declares its inputs (files and named
+values such as data-file sections) and the files it writes. The engine
+keeps the content hashes of every task's inputs and outputs in a state
+file next to the outputs, so on the next run only tasks whose inputs
+changed (or whose outputs went missing or were edited) run again. Tasks
+that read another task's output wait for it; everything else runs in
+parallel on a thread pool.
+"""
+
+import hashlib
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+import tracing
+
+STATE_VERSION = 1
+
+
+def hash_bytes(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+def hash_value(value):
+    """Hash of the canonical JSON form of a value"""
+    canonical = json.dumps(value, ensure_ascii=False, sort_keys=True, separators=(',', ':'))
+    return hash_bytes(canonical.encode('utf-8'))
+
+
+def hash_file(path, chunk_size=1 << 20):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class BuildError(Exception):
+    """One or more tasks failed"""
+
+    def __init__(self, failures):
+        self.failures = failures
+        super().__init__("Build failed: " + "; ".join(f"{name}: {err}" for name, err in failures))
+
+
+class Task:
+    """A unit of work with declared inputs and outputs.
+
+    action(task) must write every path in outputs. Bump version when the
+    action itself changes so existing outputs are rebuilt.
+    """
+
+    def __init__(self, name, action, inputs=(), values=None, outputs=(), version='1'):
+        self.name = name
+        self.action = action
+        self.inputs = [os.path.abspath(p) for p in inputs]
+        self.values = dict(values or {})
+        self.outputs = [os.path.abspath(p) for p in outputs]
+        self.version = version
+
+
+class FileHashCache:
+    """Content hashes keyed by path, reused while size and mtime are unchanged"""
+
+    def __init__(self, entries=None):
+        self.entries = dict(entries or {})
+        self.lock = threading.Lock()
+
+    def hash(self, path):
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            return None
+        with self.lock:
+            cached = self.entries.get(path)
+        if cached and cached[0] == st.st_mtime_ns and cached[1] == st.st_size:
+            return cached[2]
+        digest = hash_file(path)
+        with self.lock:
+            self.entries[path] = [st.st_mtime_ns, st.st_size, digest]
+        return digest
+
+    def forget(self, path):
+        with self.lock:
+            self.entries.pop(path, None)
+
+
+class BuildGraph:
+    """Tasks plus the persistent state that makes rebuilding them incremental"""
+
+    def __init__(self, state_path):
+        self.state_path = state_path
+        self.tasks = {}
+        self.state = {'version': STATE_VERSION, 'targets': {}, 'files': {}}
+        try:
+            with open(state_path, 'r', encoding='utf-8') as f:
+                state = json.load(f)
+            if state.get('version') == STATE_VERSION:
+                self.state = state
+        except (FileNotFoundError, ValueError):
+            pass
+        self.files = FileHashCache(self.state.get('files'))
+        self.lock = threading.Lock()
+
+    def add(self, task):
+        if task.name in self.tasks:
+            raise ValueError(f"Duplicate task: {task.name}")
+        self.tasks[task.name] = task
+        return task
+
+    # ---- dependency analysis ----
+
+    def _dependencies(self):
+        producers = {}
+        for task in self.tasks.values():
+            for path in task.outputs:
+                if path in producers:
+                    raise ValueError(f"{path} is written by both {producers[path]} and {task.name}")
+                producers[path] = task.name
+        return {name: {producers[p] for p in task.inputs if p in producers and producers[p] != name}
+                for name, task in self.tasks.items()}
+
+    # ---- decisions ----
+
+    def _input_hashes(self, task):
+        hashes = {}
+        for path in task.inputs:
+            hashes[f"file:{path}"] = self.files.hash(path)
+        for name, value in task.values.items():
+            hashes[f"value:{name}"] = hash_value(value)
+        hashes['version'] = task.version
+        return hashes
+
+    def _reasons(self, task, hashes):
+        """Why the task has to run; an empty list means it is up to date"""
+        record = self.state['targets'].get(task.name)
+        if record is None:
+            return ['never built']
+        reasons = []
+        old = record.get('inputs', {})
+        for key, digest in hashes.items():
+            if key not in old:
+                reasons.append(f"new input {key}")
+            elif old[key] != digest:
+                reasons.append('action changed' if key == 'version' else f"{key} changed")
+        for key in old:
+            if key not in hashes:
+                reasons.append(f"input {key} removed")
+        for path in task.outputs:
+            recorded = record.get('outputs', {}).get(path)
+            current = self.files.hash(path)
+            if current is None:
+                reasons.append(f"output {path} missing")
+            elif recorded != current:
+                reasons.append(f"output {path} modified")
+        return reasons
+
+    def _run_task(self, name):
+        task = self.tasks[name]
+        hashes = self._input_hashes(task)
+        missing = [k[len('file:'):] for k, v in hashes.items() if k.startswith('file:') and v is None]
+        if missing:
+            raise FileNotFoundError(f"missing input {missing[0]}")
+        reasons = self._reasons(task, hashes)
+        if not reasons:
+            return 'skipped', ['up to date']
+
+        for path in task.outputs:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        with tracing.span(name):
+            task.action(task)
+        outputs = {}
+        for path in task.outputs:
+            self.files.forget(path)
+            digest = self.files.hash(path)
+            if digest is None:
+                raise RuntimeError(f"did not write {path}")
+            outputs[path] = digest
+        with self.lock:
+            self.state['targets'][name] = {'inputs': hashes, 'outputs': outputs}
+        return 'rebuilt', reasons
+
+    # ---- execution ----
+
+    def _remove_stale_targets(self, report):
+        live_outputs = {p for t in self.tasks.values() for p in t.outputs}
+        for name in list(self.state['targets']):
+            if name in self.tasks:
+                continue
+            record = self.state['targets'].pop(name)
+            for path in record.get('outputs', {}):
+                if path not in live_outputs and os.path.exists(path):
+                    os.remove(path)
+                self.files.forget(path)
+            report.append((name, 'removed', ['no longer part of the build']))
+
+    def run(self, jobs=None):
+        """Run every out-of-date task; returns [(task, status, reasons)] in completion order"""
+        deps = self._dependencies()
+        dependents = {name: set() for name in self.tasks}
+        for name, upstream in deps.items():
+            for dep in upstream:
+                dependents[dep].add(name)
+        remaining = {name: len(upstream) for name, upstream in deps.items()}
+
+        report = []
+        failures = []
+        self._remove_stale_targets(report)
+
+        with ThreadPoolExecutor(max_workers=jobs) as pool:
+            running = {pool.submit(self._run_task, n): n for n, count in remaining.items() if count == 0}
+            while running:
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    try:
+                        status, reasons = future.result()
+                    except Exception as e:
+                        with self.lock:
+                            self.state['targets'].pop(name, None)
+                        failures.append((name, e))
+                        report.append((name, 'failed', [repr(e)]))
+                        blocked = self._blocked(name, dependents)
+                        remaining.pop(name, None)
+                        for other in blocked:
+                            if remaining.pop(other, None) is None:
+                                continue
+                            report.append((other, 'blocked', [f"depends on failed task {name}"]))
+                        continue
+                    report.append((name, status, reasons))
+                    for other in dependents[name]:
+                        if other in remaining:
+                            remaining[other] -= 1
+                            if remaining[other] == 0:
+                                running[pool.submit(self._run_task, other)] = other
+                    remaining.pop(name, None)
+
+        self.save_state()
+        if failures:
+            raise BuildError(failures)
+        return report
+
+    @staticmethod
+    def _blocked(name, dependents):
+        blocked, stack = set(), [name]
+        while stack:
+            for other in dependents[stack.pop()]:
+                if other not in blocked:
+                    blocked.add(other)
+                    stack.append(other)
+        return blocked
+
+    def save_state(self):
+        self.state['files'] = self.files.entries
+        os.makedirs(os.path.dirname(os.path.abspath(self.state_path)), exist_ok=True)
+        tmp_path = f"{self.state_path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.state, f, ensure_ascii=False)
+        os.replace(tmp_path, self.state_path)
+
+
+def format_report(report, explain=False):
+    """Lines summarising a build; with explain, one line per task and why"""
+    lines = []
+    counts = {}
+    for name, status, reasons in report:
+        counts[status] = counts.get(status, 0) + 1
+        if explain:
+            lines.append(f"{status:<8} {name}: {'; '.join(reasons)}")
+    lines.append(', '.join(f"{count} {status}" for status, count in sorted(counts.items())) or 'nothing to do')
+    return lines
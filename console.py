@@ -0,0 +1,21 @@
+"""
+Terminal output helpers shared by the command-line tools.
+"""
+
+
+class Colors:
+    """ANSI color codes for terminal output"""
+    BLUE = '\033[94m'
+    GREEN = '\033[92m'
+    YELLOW = '\033[93m'
+    RED = '\033[91m'
+    BOLD = '\033[1m'
+    END = '\033[0m'
+
+
+def format_bytes(size):
+    """A byte count in B, KB, MB or GB, e.g. '512 B' or '1.5 MB'"""
+    for unit in ('B', 'KB', 'MB', 'GB'):
+        if size < 1024 or unit == 'GB':
+            return f"{size:.0f} {unit}" if unit == 'B' else f"{size:.1f} {unit}"
+        size /= 1024
@@ -13,27 +13,46 @@ Usage:
     python content_manager.py --update-bio "Your new bio"
     python content_manager.py --add-skill "Tool Name" "Category" 85
     python content_manager.py --add-project "Project Title"
+    python content_manager.py --list-projects  # Titles only, without loading every project
+    python content_manager.py --publish        # Write the site-facing JSON
+    python content_manager.py --check-assets   # Find broken and unreferenced assets
+    python content_manager.py --gc-assets      # ...and move unreferenced ones to quarantine
+    python content_manager.py --jobs           # Background media jobs and their progress
+    python content_manager.py --run-jobs       # Work through queued jobs (see jobs.py)
+    python content_manager.py --trace out.json ...   # Record a performance trace
+
+Set PORTFOLIO_DATA_FILE to a .db path to use the SQLite backend instead of
+the JSON file (see storage.py for migration).
 """
 
 import json
 import os
 import sys
 import shutil
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
 
+import build_site
+import jobs
+import storage
+import streamjson
+import tracing
+from console import Colors, format_bytes
+
+tracing.enable_from_argv(sys.argv)
+
 # Configuration
-DATA_FILE = 'data/portfolio-data.json'
-BACKUP_DIR = 'data/backups'
-
-class Colors:
-    """ANSI color codes for terminal output"""
-    BLUE = '\033[94m'
-    GREEN = '\033[92m'
-    YELLOW = '\033[93m'
-    RED = '\033[91m'
-    BOLD = '\033[1m'
-    END = '\033[0m'
+DATA_FILE = os.environ.get('PORTFOLIO_DATA_FILE', 'data/portfolio-data.json')
+SITE_DATA_FILE = 'data/portfolio-data.json'
+BACKUP_DIR = os.path.join(os.path.dirname(DATA_FILE), 'backups')
+ASSETS_DIR = os.environ.get('PORTFOLIO_ASSETS_DIR', 'assets')
+QUARANTINE_DIR = os.path.join(ASSETS_DIR, '.quarantine')
+
+# One store per process: it remembers the version loaded last so that
+# save_data() can merge with edits made meanwhile by a GUI or another CLI.
+STORE = storage.open_store(DATA_FILE)
 
 def print_header(text):
     """Print styled header"""
@@ -53,43 +72,67 @@ def print_warning(text):
     """Print warning message"""
     print(f"{Colors.YELLOW}⚠ {text}{Colors.END}")
 
+@tracing.traced()
 def load_data():
     """Load portfolio data from JSON file"""
     try:
-        with open(DATA_FILE, 'r', encoding='utf-8') as f:
-            return json.load(f)
+        return STORE.load()
     except FileNotFoundError:
         print_error(f"Data file not found: {DATA_FILE}")
         sys.exit(1)
     except json.JSONDecodeError:
         print_error("Invalid JSON format in data file")
         sys.exit(1)
+    except sqlite3.DatabaseError as e:
+        print_error(f"Invalid database file: {str(e)}")
+        sys.exit(1)
 
+@tracing.traced()
 def save_data(data, create_backup=True):
     """Save portfolio data to JSON file"""
     if create_backup:
         backup_data()
     
     try:
-        with open(DATA_FILE, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=2, ensure_ascii=False)
+        STORE.save(data)
         print_success("Data saved successfully!")
         return True
+    except storage.ConflictError as e:
+        print_error("Someone else changed the same fields since you loaded the data:")
+        for path in e.conflicts:
+            print(f"  - {path}")
+        if sys.stdin.isatty():
+            answer = input("Overwrite their changes with yours? (y/N): ").strip().lower()
+            if answer == 'y':
+                STORE.save(data, force=True)
+                print_success("Data saved successfully!")
+                return True
+        print_warning("Your changes were not saved.")
+        return False
     except Exception as e:
         print_error(f"Failed to save data: {str(e)}")
         return False
 
+@tracing.traced()
 def backup_data():
     """Create a backup of the current data file"""
     try:
-        os.makedirs(BACKUP_DIR, exist_ok=True)
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        backup_file = f"{BACKUP_DIR}/portfolio-data_{timestamp}.json"
-        shutil.copy2(DATA_FILE, backup_file)
+        backup_file = STORE.backup(BACKUP_DIR)
         print(f"{Colors.YELLOW}📦 Backup created: {backup_file}{Colors.END}")
     except Exception as e:
         print_warning(f"Failed to create backup: {str(e)}")
 
+@tracing.traced()
+def publish_data():
+    """Write the site-facing portfolio-data.json from the current store"""
+    try:
+        STORE.export_json(SITE_DATA_FILE)
+        print_success(f"Published {SITE_DATA_FILE}")
+        return True
+    except Exception as e:
+        print_error(f"Failed to publish data: {str(e)}")
+        return False
+
 # ========================================
 # PERSONAL INFO MANAGEMENT
 # ========================================
@@ -246,12 +289,18 @@ def manage_skills(data):
 # PROJECT MANAGEMENT
 # ========================================
 
+def project_summaries(projects):
+    """id, title and year of each project; lazily loaded projects are not parsed"""
+    if isinstance(projects, streamjson.LazyProjects):
+        return projects.summaries()
+    return projects
+
 def manage_projects(data):
     """Manage projects/showcase section"""
     print_header("Projects Management")
     
     print("Current projects:")
-    for i, project in enumerate(data['projects'], 1):
+    for i, project in enumerate(project_summaries(data['projects']), 1):
         print(f"  {i}. {project['title']} ({project['year']})")
     
     print("\n1. Add new project")
@@ -270,7 +319,7 @@ def manage_projects(data):
         tags = [tag.strip() for tag in tags if tag.strip()]
         year = int(input("Year: ").strip() or datetime.now().year)
         
-        new_id = max([p['id'] for p in data['projects']], default=0) + 1
+        new_id = max([p['id'] for p in project_summaries(data['projects'])], default=0) + 1
         
         new_project = {
             "id": new_id,
@@ -322,6 +371,35 @@ def manage_projects(data):
     
     return data
 
+@tracing.traced()
+def manage_projects_lazily():
+    """Manage projects on the JSON backend without loading every project"""
+    doc = STORE.open_lazy()
+    try:
+        manage_projects(doc)
+        edited, removed, added = doc['projects'].changes()
+        if edited or removed or added:
+            backup_data()
+            STORE.save_lazy(doc)
+            print_success("Data saved successfully!")
+    except storage.ConflictError as e:
+        print_error("Someone else changed the same fields since you loaded the data:")
+        for path in e.conflicts:
+            print(f"  - {path}")
+        print_warning("Your changes were not saved.")
+    finally:
+        doc.close()
+
+def list_projects():
+    """Print the project titles; on the JSON backend only the project index is read"""
+    if STORE.kind == 'json':
+        with STORE.open_lazy() as doc:
+            summaries = list(doc['projects'].summaries())
+    else:
+        summaries = load_data()['projects']
+    for i, project in enumerate(summaries, 1):
+        print(f"  {i}. {project.get('title', '?')} ({project.get('year', '?')}) [id {project.get('id')}]")
+
 # ========================================
 # CONTACT INFO MANAGEMENT
 # ========================================
@@ -397,6 +475,106 @@ def update_contact(data):
     
     return data
 
+# ========================================
+# ASSET INTEGRITY
+# ========================================
+
+def asset_references(data):
+    """(label, ref) for every asset slot in the data, empty local slots included"""
+    refs = []
+    logo = data.get('config', {}).get('logo', {})
+    if logo.get('type') == 'image':
+        refs.append(("Logo", logo.get('content', '')))
+    for i, project in enumerate(data.get('projects', []), 1):
+        label = f"Project {i} ({project.get('title', '?')})"
+        refs.append((f"{label} thumbnail", project.get('thumbnail', '')))
+        if project.get('videoUrl'):
+            refs.append((f"{label} video", project['videoUrl']))
+    return [(label, ref) for label, ref in refs if not ref or build_site.is_local_ref(ref)]
+
+def check_asset_file(path):
+    """Return None if the file can be read, else what is wrong with it"""
+    try:
+        with open(path, 'rb') as f:
+            if not f.read(1):
+                return "is empty"
+    except FileNotFoundError:
+        return "not found"
+    except OSError as e:
+        return f"unreadable ({e.strerror})"
+    return None
+
+def is_derivative(path, referenced):
+    """Same name with another extension or an @2x-style suffix as a referenced file"""
+    directory, name = os.path.split(path)
+    stem = os.path.splitext(name)[0].split('@')[0]
+    return (directory, stem) in referenced
+
+def find_orphans(referenced_paths):
+    """[(path, size)] of files under ASSETS_DIR that nothing references"""
+    referenced = {os.path.abspath(path) for path in referenced_paths}
+    stems = {os.path.split(os.path.splitext(path)[0]) for path in referenced}
+    orphans = []
+    for dirpath, dirnames, filenames in os.walk(ASSETS_DIR):
+        # Skips the quarantine and other hidden folders
+        dirnames[:] = sorted(d for d in dirnames if not d.startswith('.'))
+        for name in sorted(filenames):
+            path = os.path.abspath(os.path.join(dirpath, name))
+            if name.startswith('.') or path in referenced or is_derivative(path, stems):
+                continue
+            orphans.append((path, os.path.getsize(path)))
+    return orphans
+
+def quarantine_files(paths):
+    """Move files into a timestamped quarantine folder, keeping their layout"""
+    target = os.path.join(QUARANTINE_DIR, datetime.now().strftime('%Y%m%d_%H%M%S'))
+    for path in paths:
+        dest = os.path.join(target, os.path.relpath(path, os.path.abspath(ASSETS_DIR)))
+        os.makedirs(os.path.dirname(dest), exist_ok=True)
+        shutil.move(path, dest)
+    return target
+
+@tracing.traced()
+def check_assets(data, gc=False):
+    """Report broken asset references and orphaned files; returns the number of problems"""
+    print_header("Asset Check")
+    problems = []
+    paths = {}
+    for label, ref in asset_references(data):
+        if not ref:
+            problems.append(f"{label} is empty")
+        else:
+            paths.setdefault(build_site.resolve_asset(ref, ASSETS_DIR), []).append((label, ref))
+
+    # Stat and read every referenced file at once; network shares are the slow case
+    with tracing.span('content_manager.check_files', files=len(paths)):
+        with ThreadPoolExecutor() as pool:
+            results = dict(zip(paths, pool.map(check_asset_file, paths)))
+    for path, error in results.items():
+        if error:
+            for label, ref in paths[path]:
+                problems.append(f"{label}: {ref} {error}")
+
+    with tracing.span('content_manager.find_orphans'):
+        orphans = find_orphans(paths)
+
+    for problem in problems:
+        print_error(problem)
+    if not problems:
+        print_success(f"All {len(paths)} referenced asset(s) are readable")
+
+    if orphans:
+        total = sum(size for _, size in orphans)
+        print_warning(f"{len(orphans)} unreferenced file(s), {format_bytes(total)}:")
+        for path, size in orphans:
+            print(f"  {os.path.relpath(path):<60} {format_bytes(size):>10}")
+        if gc:
+            target = quarantine_files([path for path, _ in orphans])
+            print_success(f"Moved {len(orphans)} file(s) to {target}")
+    else:
+        print_success("No unreferenced files")
+    return len(problems)
+
 # ========================================
 # MAIN MENU
 # ========================================
@@ -420,6 +598,10 @@ def main_menu():
             print(f"\n{Colors.GREEN}Goodbye! 👋{Colors.END}\n")
             break
         
+        if choice == '4' and STORE.kind == 'json':
+            manage_projects_lazily()
+            continue
+        
         data = load_data()
         
         if choice == '1':
@@ -453,12 +635,34 @@ def handle_cli_args():
     if len(sys.argv) < 2:
         return False
     
+    if sys.argv[1] == '--list-projects':
+        list_projects()
+        return True
+
+    if sys.argv[1] == '--jobs':
+        jobs.print_jobs(jobs.JobQueue(jobs.queue_path(DATA_FILE)).list())
+        return True
+
+    if sys.argv[1] == '--run-jobs':
+        # Same as `python jobs.py run`
+        sys.exit(jobs.main(['run']))
+    
     data = load_data()
     
     if sys.argv[1] == '--help':
         print(__doc__)
         return True
     
+    elif sys.argv[1] == '--publish':
+        publish_data()
+        return True
+    
+    elif sys.argv[1] in ('--check-assets', '--gc-assets'):
+        # Non-zero exit on broken references so it can gate a publish
+        if check_assets(data, gc=sys.argv[1] == '--gc-assets'):
+            sys.exit(1)
+        return True
+    
     elif sys.argv[1] == '--update-name' and len(sys.argv) > 2:
         data['personal']['name'] = sys.argv[2]
         save_data(data)
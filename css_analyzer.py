@@ -0,0 +1,522 @@
+#!/usr/bin/env python3
+"""
+CSS Render-Cost Analyzer
+---------------------------
+Flags the rules in a stylesheet that are expensive to paint on mobile GPUs:
+transitions and animations of properties the compositor can't handle on
+its own, `transition: all`, large blur filters (worse on big, fixed or
+animated elements), backdrop filters and infinite animations.
+
+It can also write a "lite" stylesheet with the same look at rest but only
+transform/opacity transitions, no infinite or paint-heavy animations and
+no backdrop filters. The build ships it as css/styles.lite.css for
+low-end devices.
+
+Usage:
+    python css_analyzer.py                                 # Analyse css/styles.css
+    python css_analyzer.py css/styles.css --html index.html
+    python css_analyzer.py --lite css/styles.lite.css      # Also write the lite sheet
+    python css_analyzer.py --strict                        # Exit 1 on high-cost findings
+"""
+
+import argparse
+import re
+import sys
+from html.parser import HTMLParser
+
+STYLESHEET = 'css/styles.css'
+HTML_FILE = 'index.html'
+
+# Bump when the lite rewrite changes so builds regenerate it
+LITE_VERSION = '1'
+
+COMPOSITED = {'transform', 'opacity'}
+LAYOUT = {'width', 'height', 'min-width', 'min-height', 'max-width', 'max-height', 'top', 'right',
+          'bottom', 'left', 'margin', 'margin-top', 'margin-right', 'margin-bottom', 'margin-left',
+          'padding', 'padding-top', 'padding-right', 'padding-bottom', 'padding-left', 'font-size',
+          'line-height', 'border-width', 'gap', 'flex-basis', 'inset'}
+CHEAP_PAINT = {'color', 'background-color', 'border-color', 'outline-color'}
+LARGE_PX = 300
+BLUR_PX = 20
+
+TIMING_KEYWORDS = {'ease', 'linear', 'ease-in', 'ease-out', 'ease-in-out', 'step-start', 'step-end'}
+ANIMATION_KEYWORDS = TIMING_KEYWORDS | {'infinite', 'normal', 'reverse', 'alternate', 'alternate-reverse',
+                                        'none', 'forwards', 'backwards', 'both', 'running', 'paused'}
+_TIME_RE = re.compile(r'^-?[\d.]+m?s$')
+_NUMBER_RE = re.compile(r'^[\d.]+$')
+_VAR_RE = re.compile(r'var\(\s*(--[\w-]+)\s*(?:,\s*([^()]*))?\)')
+_BLUR_RE = re.compile(r'blur\(\s*([\d.]+)px\s*\)')
+_RGBA_RE = re.compile(r'rgba\(\s*([\d.]+)\s*,\s*([\d.]+)\s*,\s*([\d.]+)\s*,\s*([\d.]+)\s*\)')
+
+
+# ========================================
+# PARSING
+# ========================================
+
+class Rule:
+    def __init__(self, selector, declarations, line):
+        self.selector = selector
+        self.declarations = declarations  # [[property, value, important]]
+        self.line = line
+
+
+class AtBlock:
+    def __init__(self, prelude, children, line):
+        self.prelude = prelude
+        self.children = children
+        self.line = line
+
+
+class AtStatement:
+    def __init__(self, text, line):
+        self.text = text
+        self.line = line
+
+
+def _strip_comments(text):
+    # Keep the newlines so reported line numbers match the file
+    return re.sub(r'/\*.*?\*/', lambda m: '\n' * m.group(0).count('\n'), text, flags=re.S)
+
+
+def split_top_level(text, separator):
+    """Split on a separator outside quotes and parentheses"""
+    parts, depth, quote, start = [], 0, None, 0
+    for i, ch in enumerate(text):
+        if quote:
+            if ch == quote and text[i - 1] != '\\':
+                quote = None
+        elif ch in '"\'':
+            quote = ch
+        elif ch == '(':
+            depth += 1
+        elif ch == ')':
+            depth -= 1
+        elif ch == separator and depth == 0:
+            parts.append(text[start:i])
+            start = i + 1
+    parts.append(text[start:])
+    return parts
+
+
+def _parse_declarations(body):
+    declarations = []
+    for chunk in split_top_level(body, ';'):
+        if ':' not in chunk:
+            continue
+        prop, value = chunk.split(':', 1)
+        value = value.strip()
+        important = value.endswith('!important')
+        if important:
+            value = value[:-len('!important')].strip()
+        prop = prop.strip()
+        declarations.append([prop if prop.startswith('--') else prop.lower(), value, important])
+    return declarations
+
+
+def parse(text):
+    """Parse a stylesheet into Rule / AtBlock / AtStatement nodes"""
+    text = _strip_comments(text)
+    nodes, _ = _parse_block(text, 0)
+    return nodes
+
+
+def _parse_block(text, pos):
+    nodes = []
+    length = len(text)
+    while pos < length:
+        while pos < length and text[pos].isspace():
+            pos += 1
+        if pos >= length:
+            break
+        if text[pos] == '}':
+            return nodes, pos + 1
+        line = text.count('\n', 0, pos) + 1
+        end = _find_any(text, pos, '{;}')
+        if end < length and text[end] == ';':
+            nodes.append(AtStatement(text[pos:end].strip(), line))
+            pos = end + 1
+            continue
+        if end >= length or text[end] == '}':
+            pos = end
+            continue
+        prelude = ' '.join(text[pos:end].split())
+        if prelude.startswith('@') and not prelude.startswith('@font-face') and not prelude.startswith('@page'):
+            children, pos = _parse_block(text, end + 1)
+            nodes.append(AtBlock(prelude, children, line))
+        else:
+            close = _find_any(text, end + 1, '}')
+            nodes.append(Rule(prelude, _parse_declarations(text[end + 1:close]), line))
+            pos = close + 1
+    return nodes, pos
+
+
+def _find_any(text, pos, chars):
+    quote = None
+    depth = 0
+    for i in range(pos, len(text)):
+        ch = text[i]
+        if quote:
+            if ch == quote:
+                quote = None
+        elif ch in '"\'':
+            quote = ch
+        elif ch == '(':
+            depth += 1
+        elif ch == ')':
+            depth -= 1
+        elif depth == 0 and ch in chars:
+            return i
+    return len(text)
+
+
+def walk(nodes, context=()):
+    """Yield (rule, at-rule context) for every style rule"""
+    for node in nodes:
+        if isinstance(node, Rule):
+            yield node, context
+        elif isinstance(node, AtBlock) and not node.prelude.startswith('@keyframes'):
+            yield from walk(node.children, context + (node.prelude,))
+
+
+def serialize(nodes, indent=''):
+    out = []
+    for node in nodes:
+        if isinstance(node, AtStatement):
+            out.append(f"{indent}{node.text};")
+        elif isinstance(node, AtBlock):
+            out.append(f"{indent}{node.prelude} {{")
+            out.append(serialize(node.children, indent + '    '))
+            out.append(f"{indent}}}")
+        elif node.declarations:
+            out.append(f"{indent}{node.selector} {{")
+            for prop, value, important in node.declarations:
+                out.append(f"{indent}    {prop}: {value}{' !important' if important else ''};")
+            out.append(f"{indent}}}")
+        out.append('')
+    return '\n'.join(out).rstrip() + '\n'
+
+
+# ========================================
+# VALUES
+# ========================================
+
+def custom_properties(nodes):
+    props = {}
+    for rule, _ in walk(nodes):
+        if rule.selector.strip() == ':root':
+            for prop, value, _ in rule.declarations:
+                if prop.startswith('--'):
+                    props[prop] = value
+    return props
+
+
+def resolve(value, variables, depth=0):
+    """Substitute var() references with their :root values"""
+    if depth > 10 or 'var(' not in value:
+        return value
+
+    def substitute(match):
+        return variables.get(match.group(1), match.group(2) or '')
+    return resolve(_VAR_RE.sub(substitute, value), variables, depth + 1)
+
+
+def parse_transitions(value):
+    """[(property, [other tokens])] for a transition shorthand"""
+    items = []
+    for item in split_top_level(value, ','):
+        tokens = split_top_level(item.strip(), ' ')
+        tokens = [t for t in tokens if t]
+        prop, rest = 'all', []
+        for token in tokens:
+            if _TIME_RE.match(token) or token in TIMING_KEYWORDS or '(' in token:
+                rest.append(token)
+            else:
+                prop = token.lower()
+        items.append((prop, rest))
+    return items
+
+
+def parse_animations(value):
+    """[(name, infinite)] for an animation shorthand"""
+    items = []
+    for item in split_top_level(value, ','):
+        name, infinite = None, False
+        for token in (t for t in split_top_level(item.strip(), ' ') if t):
+            if token == 'infinite':
+                infinite = True
+            elif not (_TIME_RE.match(token) or _NUMBER_RE.match(token) or '(' in token
+                      or token in ANIMATION_KEYWORDS):
+                name = token
+        items.append((name, infinite))
+    return items
+
+
+def keyframe_properties(nodes):
+    """{keyframes name: set of animated properties}"""
+    frames = {}
+
+    def collect(children):
+        for node in children:
+            if isinstance(node, AtBlock):
+                if node.prelude.startswith('@keyframes'):
+                    name = node.prelude.split(None, 1)[1].strip()
+                    props = frames.setdefault(name, set())
+                    for frame in node.children:
+                        if isinstance(frame, Rule):
+                            props.update(p for p, _, _ in frame.declarations)
+                else:
+                    collect(node.children)
+    collect(nodes)
+    return frames
+
+
+def _px(value):
+    match = re.match(r'^(-?[\d.]+)px$', value.strip())
+    return float(match.group(1)) if match else None
+
+
+# ========================================
+# ELEMENTS (which classes sit on the same element)
+# ========================================
+
+class _ClassCollector(HTMLParser):
+    def __init__(self):
+        super().__init__()
+        self.groups = []
+
+    def handle_starttag(self, tag, attrs):
+        classes = dict(attrs).get('class')
+        if classes:
+            self.groups.append(set(classes.split()))
+
+
+def class_groups(html_path):
+    """Class sets of the elements in an HTML file (empty when there is none)"""
+    if not html_path:
+        return []
+    try:
+        with open(html_path, 'r', encoding='utf-8') as f:
+            collector = _ClassCollector()
+            collector.feed(f.read())
+        return collector.groups
+    except FileNotFoundError:
+        return []
+
+
+def _single_class(selector):
+    match = re.match(r'^\.([\w-]+)$', selector.strip())
+    return match.group(1) if match else None
+
+
+# ========================================
+# ANALYSIS
+# ========================================
+
+class Finding:
+    def __init__(self, severity, line, selector, message):
+        self.severity = severity
+        self.line = line
+        self.selector = selector
+        self.message = message
+
+    def format(self, filename):
+        return f"{filename}:{self.line} [{self.severity}] {self.selector}: {self.message}"
+
+
+SEVERITY_ORDER = {'high': 0, 'medium': 1, 'low': 2}
+
+
+def _cost(prop):
+    if prop in COMPOSITED:
+        return None
+    if prop in LAYOUT:
+        return 'high'
+    if prop in CHEAP_PAINT:
+        return 'low'
+    return 'medium'
+
+
+def analyze(nodes, html_groups=()):
+    """Return the findings for a parsed stylesheet, most expensive first"""
+    variables = custom_properties(nodes)
+    frames = keyframe_properties(nodes)
+
+    # Per class: its own box size, positioning and whether it animates
+    traits = {}
+    for rule, _ in walk(nodes):
+        for selector in split_top_level(rule.selector, ','):
+            cls = _single_class(selector)
+            if not cls:
+                continue
+            info = traits.setdefault(cls, {'size': 0, 'fixed': False, 'animated': False})
+            for prop, value, _ in rule.declarations:
+                value = resolve(value, variables)
+                if prop in ('width', 'height') and (_px(value) or 0) > info['size']:
+                    info['size'] = _px(value)
+                elif prop == 'position' and value in ('fixed', 'sticky'):
+                    info['fixed'] = True
+                elif prop in ('animation', 'animation-name') and value != 'none':
+                    info['animated'] = True
+
+    def element_traits(selector):
+        """Merge the traits of every class that shares an element with this selector's class"""
+        cls = _single_class(selector)
+        merged = {'size': 0, 'fixed': False, 'animated': False}
+        if not cls:
+            return merged
+        related = {cls}
+        for group in html_groups:
+            if cls in group:
+                related |= group
+        for other in related:
+            info = traits.get(other)
+            if info:
+                merged['size'] = max(merged['size'], info['size'])
+                merged['fixed'] = merged['fixed'] or info['fixed']
+                merged['animated'] = merged['animated'] or info['animated']
+        return merged
+
+    findings = []
+    for rule, _ in walk(nodes):
+        element = None
+        for prop, raw, _ in rule.declarations:
+            value = resolve(raw, variables)
+            if prop == 'transition':
+                for item_prop, _ in parse_transitions(value):
+                    if item_prop == 'all':
+                        findings.append(Finding('medium', rule.line, rule.selector,
+                                                f"transition on all properties ({raw})"))
+                    elif item_prop != 'none' and _cost(item_prop):
+                        findings.append(Finding(_cost(item_prop), rule.line, rule.selector,
+                                                f"transition of non-composited property {item_prop}"))
+            elif prop == 'transition-property':
+                for item_prop in (p.strip() for p in value.split(',')):
+                    if item_prop == 'all' or _cost(item_prop):
+                        findings.append(Finding(_cost(item_prop) or 'medium', rule.line, rule.selector,
+                                                f"transition of {item_prop}"))
+            elif prop in ('animation', 'animation-name'):
+                for name, infinite in parse_animations(value):
+                    if not name:
+                        continue
+                    costly = sorted(p for p in frames.get(name, ()) if _cost(p))
+                    if costly:
+                        severity = min((_cost(p) for p in costly), key=SEVERITY_ORDER.get)
+                        findings.append(Finding(severity, rule.line, rule.selector,
+                                                f"@keyframes {name} animates {', '.join(costly)}"))
+                    if infinite:
+                        findings.append(Finding('medium', rule.line, rule.selector,
+                                                f"infinite animation {name}"))
+            elif prop in ('filter', 'backdrop-filter', '-webkit-backdrop-filter'):
+                blurs = [float(b) for b in _BLUR_RE.findall(value)]
+                if not blurs:
+                    continue
+                if element is None:
+                    element = element_traits(rule.selector)
+                reasons = []
+                if element['size'] >= LARGE_PX:
+                    reasons.append(f"{element['size']:.0f}px element")
+                if element['fixed']:
+                    reasons.append('fixed element')
+                if element['animated']:
+                    reasons.append('animated element')
+                if prop == 'filter' and max(blurs) < BLUR_PX and not reasons:
+                    continue
+                severity = 'high' if reasons or prop != 'filter' and element['fixed'] else 'medium'
+                detail = f" on a {', '.join(reasons)}" if reasons else ''
+                findings.append(Finding(severity, rule.line, rule.selector,
+                                        f"{prop}: {raw}{detail}"))
+    findings.sort(key=lambda f: (SEVERITY_ORDER[f.severity], f.line))
+    return findings
+
+
+# ========================================
+# LITE STYLESHEET
+# ========================================
+
+def _lite_transition(value):
+    kept = []
+    for prop, rest in parse_transitions(value):
+        timing = ' '.join(rest)
+        if prop == 'all':
+            kept.extend([f"transform {timing}".strip(), f"opacity {timing}".strip()])
+        elif prop in COMPOSITED:
+            kept.append(f"{prop} {timing}".strip())
+    return ', '.join(dict.fromkeys(kept)) or 'none'
+
+
+def _opaque_background(value):
+    """Raise the alpha of an rgba() colour so text stays legible without the backdrop blur"""
+    def raise_alpha(match):
+        r, g, b, a = match.groups()
+        return f"rgba({r}, {g}, {b}, {max(float(a), 0.95)})"
+    return _RGBA_RE.sub(raise_alpha, value)
+
+
+def make_lite(nodes):
+    """Rewrite parsed rules in place into the low-cost variant; returns the nodes"""
+    variables = custom_properties(nodes)
+    frames = keyframe_properties(nodes)
+    for rule, _ in walk(nodes):
+        declarations = []
+        dropped_backdrop = False
+        for prop, raw, important in rule.declarations:
+            value = resolve(raw, variables)
+            if prop == 'transition':
+                raw = _lite_transition(value)
+            elif prop == 'transition-property':
+                props = [p.strip() for p in value.split(',') if p.strip() in COMPOSITED]
+                raw = ', '.join(props) or 'none'
+            elif prop in ('animation', 'animation-name'):
+                # Keep one-shot transform/opacity entrances, drop the rest
+                items = parse_animations(value)
+                if any(infinite or not name or any(_cost(p) for p in frames.get(name, ()))
+                       for name, infinite in items) and value != 'none':
+                    raw = 'none'
+            elif prop in ('backdrop-filter', '-webkit-backdrop-filter'):
+                dropped_backdrop = True
+                continue
+            declarations.append([prop, raw, important])
+        if dropped_backdrop:
+            for declaration in declarations:
+                if declaration[0] in ('background', 'background-color'):
+                    declaration[1] = _opaque_background(resolve(declaration[1], variables))
+        rule.declarations = declarations
+    return nodes
+
+
+def write_lite(src, dest):
+    with open(src, 'r', encoding='utf-8') as f:
+        nodes = parse(f.read())
+    header = f"/* Generated by css_analyzer.py from {src.replace(chr(92), '/').split('/')[-1]}; do not edit. */\n\n"
+    with open(dest, 'w', encoding='utf-8') as f:
+        f.write(header + serialize(make_lite(nodes)))
+
+
+# ========================================
+# ENTRY POINT
+# ========================================
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Flag expensive CSS and emit a low-cost stylesheet")
+    parser.add_argument('stylesheet', nargs='?', default=STYLESHEET)
+    parser.add_argument('--html', default=HTML_FILE, help="Page used to see which classes share an element")
+    parser.add_argument('--lite', metavar='OUT', help="Write the lite stylesheet to OUT")
+    parser.add_argument('--strict', action='store_true', help="Exit 1 if there are high-cost findings")
+    args = parser.parse_args(argv)
+
+    with open(args.stylesheet, 'r', encoding='utf-8') as f:
+        nodes = parse(f.read())
+    findings = analyze(nodes, class_groups(args.html))
+    for finding in findings:
+        print(finding.format(args.stylesheet))
+    counts = {s: sum(1 for f in findings if f.severity == s) for s in SEVERITY_ORDER}
+    print(f"{len(findings)} finding(s): " + ', '.join(f"{n} {s}" for s, n in counts.items()))
+
+    if args.lite:
+        write_lite(args.stylesheet, args.lite)
+        print(f"Lite stylesheet written to {args.lite}")
+    return 1 if args.strict and counts['high'] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
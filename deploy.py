@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""
+Portfolio Deploy
+---------------------------
+Publishes a built site (see build_site.py) to a target directory, copying
+only what changed. The target keeps a manifest of the content hash of
+every file it received; each deploy hashes the build, copies new and
+changed files in parallel, removes files the build no longer has, and
+reports how much was saved compared to copying everything.
+
+A local directory stands in for the host: a mounted share, a synced
+folder, or the checkout that GitHub Pages / Netlify publish from.
+
+Usage:
+    python deploy.py /srv/www/portfolio            # Deploy dist/
+    python deploy.py /srv/www/portfolio --build    # Build first
+    python deploy.py /srv/www/portfolio --dry-run  # Only show what would change
+    python deploy.py /srv/www/portfolio --source public --jobs 8
+"""
+
+import argparse
+import fnmatch
+import json
+import os
+import shutil
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import build_site
+import buildgraph
+import image_encode
+import tracing
+from console import Colors, format_bytes
+
+SOURCE_DIR = build_site.OUTPUT_DIR
+MANIFEST_FILE = '.deploy-manifest.json'
+# Build bookkeeping that must not be published
+EXCLUDE = [build_site.STATE_FILE, build_site.PLACEHOLDER_CACHE, image_encode.QUALITY_CACHE,
+           '*.tmp', '*.opt', '*.opt.*']
+
+
+def list_files(root):
+    """Relative paths (with forward slashes) of the files to publish"""
+    files = []
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames.sort()
+        for name in sorted(filenames):
+            rel = os.path.relpath(os.path.join(dirpath, name), root).replace(os.sep, '/')
+            if rel == MANIFEST_FILE or any(fnmatch.fnmatch(name, pattern) for pattern in EXCLUDE):
+                continue
+            files.append(rel)
+    return files
+
+
+def hash_tree(root, files, jobs=None):
+    """{rel: {'hash', 'size'}} for the given files, hashed in parallel"""
+    def entry(rel):
+        path = os.path.join(root, *rel.split('/'))
+        return rel, {'hash': buildgraph.hash_file(path), 'size': os.path.getsize(path)}
+
+    with tracing.span('deploy.hash', files=len(files)):
+        with ThreadPoolExecutor(max_workers=jobs) as pool:
+            return dict(pool.map(entry, files))
+
+
+def load_manifest(target):
+    try:
+        with open(os.path.join(target, MANIFEST_FILE), 'r', encoding='utf-8') as f:
+            return json.load(f).get('files', {})
+    except (FileNotFoundError, ValueError):
+        return {}
+
+
+def plan(source_files, target, previous):
+    """Split files into (to copy, unchanged, stale) against the previous manifest.
+
+    A file the manifest lists but which is missing or has another size at
+    the target is copied again, so hand edits on the host are repaired.
+    """
+    copy, unchanged = [], []
+    for rel, info in source_files.items():
+        old = previous.get(rel)
+        target_path = os.path.join(target, *rel.split('/'))
+        try:
+            target_size = os.path.getsize(target_path)
+        except OSError:
+            target_size = None
+        if old and old['hash'] == info['hash'] and target_size == info['size']:
+            unchanged.append(rel)
+        else:
+            copy.append(rel)
+    stale = sorted(rel for rel in previous if rel not in source_files)
+    return copy, unchanged, stale
+
+
+def copy_into(source, target, rel):
+    """Copy one file via a temporary name so visitors never get half a file"""
+    src = os.path.join(source, *rel.split('/'))
+    dest = os.path.join(target, *rel.split('/'))
+    os.makedirs(os.path.dirname(dest), exist_ok=True)
+    tmp_path = f"{dest}.deploy-tmp"
+    shutil.copy2(src, tmp_path)
+    os.replace(tmp_path, dest)
+
+
+def remove_stale(target, stale):
+    for rel in stale:
+        path = os.path.join(target, *rel.split('/'))
+        if os.path.isfile(path):
+            os.remove(path)
+        # Drop directories the removal emptied
+        directory = os.path.dirname(path)
+        while os.path.abspath(directory) != os.path.abspath(target) and os.path.isdir(directory) \
+                and not os.listdir(directory):
+            os.rmdir(directory)
+            directory = os.path.dirname(directory)
+
+
+def deploy(source=SOURCE_DIR, target=None, jobs=None, dry_run=False, log=print):
+    """Bring target in line with source; returns a summary dict"""
+    if not os.path.isdir(source):
+        raise FileNotFoundError(f"{source} does not exist; run build_site.py first")
+    started = time.perf_counter()
+    source_files = hash_tree(source, list_files(source), jobs)
+    previous = load_manifest(target)
+    copy, unchanged, stale = plan(source_files, target, previous)
+
+    total_bytes = sum(info['size'] for info in source_files.values())
+    copied_bytes = sum(source_files[rel]['size'] for rel in copy)
+    for rel in copy:
+        log(f"{'new' if rel not in previous else 'changed':<8} {rel} ({format_bytes(source_files[rel]['size'])})")
+    for rel in stale:
+        log(f"{'removed':<8} {rel}")
+
+    if not dry_run:
+        os.makedirs(target, exist_ok=True)
+        with tracing.span('deploy.copy', files=len(copy), bytes_written=copied_bytes):
+            with ThreadPoolExecutor(max_workers=jobs) as pool:
+                # list() re-raises the first copy error before anything is deleted
+                list(pool.map(lambda rel: copy_into(source, target, rel), copy))
+        # Stale files go last so the old pages keep working until the new ones are in place
+        remove_stale(target, stale)
+        manifest_path = os.path.join(target, MANIFEST_FILE)
+        tmp_path = f"{manifest_path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'files': source_files}, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, manifest_path)
+
+    return {
+        'copied': len(copy),
+        'unchanged': len(unchanged),
+        'removed': len(stale),
+        'copiedBytes': copied_bytes,
+        'totalBytes': total_bytes,
+        'savedBytes': total_bytes - copied_bytes,
+        'seconds': time.perf_counter() - started,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Publish the built site, copying only changed files")
+    parser.add_argument('target', help="Directory the site is published to")
+    parser.add_argument('--source', default=SOURCE_DIR, help="Built site (default: dist)")
+    parser.add_argument('--build', action='store_true', help="Run build_site.py into --source first")
+    parser.add_argument('--jobs', type=int, default=None, help="Parallel copies (default: automatic)")
+    parser.add_argument('--dry-run', action='store_true', help="Only report what would change")
+    args = parser.parse_args(argv)
+
+    if os.path.abspath(args.target) == os.path.abspath(args.source):
+        parser.error("target must differ from the source directory")
+    if args.build:
+        try:
+            build_site.build_site(output_dir=args.source, jobs=args.jobs)
+        except buildgraph.BuildError as e:
+            print(f"{Colors.RED}✗ {e}{Colors.END}")
+            return 1
+
+    try:
+        result = deploy(args.source, args.target, args.jobs, args.dry_run)
+    except OSError as e:
+        print(f"{Colors.RED}✗ Deploy failed: {e}{Colors.END}")
+        return 1
+
+    verb = "Would copy" if args.dry_run else "Copied"
+    print(f"\n{Colors.BOLD}{verb} {result['copied']} file(s), {result['unchanged']} unchanged, "
+          f"{result['removed']} removed{Colors.END}")
+    saved_pct = 100 * result['savedBytes'] / result['totalBytes'] if result['totalBytes'] else 0
+    print(f"{Colors.GREEN}Transferred {format_bytes(result['copiedBytes'])} of {format_bytes(result['totalBytes'])} "
+          f"({format_bytes(result['savedBytes'])} saved, {saved_pct:.0f}%) in {result['seconds']:.2f}s{Colors.END}")
+    return 0
+
+
+if __name__ == '__main__':
+    tracing.enable_from_argv(sys.argv)
+    sys.exit(main())
@@ -0,0 +1,184 @@
+"""
+Static project detail pages.
+
+The build writes one small page per project, projects/<id>.html, with the
+poster, the video (played in place for local files, linked for Vimeo and
+the like), description, tags, the project's own links and a few related
+projects. The pages need no script. A <base href="../"> lets them use the
+home page's URLs unchanged, so they share its stylesheet, self-hosted
+fonts and cache entries, and the build's stylesheet and font rewrites
+of index.html apply to them unchanged.
+
+Projects may list extra links:
+    {"title": "...", "links": [{"label": "Case study", "url": "https://..."}]}
+"""
+
+import re
+from html import escape
+from urllib.parse import quote
+
+VERSION = '1'
+PAGES_DIR = 'projects'
+RELATED_COUNT = 3
+VIDEO_EXTENSIONS = ('.mp4', '.webm')
+STYLESHEET_LINK = '<link rel="stylesheet" href="css/styles.css">'
+
+# config.theme key -> custom property, as applied by applyTheme() in main.js
+THEME_PROPERTIES = {
+    'primaryColor': '--color-dark-blue',
+    'secondaryColor': '--color-light-gray',
+    'backgroundColor': '--color-white',
+    'textColor': '--color-dark',
+}
+THEME_FONTS = {'fontHeading': '--font-heading', 'fontBody': '--font-body'}
+
+
+def page_path(project):
+    """Site-relative URL of a project's page"""
+    slug = re.sub(r'[^A-Za-z0-9_-]+', '-', str(project.get('id', ''))).strip('-') or 'project'
+    return f"{PAGES_DIR}/{slug}.html"
+
+
+def local_url(ref):
+    """A data reference as an attribute value; local paths may contain spaces"""
+    if ref.startswith(('http://', 'https://', '//', 'data:')):
+        return escape(ref)
+    return escape(quote(ref, safe="/:@&=+$,;~!*'()#%?"))
+
+
+def related_projects(project, projects, count=RELATED_COUNT):
+    """The projects sharing most tags with project, nearest year first"""
+    tags = set(project.get('tags') or [])
+    year = project.get('year') if isinstance(project.get('year'), int) else None
+    scored = []
+    for position, other in enumerate(projects):
+        if other is project or other.get('id') == project.get('id'):
+            continue
+        shared = len(tags & set(other.get('tags') or []))
+        if not shared:
+            continue
+        distance = abs(other['year'] - year) if year is not None and isinstance(other.get('year'), int) else 99
+        scored.append((-shared, distance, position, other))
+    return [other for *_, other in sorted(scored, key=lambda item: item[:3])[:count]]
+
+
+def theme_style(theme):
+    """:root overrides for the theme, matching what main.js applies on the home page"""
+    rules = [f"{prop}: {theme[key]};" for key, prop in THEME_PROPERTIES.items() if theme.get(key)]
+    rules += [f"{prop}: '{theme[key]}', sans-serif;" for key, prop in THEME_FONTS.items() if theme.get(key)]
+    return f"<style>:root {{ {' '.join(escape(rule, quote=False) for rule in rules)} }}</style>" if rules else ''
+
+
+def external_label(url):
+    host = re.sub(r'^(?:https?:)?//(?:www\.)?', '', url).split('/')[0]
+    return f"Watch on {host}" if host else "Watch"
+
+
+def _media(project):
+    title = escape(project.get('title', ''))
+    thumbnail = project.get('thumbnail', '')
+    video = project.get('videoUrl', '')
+    placeholder = project.get('placeholder')
+    style = f' style="background-color: {escape(placeholder["color"])};"' if placeholder else ''
+    if video.endswith(VIDEO_EXTENSIONS):
+        poster = f' poster="{local_url(thumbnail)}"' if thumbnail else ''
+        return (f'<video src="{local_url(video)}"{poster} controls playsinline preload="none"'
+                f' class="project-page-media"{style}></video>')
+    if thumbnail:
+        return f'<img src="{local_url(thumbnail)}" alt="{title}" class="project-page-media"{style}>'
+    return ''
+
+
+def render(project, data, fonts_block, related):
+    """The HTML of a project's page.
+
+    fonts_block is the home page's Google Fonts markup, kept so the
+    build's font rewrite can replace it the same way.
+    """
+    personal = data.get('personal', {})
+    config = data.get('config', {})
+    logo = config.get('logo', {})
+    name = personal.get('name', '')
+    title = project.get('title', '')
+    description = project.get('description', '')
+
+    if logo.get('type') == 'image' and logo.get('content'):
+        logo_html = f'<img src="{local_url(logo["content"])}" alt="Logo" style="height: 40px;">'
+    else:
+        logo_html = escape(logo.get('content') or name.split(' ')[0])
+
+    links = []
+    video = project.get('videoUrl', '')
+    if video and not video.endswith(VIDEO_EXTENSIONS):
+        links.append((external_label(video), video))
+    for link in project.get('links') or []:
+        if link.get('url'):
+            links.append((link.get('label') or link['url'], link['url']))
+    links_html = ''.join(
+        f'\n                    <a href="{local_url(url)}" class="btn {"btn-primary" if i == 0 else "btn-outline"}"'
+        f' target="_blank" rel="noopener noreferrer">{escape(label)}</a>'
+        for i, (label, url) in enumerate(links))
+
+    tags_html = ''.join(f'<span class="tag">{escape(str(tag))}</span>' for tag in project.get('tags') or [])
+    related_html = ''.join(
+        f'\n                    <a href="{escape(page_path(other))}" class="related-project">'
+        + (f'<img src="{local_url(other["thumbnail"])}" alt="" loading="lazy">' if other.get('thumbnail') else '')
+        + f'<span>{escape(other.get("title", ""))}</span></a>'
+        for other in related)
+
+    return f"""<!DOCTYPE html>
+<html lang="en">
+
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <meta name="description" content="{escape(description[:160])}">
+    <title>{escape(title)}{f" · {escape(name)}" if name else ""}</title>
+    <base href="../">
+{fonts_block}
+
+    <!-- Stylesheet -->
+    {STYLESHEET_LINK}
+    {theme_style(config.get('theme', {}))}
+</head>
+
+<body>
+    <nav class="navbar">
+        <div class="container">
+            <div class="nav-wrapper">
+                <a href="./" class="logo">{logo_html}</a>
+                <a href="./#showcase" class="nav-link">← All projects</a>
+            </div>
+        </div>
+    </nav>
+
+    <main class="section project-page">
+        <div class="container">
+            {_media(project)}
+            <div class="project-header">
+                <h1>{escape(title)}</h1>
+                <span class="project-year">{escape(str(project.get('year', '')))}</span>
+            </div>
+            <p class="project-page-description">{escape(description)}</p>
+            <div class="project-tags">{tags_html}</div>
+            <div class="project-page-links">{links_html}
+            </div>{f'''
+            <section class="related-projects">
+                <h2>Related projects</h2>
+                <div class="related-grid">{related_html}
+                </div>
+            </section>''' if related else ''}
+        </div>
+    </main>
+
+    <footer class="footer">
+        <div class="container">
+            <div class="footer-content">
+                <p>&copy; {escape(name)}</p>
+            </div>
+        </div>
+    </footer>
+</body>
+
+</html>
+"""
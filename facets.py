@@ -0,0 +1,64 @@
+"""
+Showcase filter facets.
+
+For each facet (project tags and year) the build lists the values with
+their project counts and a bitset over project ordinals, i.e. positions
+in data['projects']. The page combines selected chips with bitwise OR
+within a facet and AND across facets, and recounts every chip with one
+AND and a popcount, without scanning the projects.
+
+Bitsets are little-endian 32-bit words, base64-encoded:
+    "facets": {
+      "size": 120,
+      "fields": [
+        {"field": "tags", "values": [{"value": "Branding", "count": 14, "bits": "..."}, ...]},
+        {"field": "year", "values": [...]}
+      ]
+    }
+"""
+
+import base64
+
+FACET_FIELDS = ('tags', 'year')
+
+
+def encode_bitset(ordinals, size):
+    words = bytearray(((size + 31) // 32) * 4)
+    for ordinal in ordinals:
+        words[ordinal >> 3] |= 1 << (ordinal & 7)
+    return base64.b64encode(bytes(words)).decode('ascii')
+
+
+def decode_bitset(encoded):
+    """Ordinals set in an encoded bitset"""
+    data = base64.b64decode(encoded)
+    return [i * 8 + bit for i, byte in enumerate(data) for bit in range(8) if byte >> bit & 1]
+
+
+def _values(project, field):
+    value = project.get(field)
+    if value is None:
+        return []
+    values = value if isinstance(value, list) else [value]
+    # Years are numbers in some entries and strings in others
+    return list(dict.fromkeys(str(v).strip() for v in values if v is not None and str(v).strip()))
+
+
+def build_facets(projects):
+    """The facets block for a list of projects"""
+    fields = []
+    for field in FACET_FIELDS:
+        ordinals = {}
+        for ordinal, project in enumerate(projects):
+            for value in _values(project, field):
+                ordinals.setdefault(value, []).append(ordinal)
+        if field == 'year':
+            order = sorted(ordinals, reverse=True)
+        else:
+            order = sorted(ordinals, key=lambda v: (-len(ordinals[v]), v.lower()))
+        fields.append({
+            'field': field,
+            'values': [{'value': value, 'count': len(ordinals[value]),
+                        'bits': encode_bitset(ordinals[value], len(projects))} for value in order],
+        })
+    return {'size': len(projects), 'fields': fields}
@@ -0,0 +1,437 @@
+"""
+Self-hosted, subset web fonts.
+
+Built pages can serve the site's own font files instead of Google Fonts.
+A site puts TrueType/OpenType files in assets/fonts/. For each family
+the page uses and each weight its stylesheet asks for, the build writes
+two zlib-compressed WOFF files:
+
+    fonts/<family>-<weight>[-italic].woff        the characters the site shows
+    fonts/<family>-<weight>[-italic].rest.woff   every other character of the font
+
+The second face has the complementary unicode-range, so browsers only
+fetch it when text added after the build needs a character the first
+one lacks.
+
+Subsetting keeps glyph ids as they are and empties the glyphs that are
+not needed, so hmtx and GPOS stay valid without being rewritten.
+GSUB is dropped because its substitutions could point at emptied glyphs.
+Fonts with CFF outlines or variation tables can't be subset this way and
+are converted to WOFF whole.
+"""
+
+import json
+import re
+import struct
+import zlib
+from html.parser import HTMLParser
+
+VERSION = '1'
+FONT_EXTENSIONS = ('.ttf', '.otf')
+
+# Tables that survive subsetting; anything else (GSUB, hdmx, LTSH, VDMX,
+# DSIG, ...) depends on glyphs or bytes that change
+KEEP_TABLES = ('OS/2', 'cmap', 'cvt ', 'fpgm', 'gasp', 'glyf', 'head', 'hhea', 'hmtx', 'kern',
+               'loca', 'maxp', 'name', 'post', 'prep', 'GDEF', 'GPOS')
+# Always kept so UI text generated by the page (and most later edits) renders
+BASE_CODEPOINTS = set(range(0x20, 0x7f))
+
+# Composite glyph flags
+ARG_1_AND_2_ARE_WORDS = 0x0001
+WE_HAVE_A_SCALE = 0x0008
+MORE_COMPONENTS = 0x0020
+WE_HAVE_AN_X_AND_Y_SCALE = 0x0040
+WE_HAVE_A_TWO_BY_TWO = 0x0080
+
+
+class FontError(ValueError):
+    """A font file could not be read"""
+
+
+# ========================================
+# SFNT
+# ========================================
+
+def read_font(data):
+    """(sfnt version, {tag: table bytes}) of a TrueType/OpenType file"""
+    if len(data) < 12:
+        raise FontError("file is too short to be a font")
+    flavor, num_tables = struct.unpack('>4sH', data[:6])
+    if flavor not in (b'\x00\x01\x00\x00', b'OTTO', b'true'):
+        raise FontError("not a TrueType or OpenType font (collections and WOFF files are not supported)")
+    tables = {}
+    for i in range(num_tables):
+        tag, _, offset, length = struct.unpack('>4sIII', data[12 + 16 * i:28 + 16 * i])
+        tables[tag.decode('latin-1')] = data[offset:offset + length]
+    return flavor, tables
+
+
+def checksum(data):
+    data += b'\0' * (-len(data) % 4)
+    return sum(struct.unpack(f'>{len(data) // 4}I', data)) & 0xffffffff
+
+
+def write_font(flavor, tables):
+    """sfnt bytes for the tables, with head.checkSumAdjustment filled in"""
+    tags = sorted(tables)
+    tables = dict(tables)
+    tables['head'] = tables['head'][:8] + b'\0\0\0\0' + tables['head'][12:]
+    search = 1 << (len(tags).bit_length() - 1)
+    header = struct.pack('>4sHHHH', flavor, len(tags), search * 16, search.bit_length() - 1,
+                         len(tags) * 16 - search * 16)
+    offset = 12 + 16 * len(tags)
+    directory, body = [], []
+    for tag in tags:
+        table = tables[tag]
+        directory.append(struct.pack('>4sIII', tag.encode('latin-1'), checksum(table), offset, len(table)))
+        body.append(table + b'\0' * (-len(table) % 4))
+        offset += len(body[-1])
+    font = header + b''.join(directory) + b''.join(body)
+    adjustment = (0xb1b0afba - checksum(font)) & 0xffffffff
+    head_offset = struct.unpack('>I', directory[tags.index('head')][8:12])[0]
+    return font[:head_offset + 8] + struct.pack('>I', adjustment) + font[head_offset + 12:]
+
+
+def to_woff(font):
+    """WOFF 1.0 wrapping of sfnt bytes, each table zlib-compressed when that helps"""
+    flavor, tables = read_font(font)
+    tags = sorted(tables)
+    offset = 44 + 20 * len(tags)
+    directory, body = [], []
+    for tag in tags:
+        table = tables[tag]
+        packed = zlib.compress(table, 9)
+        if len(packed) >= len(table):
+            packed = table
+        directory.append(struct.pack('>4sIIII', tag.encode('latin-1'), offset, len(packed), len(table),
+                                     checksum(table)))
+        body.append(packed + b'\0' * (-len(packed) % 4))
+        offset += len(body[-1])
+    sfnt_size = 12 + 16 * len(tags) + sum(len(tables[tag]) + (-len(tables[tag]) % 4) for tag in tags)
+    header = struct.pack('>4s4sIHHIHHIIIII', b'wOFF', flavor, offset, len(tags), 0, sfnt_size,
+                         1, 0, 0, 0, 0, 0, 0)
+    return header + b''.join(directory) + b''.join(body)
+
+
+# ========================================
+# FONT INFO
+# ========================================
+
+def _name(tables, name_id):
+    data = tables.get('name', b'')
+    if len(data) < 6:
+        return None
+    count, strings = struct.unpack('>HH', data[2:6])
+    found = {}
+    for i in range(count):
+        platform, encoding, _, nid, length, offset = struct.unpack('>6H', data[6 + 12 * i:18 + 12 * i])
+        if nid != name_id:
+            continue
+        raw = data[strings + offset:strings + offset + length]
+        if platform == 3 or platform == 0:
+            found.setdefault('unicode', raw.decode('utf-16-be', 'replace'))
+        elif platform == 1 and encoding == 0:
+            found.setdefault('mac', raw.decode('mac-roman', 'replace'))
+    return found.get('unicode') or found.get('mac')
+
+
+def font_info(tables):
+    """family, weight and italic flag of a font"""
+    os2 = tables.get('OS/2', b'')
+    weight = struct.unpack('>H', os2[4:6])[0] if len(os2) >= 6 else 400
+    italic = bool(struct.unpack('>H', os2[62:64])[0] & 1) if len(os2) >= 64 else False
+    # The typographic family groups all weights; the legacy one can be "Inter Bold"
+    family = _name(tables, 16) or _name(tables, 1)
+    if not family:
+        raise FontError("font has no family name")
+    return {'family': family, 'weight': weight, 'italic': italic}
+
+
+def can_subset(tables):
+    return 'glyf' in tables and 'loca' in tables and 'fvar' not in tables
+
+
+# ========================================
+# CMAP
+# ========================================
+
+def read_cmap(tables):
+    """{codepoint: glyph id} from the best Unicode subtable"""
+    data = tables['cmap']
+    count = struct.unpack('>H', data[2:4])[0]
+    subtables = {}
+    for i in range(count):
+        platform, encoding, offset = struct.unpack('>HHI', data[4 + 8 * i:12 + 8 * i])
+        subtables[(platform, encoding)] = offset
+    for key in ((3, 10), (0, 4), (0, 6), (3, 1), (0, 3), (0, 2), (0, 1), (0, 0)):
+        if key not in subtables:
+            continue
+        offset = subtables[key]
+        fmt = struct.unpack('>H', data[offset:offset + 2])[0]
+        if fmt == 12:
+            return _read_cmap12(data, offset)
+        if fmt == 4:
+            return _read_cmap4(data, offset)
+    raise FontError("font has no Unicode cmap (format 4 or 12)")
+
+
+def _read_cmap4(data, offset):
+    seg_count = struct.unpack('>H', data[offset + 6:offset + 8])[0] // 2
+    arrays = offset + 14
+    ends = struct.unpack(f'>{seg_count}H', data[arrays:arrays + 2 * seg_count])
+    starts_at = arrays + 2 * seg_count + 2
+    starts = struct.unpack(f'>{seg_count}H', data[starts_at:starts_at + 2 * seg_count])
+    deltas = struct.unpack(f'>{seg_count}h', data[starts_at + 2 * seg_count:starts_at + 4 * seg_count])
+    ranges_at = starts_at + 4 * seg_count
+    range_offsets = struct.unpack(f'>{seg_count}H', data[ranges_at:ranges_at + 2 * seg_count])
+    mapping = {}
+    for i in range(seg_count):
+        for code in range(starts[i], ends[i] + 1):
+            if code == 0xffff:
+                continue
+            if range_offsets[i] == 0:
+                glyph = (code + deltas[i]) & 0xffff
+            else:
+                at = ranges_at + 2 * i + range_offsets[i] + 2 * (code - starts[i])
+                glyph = struct.unpack('>H', data[at:at + 2])[0]
+                if glyph:
+                    glyph = (glyph + deltas[i]) & 0xffff
+            if glyph:
+                mapping[code] = glyph
+    return mapping
+
+
+def _read_cmap12(data, offset):
+    groups = struct.unpack('>I', data[offset + 12:offset + 16])[0]
+    mapping = {}
+    for i in range(groups):
+        start, end, glyph = struct.unpack('>III', data[offset + 16 + 12 * i:offset + 28 + 12 * i])
+        for code in range(start, end + 1):
+            mapping[code] = glyph + code - start
+    return mapping
+
+
+def _runs(mapping):
+    """(first code, last code, first glyph) runs where glyph ids follow the codes"""
+    runs = []
+    for code in sorted(mapping):
+        glyph = mapping[code]
+        if runs and code == runs[-1][1] + 1 and glyph == runs[-1][2] + code - runs[-1][0]:
+            runs[-1][1] = code
+        else:
+            runs.append([code, code, glyph])
+    return runs
+
+
+def build_cmap(mapping):
+    """A cmap with a format 4 subtable, plus format 12 when there are non-BMP codes"""
+    bmp = {code: glyph for code, glyph in mapping.items() if code < 0xffff}
+    segments = [(first, last, (glyph - first) & 0xffff) for first, last, glyph in _runs(bmp)]
+    segments.append((0xffff, 0xffff, 1))
+    count = len(segments)
+    search = 1 << (count.bit_length() - 1)
+    fmt4 = struct.pack('>HHHHHHH', 4, 16 + 8 * count, 0, 2 * count, 2 * search, search.bit_length() - 1,
+                       2 * count - 2 * search)
+    fmt4 += struct.pack(f'>{count}H', *(last for _, last, _ in segments)) + b'\0\0'
+    fmt4 += struct.pack(f'>{count}H', *(first for first, _, _ in segments))
+    fmt4 += struct.pack(f'>{count}H', *(delta for _, _, delta in segments))
+    fmt4 += b'\0\0' * count
+
+    subtables = [((3, 1), fmt4)]
+    if any(code > 0xffff for code in mapping):
+        runs = _runs(mapping)
+        fmt12 = struct.pack('>HHIII', 12, 0, 16 + 12 * len(runs), 0, len(runs))
+        fmt12 += b''.join(struct.pack('>III', *run) for run in runs)
+        subtables.append(((3, 10), fmt12))
+    header = struct.pack('>HH', 0, len(subtables))
+    offset = 4 + 8 * len(subtables)
+    body = b''
+    for (platform, encoding), table in subtables:
+        header += struct.pack('>HHI', platform, encoding, offset + len(body))
+        body += table
+    return header + body
+
+
+# ========================================
+# SUBSETTING
+# ========================================
+
+def _glyph_offsets(tables):
+    num_glyphs = struct.unpack('>H', tables['maxp'][4:6])[0]
+    long_format = struct.unpack('>h', tables['head'][50:52])[0] == 1
+    loca = tables['loca']
+    if long_format:
+        return struct.unpack(f'>{num_glyphs + 1}I', loca[:4 * (num_glyphs + 1)])
+    return [offset * 2 for offset in struct.unpack(f'>{num_glyphs + 1}H', loca[:2 * (num_glyphs + 1)])]
+
+
+def _components(glyph):
+    """Glyph ids a composite glyph is built from"""
+    if len(glyph) < 10 or struct.unpack('>h', glyph[:2])[0] >= 0:
+        return []
+    found = []
+    pos = 10
+    while True:
+        flags, component = struct.unpack('>HH', glyph[pos:pos + 4])
+        found.append(component)
+        pos += 4 + (4 if flags & ARG_1_AND_2_ARE_WORDS else 2)
+        if flags & WE_HAVE_A_SCALE:
+            pos += 2
+        elif flags & WE_HAVE_AN_X_AND_Y_SCALE:
+            pos += 4
+        elif flags & WE_HAVE_A_TWO_BY_TWO:
+            pos += 8
+        if not flags & MORE_COMPONENTS:
+            return found
+
+
+def subset(tables, codepoints):
+    """Tables keeping only the glyphs for codepoints (and .notdef); glyph ids don't change"""
+    mapping = {code: glyph for code, glyph in read_cmap(tables).items() if code in codepoints}
+    offsets = _glyph_offsets(tables)
+    glyf = tables['glyf']
+
+    keep = {0}
+    pending = list(mapping.values())
+    while pending:
+        glyph = pending.pop()
+        if glyph in keep or glyph >= len(offsets) - 1:
+            continue
+        keep.add(glyph)
+        pending.extend(_components(glyf[offsets[glyph]:offsets[glyph + 1]]))
+
+    new_glyf, new_offsets = [], [0]
+    for glyph in range(len(offsets) - 1):
+        data = glyf[offsets[glyph]:offsets[glyph + 1]] if glyph in keep else b''
+        data += b'\0' * (-len(data) % 4)
+        new_glyf.append(data)
+        new_offsets.append(new_offsets[-1] + len(data))
+
+    result = {tag: data for tag, data in tables.items() if tag in KEEP_TABLES}
+    if 'GPOS' in result:
+        # Browsers kern with GPOS when a font has it; the old kern table is dead weight
+        result.pop('kern', None)
+    result['glyf'] = b''.join(new_glyf)
+    long_format = new_offsets[-1] > 0x1fffe
+    if long_format:
+        result['loca'] = struct.pack(f'>{len(new_offsets)}I', *new_offsets)
+    else:
+        result['loca'] = struct.pack(f'>{len(new_offsets)}H', *(offset // 2 for offset in new_offsets))
+    head = tables['head']
+    result['head'] = head[:50] + struct.pack('>h', 1 if long_format else 0) + head[52:]
+    result['cmap'] = build_cmap(mapping)
+    if 'post' in tables:
+        # Version 3 has no glyph names, which would otherwise name every glyph
+        result['post'] = struct.pack('>I', 0x00030000) + tables['post'][4:32]
+    return result, set(mapping)
+
+
+def convert(data, codepoints=None):
+    """WOFF bytes of a font, subset to codepoints when given and possible.
+
+    Returns (woff bytes, codepoints the output covers).
+    """
+    flavor, tables = read_font(data)
+    if codepoints is None or not can_subset(tables):
+        covered = set(read_cmap(tables)) if 'cmap' in tables else set()
+        if codepoints is not None:
+            covered &= codepoints
+        return to_woff(data), covered
+    tables, covered = subset(tables, codepoints)
+    return to_woff(write_font(flavor, tables)), covered
+
+
+def mapped_codepoints(data):
+    return set(read_cmap(read_font(data)[1]))
+
+
+# ========================================
+# USAGE
+# ========================================
+
+class _TextCollector(HTMLParser):
+    def __init__(self):
+        super().__init__()
+        self.text = []
+        self._skip = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in ('script', 'style'):
+            self._skip += 1
+        for name, value in attrs:
+            if name in ('alt', 'title', 'placeholder', 'aria-label') and value:
+                self.text.append(value)
+
+    def handle_endtag(self, tag):
+        if tag in ('script', 'style'):
+            self._skip = max(self._skip - 1, 0)
+
+    def handle_data(self, data):
+        if not self._skip:
+            self.text.append(data)
+
+
+def _strings(value):
+    if isinstance(value, str):
+        yield value
+    elif isinstance(value, dict):
+        for item in value.values():
+            yield from _strings(item)
+    elif isinstance(value, list):
+        for item in value:
+            yield from _strings(item)
+
+
+def used_codepoints(data, html, scripts=()):
+    """Characters the page can show: its text, the data, and non-ASCII characters in its scripts"""
+    collector = _TextCollector()
+    collector.feed(html)
+    codepoints = set(BASE_CODEPOINTS)
+    for text in collector.text + list(_strings(data)):
+        codepoints.update(ord(char) for char in text)
+    for script in scripts:
+        codepoints.update(ord(char) for char in script if ord(char) > 0x7f)
+    return {code for code in codepoints if code >= 0x20}
+
+
+def used_weights(css):
+    """Numeric font weights a stylesheet asks for, with the defaults for body and bold text"""
+    weights = {400, 700}
+    for value in re.findall(r'font-weight\s*:\s*([0-9]{3}|bold|normal)', css):
+        weights.add({'bold': 700, 'normal': 400}.get(value, None) or int(value))
+    return weights
+
+
+def css_families(css):
+    """{custom property: first family} for the --font-* properties of a stylesheet"""
+    return {name: family for name, family in
+            re.findall(r'(--font-[\w-]+)\s*:\s*[\'"]([^\'"]+)[\'"]', css)}
+
+
+def unicode_range(codepoints):
+    """CSS unicode-range value for a set of codepoints, e.g. U+20-7E, U+E9"""
+    runs = []
+    for code in sorted(codepoints):
+        if runs and code == runs[-1][1] + 1:
+            runs[-1][1] = code
+        else:
+            runs.append([code, code])
+    return ', '.join(f"U+{first:X}" if first == last else f"U+{first:X}-{last:X}" for first, last in runs)
+
+
+def file_stem(info):
+    family = re.sub(r'[^a-z0-9]+', '-', info['family'].lower()).strip('-')
+    return f"{family}-{info['weight']}{'-italic' if info['italic'] else ''}"
+
+
+def font_face(info, url, codepoints):
+    rules = [
+        f"font-family: {json.dumps(info['family'])};",
+        f"font-style: {'italic' if info['italic'] else 'normal'};",
+        f"font-weight: {info['weight']};",
+        "font-display: swap;",
+        f"src: url('{url}') format('woff');",
+    ]
+    if codepoints is not None:
+        rules.append(f"unicode-range: {unicode_range(codepoints)};")
+    return "@font-face { " + ' '.join(rules) + " }"
@@ -1,21 +1,32 @@
 import sys
-import json
 import os
-import shutil
 from PyQt5.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, 
                              QTabWidget, QLabel, QLineEdit, QTextEdit, QPushButton, 
                              QColorDialog, QFileDialog, QMessageBox, QFormLayout, 
                              QListWidget, QScrollArea, QFrame, QComboBox, QSplitter, QSlider)
-from PyQt5.QtCore import Qt, QSize
+from PyQt5.QtCore import Qt, QSize, pyqtSignal
 from PyQt5.QtGui import QIcon, QFont, QColor
 
+import budget
+import jobs
+import storage
+import tracing
+import ui_watchdog
+
+tracing.enable_from_argv(sys.argv)
+ui_watchdog.enable_from_argv(sys.argv)
+
 # Configuration
-DATA_FILE = 'data/portfolio-data.json'
-ASSETS_DIR = 'assets'
+DATA_FILE = os.environ.get('PORTFOLIO_DATA_FILE', 'data/portfolio-data.json')
+SITE_DATA_FILE = 'data/portfolio-data.json'
+ASSETS_DIR = os.environ.get('PORTFOLIO_ASSETS_DIR', 'assets')
 PROJECTS_DIR = os.path.join(ASSETS_DIR, 'projects')
 VIDEOS_DIR = os.path.join(ASSETS_DIR, 'videos')
 
 class PortfolioApp(QMainWindow):
+    # Background job status, emitted from the runner's threads
+    jobs_status = pyqtSignal(str)
+
     def __init__(self):
         super().__init__()
         self.setWindowTitle("Portfolio Content Manager (Professional)")
@@ -35,40 +46,95 @@ class PortfolioApp(QMainWindow):
             QListWidget { border: 1px solid #d1d5db; border-radius: 4px; padding: 5px; }
         """)
         
+        self.store = storage.open_store(DATA_FILE)
         self.data = self.load_data()
+        # Uploads are copied by background jobs; unfinished ones resume here
+        self.jobs = jobs.Runner(jobs.queue_path(DATA_FILE), on_status=self.jobs_status.emit)
+        # Windows deleted without being closed (e.g. by the benchmarks) stop it too
+        self.destroyed.connect(lambda _=None, runner=self.jobs: runner.stop())
+        # Copy job id -> destination, for uploads the form already points at
+        self.pending_uploads = {}
         self.init_ui()
+        self.jobs.start()
 
+    @tracing.traced()
     def load_data(self):
         try:
-            with open(DATA_FILE, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                # Ensure config exists
-                if 'config' not in data:
-                    data['config'] = {
-                        "theme": {
-                            "primaryColor": "#1E3A8A",
-                            "secondaryColor": "#F3F4F6",
-                            "backgroundColor": "#FFFFFF",
-                            "textColor": "#111827",
-                            "fontHeading": "Outfit",
-                            "fontBody": "Plus Jakarta Sans"
-                        },
-                        "logo": {"type": "text", "content": "Portfolio"}
-                    }
-                return data
+            data = self.store.load()
+            # Ensure config exists
+            if 'config' not in data:
+                data['config'] = {
+                    "theme": {
+                        "primaryColor": "#1E3A8A",
+                        "secondaryColor": "#F3F4F6",
+                        "backgroundColor": "#FFFFFF",
+                        "textColor": "#111827",
+                        "fontHeading": "Outfit",
+                        "fontBody": "Plus Jakarta Sans"
+                    },
+                    "logo": {"type": "text", "content": "Portfolio"}
+                }
+            return data
         except Exception as e:
             QMessageBox.critical(self, "Error", f"Failed to load data: {e}")
             return {}
 
+    @tracing.traced()
+    def write_data(self):
+        """Save through the store, merging with concurrent edits; returns False if the user cancelled"""
+        if not self.uploads_ready():
+            return False
+        self.update_data_from_ui()
+        try:
+            saved = self.store.save(self.data)
+        except storage.ConflictError as e:
+            answer = QMessageBox.question(
+                self, "Conflicting Changes",
+                "Someone else changed the same fields since you opened the data:\n\n"
+                + "\n".join(e.conflicts)
+                + "\n\nOverwrite their changes with yours?")
+            if answer != QMessageBox.Yes:
+                return False
+            saved = self.store.save(self.data, force=True)
+        if saved is not self.data:
+            # Other writers' edits were merged in; show them
+            self.data = saved
+            self.init_tabs()
+        return True
+
+    def warn_over_budget(self):
+        """Point out oversized uploads right away instead of after a deploy"""
+        try:
+            _, violations = budget.check_source(self.data, ASSETS_DIR)
+        except (OSError, ValueError):
+            return
+        if violations:
+            message = "The site is over its page-weight budget:\n\n" + "\n".join(v.message for v in violations)
+            QMessageBox.warning(self, "Page Weight", message)
+
+    @tracing.traced()
     def save_data(self):
         try:
-            self.update_data_from_ui()
-            with open(DATA_FILE, 'w', encoding='utf-8') as f:
-                json.dump(self.data, f, indent=2, ensure_ascii=False)
-            QMessageBox.information(self, "Success", "Data saved successfully! Refresh your website to see changes.")
+            if not self.write_data():
+                return
+            self.warn_over_budget()
+            if self.store.kind == 'sqlite':
+                QMessageBox.information(self, "Success", "Data saved successfully! Publish to update your website.")
+            else:
+                QMessageBox.information(self, "Success", "Data saved successfully! Refresh your website to see changes.")
         except Exception as e:
             QMessageBox.critical(self, "Error", f"Failed to save data: {e}")
 
+    @tracing.traced()
+    def publish_data(self):
+        try:
+            if not self.write_data():
+                return
+            self.store.export_json(SITE_DATA_FILE)
+            QMessageBox.information(self, "Success", f"Published {SITE_DATA_FILE}. Refresh your website to see changes.")
+        except Exception as e:
+            QMessageBox.critical(self, "Error", f"Failed to publish data: {e}")
+
     def init_ui(self):
         main_widget = QWidget()
         self.setCentralWidget(main_widget)
@@ -84,11 +150,55 @@ class PortfolioApp(QMainWindow):
         save_btn.clicked.connect(self.save_data)
         save_btn.setMinimumWidth(150)
         header_layout.addWidget(save_btn)
+        if self.store.kind == 'sqlite':
+            publish_btn = QPushButton("Publish Site")
+            publish_btn.clicked.connect(self.publish_data)
+            header_layout.addWidget(publish_btn)
         layout.addLayout(header_layout)
         
         # Tabs
         self.tabs = QTabWidget()
         layout.addWidget(self.tabs)
+        self.init_tabs()
+
+        # Background job status; the signal is queued across threads, so
+        # the label is only ever touched on the UI thread
+        self.jobs_label = QLabel()
+        self.statusBar().addPermanentWidget(self.jobs_label)
+        self.jobs_status.connect(self.jobs_label.setText)
+
+    def enqueue_copy(self, src, dest):
+        """Copy a file in the background; the status bar shows its progress"""
+        job_id = self.jobs.enqueue('copy', {'src': src, 'dest': dest}, priority=jobs.INTERACTIVE)
+        self.pending_uploads[job_id] = dest
+
+    def uploads_ready(self):
+        """False, after telling the user, while the form points at files that are not copied yet"""
+        unfinished, failed = jobs.pending_outputs(self.jobs.queue, self.pending_uploads)
+        if failed:
+            QMessageBox.warning(self, "Upload Failed",
+                                "These uploads could not be copied:\n\n" + "\n".join(failed)
+                                + "\n\nUpload them again or change the paths before saving.")
+            return False
+        if unfinished:
+            QMessageBox.information(self, "Uploads in Progress",
+                                    "These uploads are still being copied:\n\n" + "\n".join(unfinished)
+                                    + "\n\nSave again once the status bar shows they are done.")
+            return False
+        return True
+
+    def closeEvent(self, event):
+        # Interrupted copies are queued again and finish on the next start
+        self.jobs.stop()
+        super().closeEvent(event)
+
+    @tracing.traced()
+    def init_tabs(self):
+        current = self.tabs.currentIndex()
+        while self.tabs.count():
+            widget = self.tabs.widget(0)
+            self.tabs.removeTab(0)
+            widget.deleteLater()
         
         self.init_general_tab()
         self.init_theme_tab()
@@ -96,6 +206,8 @@ class PortfolioApp(QMainWindow):
         self.init_skills_tab()
         self.init_projects_tab()
         self.init_contact_tab()
+        if current >= 0:
+            self.tabs.setCurrentIndex(current)
 
     def create_form_row(self, layout, label_text, value, var_attr=None):
         row = QHBoxLayout()
@@ -112,6 +224,7 @@ class PortfolioApp(QMainWindow):
     # ==========================================
     # TAB 1: GENERAL
     # ==========================================
+    @tracing.traced()
     def init_general_tab(self):
         tab = QWidget()
         layout = QVBoxLayout(tab)
@@ -161,12 +274,13 @@ class PortfolioApp(QMainWindow):
         layout.addStretch()
         self.tabs.addTab(tab, "General")
 
+    @tracing.traced()
     def upload_logo(self):
         fname, _ = QFileDialog.getOpenFileName(self, 'Open file', '', "Image files (*.jpg *.png *.svg)")
         if fname:
             dest = os.path.join(ASSETS_DIR, os.path.basename(fname))
             try:
-                shutil.copy2(fname, dest)
+                self.enqueue_copy(fname, dest)
                 self.logo_content_input.setText(dest)
                 self.logo_type_combo.setCurrentText("image")
             except Exception as e:
@@ -175,6 +289,7 @@ class PortfolioApp(QMainWindow):
     # ==========================================
     # TAB 2: THEME
     # ==========================================
+    @tracing.traced()
     def init_theme_tab(self):
         tab = QWidget()
         layout = QVBoxLayout(tab)
@@ -239,6 +354,7 @@ class PortfolioApp(QMainWindow):
     # ==========================================
     # TAB 3: ABOUT
     # ==========================================
+    @tracing.traced()
     def init_about_tab(self):
         tab = QWidget()
         layout = QVBoxLayout(tab)
@@ -295,6 +411,7 @@ class PortfolioApp(QMainWindow):
     # ==========================================
     # TAB 4: SKILLS
     # ==========================================
+    @tracing.traced()
     def init_skills_tab(self):
         tab = QWidget()
         layout = QHBoxLayout(tab)
@@ -347,6 +464,7 @@ class PortfolioApp(QMainWindow):
         self.refresh_skills_list()
         self.tabs.addTab(tab, "Tools")
         
+    @tracing.traced()
     def refresh_skills_list(self):
         self.skills_list_widget.clear()
         for skill in self.data['skills']:
@@ -393,6 +511,7 @@ class PortfolioApp(QMainWindow):
     # ==========================================
     # TAB 5: PROJECTS
     # ==========================================
+    @tracing.traced()
     def init_projects_tab(self):
         tab = QWidget()
         layout = QHBoxLayout(tab)
@@ -457,17 +576,19 @@ class PortfolioApp(QMainWindow):
         self.refresh_projects_list()
         self.tabs.addTab(tab, "Projects")
 
+    @tracing.traced()
     def upload_file(self, input_field, target_dir):
         fname, _ = QFileDialog.getOpenFileName(self, 'Open file', '')
         if fname:
             os.makedirs(target_dir, exist_ok=True)
             dest = os.path.join(target_dir, os.path.basename(fname))
             try:
-                shutil.copy2(fname, dest)
+                self.enqueue_copy(fname, dest)
                 input_field.setText(dest)
             except Exception as e:
                 QMessageBox.critical(self, "Error", str(e))
 
+    @tracing.traced()
     def refresh_projects_list(self):
         self.proj_list_widget.clear()
         for proj in self.data['projects']:
@@ -523,6 +644,7 @@ class PortfolioApp(QMainWindow):
     # ==========================================
     # TAB 6: CONTACT
     # ==========================================
+    @tracing.traced()
     def init_contact_tab(self):
         tab = QWidget()
         layout = QVBoxLayout(tab)
@@ -578,6 +700,7 @@ class PortfolioApp(QMainWindow):
 
 if __name__ == "__main__":
     app = QApplication(sys.argv)
+    ui_watchdog.attach_qt(app)
     
     # Set global font
     font = QFont("Segoe UI", 10)
@@ -1,13 +1,22 @@
 import tkinter as tk
 from tkinter import ttk, filedialog, colorchooser, messagebox
-import json
 import os
-import shutil
+import sys
 from pathlib import Path
 
+import budget
+import jobs
+import storage
+import tracing
+import ui_watchdog
+
+tracing.enable_from_argv(sys.argv)
+ui_watchdog.enable_from_argv(sys.argv)
+
 # Configuration
-DATA_FILE = 'data/portfolio-data.json'
-ASSETS_DIR = 'assets'
+DATA_FILE = os.environ.get('PORTFOLIO_DATA_FILE', 'data/portfolio-data.json')
+SITE_DATA_FILE = 'data/portfolio-data.json'
+ASSETS_DIR = os.environ.get('PORTFOLIO_ASSETS_DIR', 'assets')
 PROJECTS_DIR = os.path.join(ASSETS_DIR, 'projects')
 VIDEOS_DIR = os.path.join(ASSETS_DIR, 'videos')
 
@@ -22,60 +31,166 @@ class PortfolioManagerGUI:
         self.style.theme_use('clam')
         
         # Load Data
+        self.store = storage.open_store(DATA_FILE)
         self.data = self.load_data()
+
+        # Uploads are copied by background jobs; unfinished ones resume here
+        # The runner's threads leave the latest status here; Tk is only touched from this thread
+        self.jobs_status = ''
+        self.jobs = jobs.Runner(jobs.queue_path(DATA_FILE), on_status=self.set_jobs_status)
+        self.jobs.start()
+        # Copy job id -> destination, for uploads the form already points at
+        self.pending_uploads = {}
+        # However the window goes away, the runner stops with it
+        self.root.bind('<Destroy>', self.on_destroy, add='+')
         
         # Create Notebook (Tabs)
         self.notebook = ttk.Notebook(root)
         self.notebook.pack(fill='both', expand=True, padx=10, pady=10)
         
         # Initialize Tabs
+        self.init_tabs()
+        
+        # Save Button
+        save_frame = ttk.Frame(root)
+        save_frame.pack(fill='x', padx=10, pady=10)
+        ttk.Button(save_frame, text="Save All Changes", command=self.save_data, width=20).pack(side='right')
+        if self.store.kind == 'sqlite':
+            ttk.Button(save_frame, text="Publish Site", command=self.publish_data, width=20).pack(side='right', padx=5)
+        self.jobs_var = tk.StringVar()
+        ttk.Label(save_frame, textvariable=self.jobs_var).pack(side='left')
+        self.refresh_jobs_status()
+
+    def set_jobs_status(self, line):
+        self.jobs_status = line
+
+    def refresh_jobs_status(self):
+        if self.jobs_var.get() != self.jobs_status:
+            self.jobs_var.set(self.jobs_status)
+        self.root.after(500, self.refresh_jobs_status)
+
+    def enqueue_copy(self, src, dest):
+        """Copy a file in the background; the status line shows its progress"""
+        job_id = self.jobs.enqueue('copy', {'src': src, 'dest': dest}, priority=jobs.INTERACTIVE)
+        self.pending_uploads[job_id] = dest
+
+    def uploads_ready(self):
+        """False, after telling the user, while the form points at files that are not copied yet"""
+        unfinished, failed = jobs.pending_outputs(self.jobs.queue, self.pending_uploads)
+        if failed:
+            messagebox.showwarning("Upload Failed",
+                                   "These uploads could not be copied:\n\n" + "\n".join(failed)
+                                   + "\n\nUpload them again or change the paths before saving.")
+            return False
+        if unfinished:
+            messagebox.showinfo("Uploads in Progress",
+                                "These uploads are still being copied:\n\n" + "\n".join(unfinished)
+                                + "\n\nSave again once the status line shows they are done.")
+            return False
+        return True
+
+    def on_destroy(self, event):
+        # <Destroy> reaches the root's binding for every child widget too
+        if event.widget is self.root:
+            # Interrupted copies are queued again and finish on the next start
+            self.jobs.stop()
+
+    @tracing.traced()
+    def init_tabs(self):
+        current = self.notebook.index('current') if self.notebook.tabs() else 0
+        for tab in self.notebook.tabs():
+            widget = self.notebook.nametowidget(tab)
+            self.notebook.forget(tab)
+            widget.destroy()
+        
         self.init_general_tab()
         self.init_theme_tab()
         self.init_about_tab()
         self.init_skills_tab()
         self.init_projects_tab()
         self.init_contact_tab()
-        
-        # Save Button
-        save_frame = ttk.Frame(root)
-        save_frame.pack(fill='x', padx=10, pady=10)
-        ttk.Button(save_frame, text="Save All Changes", command=self.save_data, width=20).pack(side='right')
+        self.notebook.select(current)
 
+    @tracing.traced()
     def load_data(self):
         try:
-            with open(DATA_FILE, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                # Ensure config exists
-                if 'config' not in data:
-                    data['config'] = {
-                        "theme": {
-                            "primaryColor": "#1E3A8A",
-                            "secondaryColor": "#F3F4F6",
-                            "backgroundColor": "#FFFFFF",
-                            "textColor": "#111827",
-                            "fontHeading": "Poppins",
-                            "fontBody": "Inter"
-                        },
-                        "logo": {"type": "text", "content": "Portfolio"}
-                    }
-                return data
+            data = self.store.load()
+            # Ensure config exists
+            if 'config' not in data:
+                data['config'] = {
+                    "theme": {
+                        "primaryColor": "#1E3A8A",
+                        "secondaryColor": "#F3F4F6",
+                        "backgroundColor": "#FFFFFF",
+                        "textColor": "#111827",
+                        "fontHeading": "Poppins",
+                        "fontBody": "Inter"
+                    },
+                    "logo": {"type": "text", "content": "Portfolio"}
+                }
+            return data
         except Exception as e:
             messagebox.showerror("Error", f"Failed to load data: {e}")
             return {}
 
+    @tracing.traced()
+    def write_data(self):
+        """Save through the store, merging with concurrent edits; returns False if the user cancelled"""
+        if not self.uploads_ready():
+            return False
+        self.update_data_from_ui()
+        try:
+            saved = self.store.save(self.data)
+        except storage.ConflictError as e:
+            overwrite = messagebox.askyesno(
+                "Conflicting Changes",
+                "Someone else changed the same fields since you opened the data:\n\n"
+                + "\n".join(e.conflicts)
+                + "\n\nOverwrite their changes with yours?")
+            if not overwrite:
+                return False
+            saved = self.store.save(self.data, force=True)
+        if saved is not self.data:
+            # Other writers' edits were merged in; show them
+            self.data = saved
+            self.init_tabs()
+        return True
+
+    def warn_over_budget(self):
+        """Point out oversized uploads right away instead of after a deploy"""
+        try:
+            _, violations = budget.check_source(self.data, ASSETS_DIR)
+        except (OSError, ValueError):
+            return
+        if violations:
+            message = "The site is over its page-weight budget:\n\n" + "\n".join(v.message for v in violations)
+            messagebox.showwarning("Page Weight", message)
+
+    @tracing.traced()
     def save_data(self):
         try:
-            # Update data from widgets
-            self.update_data_from_ui()
-            
-            # Save to file
-            with open(DATA_FILE, 'w', encoding='utf-8') as f:
-                json.dump(self.data, f, indent=2, ensure_ascii=False)
+            # Update data from widgets and save to file
+            if not self.write_data():
+                return
+            self.warn_over_budget()
             
-            messagebox.showinfo("Success", "Data saved successfully! Refresh your website to see changes.")
+            if self.store.kind == 'sqlite':
+                messagebox.showinfo("Success", "Data saved successfully! Publish to update your website.")
+            else:
+                messagebox.showinfo("Success", "Data saved successfully! Refresh your website to see changes.")
         except Exception as e:
             messagebox.showerror("Error", f"Failed to save data: {e}")
 
+    @tracing.traced()
+    def publish_data(self):
+        try:
+            if not self.write_data():
+                return
+            self.store.export_json(SITE_DATA_FILE)
+            messagebox.showinfo("Success", f"Published {SITE_DATA_FILE}. Refresh your website to see changes.")
+        except Exception as e:
+            messagebox.showerror("Error", f"Failed to publish data: {e}")
+
     def update_data_from_ui(self):
         # General
         self.data['personal']['name'] = self.name_var.get()
@@ -105,6 +220,7 @@ class PortfolioManagerGUI:
     # ==========================================
     # TAB 1: GENERAL
     # ==========================================
+    @tracing.traced()
     def init_general_tab(self):
         tab = ttk.Frame(self.notebook)
         self.notebook.add(tab, text="General")
@@ -135,12 +251,13 @@ class PortfolioManagerGUI:
         ttk.Entry(logo_frame, textvariable=self.logo_content_var, width=40).grid(row=1, column=1, padx=5)
         ttk.Button(logo_frame, text="Upload Image", command=self.upload_logo).grid(row=1, column=2, padx=5)
 
+    @tracing.traced()
     def upload_logo(self):
         filename = filedialog.askopenfilename(filetypes=[("Images", "*.png *.jpg *.jpeg *.svg")])
         if filename:
             dest = os.path.join(ASSETS_DIR, os.path.basename(filename))
             try:
-                shutil.copy2(filename, dest)
+                self.enqueue_copy(filename, dest)
                 self.logo_content_var.set(dest)
                 self.logo_type_var.set("image")
             except Exception as e:
@@ -149,6 +266,7 @@ class PortfolioManagerGUI:
     # ==========================================
     # TAB 2: THEME
     # ==========================================
+    @tracing.traced()
     def init_theme_tab(self):
         tab = ttk.Frame(self.notebook)
         self.notebook.add(tab, text="Theme")
@@ -187,6 +305,7 @@ class PortfolioManagerGUI:
     # ==========================================
     # TAB 3: ABOUT
     # ==========================================
+    @tracing.traced()
     def init_about_tab(self):
         tab = ttk.Frame(self.notebook)
         self.notebook.add(tab, text="About")
@@ -245,6 +364,7 @@ class PortfolioManagerGUI:
     # ==========================================
     # TAB 4: SKILLS
     # ==========================================
+    @tracing.traced()
     def init_skills_tab(self):
         tab = ttk.Frame(self.notebook)
         self.notebook.add(tab, text="Skills")
@@ -288,6 +408,7 @@ class PortfolioManagerGUI:
         
         self.refresh_skills_list()
 
+    @tracing.traced()
     def refresh_skills_list(self):
         self.skills_listbox.delete(0, 'end')
         for skill in self.data['skills']:
@@ -339,6 +460,7 @@ class PortfolioManagerGUI:
     # ==========================================
     # TAB 5: PROJECTS (PORTFOLIO)
     # ==========================================
+    @tracing.traced()
     def init_projects_tab(self):
         tab = ttk.Frame(self.notebook)
         self.notebook.add(tab, text="Projects")
@@ -392,6 +514,7 @@ class PortfolioManagerGUI:
         
         self.refresh_projects_list()
 
+    @tracing.traced()
     def refresh_projects_list(self):
         self.projects_listbox.delete(0, 'end')
         for proj in self.data['projects']:
@@ -423,24 +546,26 @@ class PortfolioManagerGUI:
         self.current_proj_idx = None
         self.projects_listbox.selection_clear(0, 'end')
 
+    @tracing.traced()
     def upload_thumbnail(self):
         filename = filedialog.askopenfilename(filetypes=[("Images", "*.png *.jpg *.jpeg")])
         if filename:
             dest = os.path.join(PROJECTS_DIR, os.path.basename(filename))
             try:
                 os.makedirs(PROJECTS_DIR, exist_ok=True)
-                shutil.copy2(filename, dest)
+                self.enqueue_copy(filename, dest)
                 self.proj_thumb_var.set(dest)
             except Exception as e:
                 messagebox.showerror("Error", f"Failed to upload: {e}")
 
+    @tracing.traced()
     def upload_video(self):
         filename = filedialog.askopenfilename(filetypes=[("Videos", "*.mp4 *.webm *.mov")])
         if filename:
             dest = os.path.join(VIDEOS_DIR, os.path.basename(filename))
             try:
                 os.makedirs(VIDEOS_DIR, exist_ok=True)
-                shutil.copy2(filename, dest)
+                self.enqueue_copy(filename, dest)
                 self.proj_video_var.set(dest)
             except Exception as e:
                 messagebox.showerror("Error", f"Failed to upload: {e}")
@@ -474,6 +599,7 @@ class PortfolioManagerGUI:
     # ==========================================
     # TAB 6: CONTACT
     # ==========================================
+    @tracing.traced()
     def init_contact_tab(self):
         tab = ttk.Frame(self.notebook)
         self.notebook.add(tab, text="Contact")
@@ -523,5 +649,6 @@ class PortfolioManagerGUI:
 
 if __name__ == "__main__":
     root = tk.Tk()
+    ui_watchdog.attach_tk(root)
     app = PortfolioManagerGUI(root)
     root.mainloop()
@@ -0,0 +1,89 @@
+"""
+Pre-rendered hero backdrop.
+
+The hero's gradient orbs are drawn by the browser with an 80px blur and
+kept moving by infinite animations, only to look almost static. This
+paints the same composition once per viewport size with Qt, using the
+theme colours, so built pages can show a small image instead. The live
+orbs stay available (config.hero.liveBackground) for capable devices.
+"""
+
+import os
+
+# Hero boxes (CSS px) to render for: phones, tablets, desktops
+SIZES = [(480, 900), (1024, 768), (1920, 1080)]
+# Rendered at a fraction of the box size; the result is a blur anyway
+SCALE = 0.5
+QUALITY = 70
+VERSION = '1'
+
+# Mirrors .gradient-orb / .orb-1..3 in css/styles.css
+ORB_OPACITY = 0.3
+ORB_BLUR = 80
+ACCENT = '#3B82F6'
+PRIMARY_HOVER = '#1E40AF'
+DEFAULT_PRIMARY = '#1E3A8A'
+DEFAULT_BACKGROUND = '#FFFFFF'
+
+
+def orbs(theme, width, height):
+    """(centre x, centre y, radius, colour) of each orb in a width x height hero"""
+    primary = theme.get('primaryColor') or DEFAULT_PRIMARY
+    return [
+        (width - 400, 0, 250, primary),                # .orb-1: 500px, top -250px, right -150px
+        (100, height, 200, ACCENT),                    # .orb-2: 400px, bottom -200px, left -100px
+        (width / 2, height / 2, 150, PRIMARY_HOVER),   # .orb-3: 300px, centred
+    ]
+
+
+def file_name(width, height):
+    return f"hero-{width}x{height}.jpg"
+
+
+def render(theme, width, height, path):
+    """Paint the backdrop for one hero size into a JPEG"""
+    from PyQt5.QtCore import QPointF, Qt
+    from PyQt5.QtGui import QColor, QImage, QPainter, QRadialGradient
+
+    image = QImage(round(width * SCALE), round(height * SCALE), QImage.Format_RGB32)
+    image.fill(QColor(theme.get('backgroundColor') or DEFAULT_BACKGROUND))
+    painter = QPainter(image)
+    painter.setRenderHint(QPainter.Antialiasing)
+    painter.scale(SCALE, SCALE)
+    painter.setPen(Qt.NoPen)
+
+    for x, y, radius, color in orbs(theme, width, height):
+        # A blurred disc: full strength inside, fading out over the blur radius
+        outer = radius + ORB_BLUR
+        gradient = QRadialGradient(QPointF(x, y), outer)
+        solid = QColor(color)
+        solid.setAlphaF(ORB_OPACITY)
+        half = QColor(solid)
+        half.setAlphaF(ORB_OPACITY / 2)
+        clear = QColor(solid)
+        clear.setAlphaF(0)
+        gradient.setColorAt(0, solid)
+        gradient.setColorAt(max(radius - ORB_BLUR, 0) / outer, solid)
+        gradient.setColorAt(radius / outer, half)
+        gradient.setColorAt(1, clear)
+        painter.setBrush(gradient)
+        painter.drawEllipse(QPointF(x, y), outer, outer)
+    painter.end()
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    if not image.save(path, 'JPG', QUALITY):
+        raise RuntimeError(f"could not write {path}")
+
+
+def stylesheet(directory, background):
+    """CSS that shows the rendered images and hides the live orbs unless html.live-hero is set"""
+    rules = []
+    previous = 0
+    for width, height in SIZES:
+        url = f"{directory}/{file_name(width, height)}"
+        rule = f".hero-background {{ background: {background} url('{url}') center / cover no-repeat; }}"
+        rules.append(f"@media (min-width: {previous + 1}px) {{ {rule} }}" if previous else rule)
+        previous = width
+    rules.append("html:not(.live-hero) .gradient-orb { display: none; }")
+    rules.append("html.live-hero .hero-background { background-image: none; }")
+    return '\n        '.join(rules)
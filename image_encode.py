@@ -0,0 +1,305 @@
+#!/usr/bin/env python3
+"""
+Quality-Targeted Image Encoding
+---------------------------
+A fixed JPEG quality wastes bytes on flat motion-graphics frames and
+smears detailed ones. Instead, each image is encoded at the lowest quality
+whose decoded result still matches the source to a perceptual-similarity
+target: SSIM on the luma plane, both downsampled to ANALYSIS_SIZE pixels
+on the long side. The quality is found by binary search between
+MIN_QUALITY and MAX_QUALITY, with Qt (QImage) encoding and decoding.
+
+Searches run across a process pool and their results are cached by the
+source file's content hash, so only new or changed images are searched.
+`build_site.py --optimize` uses this for JPEG files. PNGs stay lossless,
+and JPEG cannot hold transparency, so images with an alpha channel are
+only encoded as WebP.
+
+Usage:
+    python image_encode.py                         # Report savings for the images the data references
+    python image_encode.py assets/projects/*.jpg   # Report for particular files
+    python image_encode.py --format webp           # Compare with WebP instead of JPEG
+    python image_encode.py --target 0.99           # Stricter similarity target
+    python image_encode.py --out encoded           # Also write the encoded files
+    python image_encode.py --json                  # Print the report as JSON
+"""
+
+import argparse
+import json
+import os
+import shutil
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from operator import mul
+
+import build_site
+import buildgraph
+import storage
+import tracing
+from console import Colors, format_bytes
+
+TARGET_SSIM = 0.985
+MIN_QUALITY = 30
+MAX_QUALITY = 95
+ANALYSIS_SIZE = 512
+WINDOW = 8
+# Format name -> (Qt format, file extension)
+FORMATS = {'jpeg': ('JPG', '.jpg'), 'webp': ('WEBP', '.webp')}
+QUALITY_CACHE = '.image-qualities.json'
+CACHE_VERSION = 1
+VERSION = '1'
+
+# SSIM stabilising constants for 8-bit samples
+C1 = (0.01 * 255) ** 2
+C2 = (0.03 * 255) ** 2
+
+
+# ========================================
+# SIMILARITY
+# ========================================
+
+def ssim(first, second):
+    """Mean SSIM of two equally sized luma planes, (width, height, bytes), over WINDOW-pixel blocks"""
+    width, height, a = first
+    b = second[2]
+    if len(a) != len(b):
+        return 0.0
+    n = WINDOW * WINDOW
+    total = count = 0
+    for top in range(0, height - WINDOW + 1, WINDOW):
+        rows = range(top * width, (top + WINDOW) * width, width)
+        for left in range(0, width - WINDOW + 1, WINDOW):
+            x = b''.join(a[row + left:row + left + WINDOW] for row in rows)
+            y = b''.join(b[row + left:row + left + WINDOW] for row in rows)
+            sx, sy = sum(x), sum(y)
+            mx, my = sx / n, sy / n
+            vx = sum(map(mul, x, x)) / n - mx * mx
+            vy = sum(map(mul, y, y)) / n - my * my
+            cov = sum(map(mul, x, y)) / n - mx * my
+            total += ((2 * mx * my + C1) * (2 * cov + C2)) / ((mx * mx + my * my + C1) * (vx + vy + C2))
+            count += 1
+    if not count:
+        return 1.0 if a == b else 0.0
+    return total / count
+
+
+def luma(image):
+    """Luma plane of a QImage, flattened onto white and downsampled, as (width, height, bytes)"""
+    from PyQt5.QtCore import Qt
+    from PyQt5.QtGui import QImage, QPainter
+
+    if max(image.width(), image.height()) > ANALYSIS_SIZE:
+        image = image.scaled(ANALYSIS_SIZE, ANALYSIS_SIZE, Qt.KeepAspectRatio, Qt.SmoothTransformation)
+    flat = QImage(image.size(), QImage.Format_RGB32)
+    flat.fill(Qt.white)
+    painter = QPainter(flat)
+    painter.drawImage(0, 0, image)
+    painter.end()
+    gray = flat.convertToFormat(QImage.Format_Grayscale8)
+    width, height, stride = gray.width(), gray.height(), gray.bytesPerLine()
+    bits = gray.constBits()
+    bits.setsize(stride * height)
+    data = bytes(bits)
+    # Scanlines are padded to 4 bytes
+    return width, height, b''.join(data[y * stride:y * stride + width] for y in range(height))
+
+
+# ========================================
+# ENCODING
+# ========================================
+
+def encode(image, fmt, quality):
+    """A QImage encoded in fmt ('jpeg' or 'webp') at quality, as bytes"""
+    from PyQt5.QtCore import QBuffer, QByteArray, QIODevice
+
+    encoded = QByteArray()
+    buffer = QBuffer(encoded)
+    buffer.open(QIODevice.WriteOnly)
+    ok = image.save(buffer, FORMATS[fmt][0], quality)
+    buffer.close()
+    return bytes(encoded) if ok else None
+
+
+def choose_quality(path, fmt='jpeg', target=TARGET_SSIM):
+    """The lowest quality at which path, encoded as fmt, still scores target SSIM.
+
+    Returns {'quality', 'bytes', 'ssim'}, with MAX_QUALITY if no quality
+    in range gets there, or None if Qt can't read the image or write fmt,
+    or fmt can't hold its transparency.
+    """
+    from PyQt5.QtGui import QImage
+
+    image = QImage(path)
+    if image.isNull() or (fmt == 'jpeg' and image.hasAlphaChannel()):
+        return None
+    reference = luma(image)
+    best = None
+    low, high = MIN_QUALITY, MAX_QUALITY
+    while low <= high:
+        quality = (low + high) // 2
+        data = encode(image, fmt, quality)
+        if data is None:
+            return None
+        score = ssim(reference, luma(QImage.fromData(data)))
+        if score >= target:
+            best = {'quality': quality, 'bytes': len(data), 'ssim': round(score, 4)}
+            high = quality - 1
+        else:
+            low = quality + 1
+    if best is None:
+        data = encode(image, fmt, MAX_QUALITY)
+        best = {'quality': MAX_QUALITY, 'bytes': len(data),
+                'ssim': round(ssim(reference, luma(QImage.fromData(data))), 4)}
+    return best
+
+
+def encode_file(src, dest, fmt, quality):
+    """Write src encoded as fmt at quality to dest, or a copy of src if that isn't smaller.
+
+    Returns the bytes saved.
+    """
+    from PyQt5.QtGui import QImage
+
+    image = QImage(src)
+    data = encode(image, fmt, quality) if not image.isNull() else None
+    if data is None or len(data) >= os.path.getsize(src):
+        shutil.copy2(src, dest)
+        return 0
+    tmp_path = f"{dest}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, dest)
+    return os.path.getsize(src) - len(data)
+
+
+class QualityCache(storage.JsonCache):
+    """Quality decisions keyed by source content hash, format and target"""
+
+    def __init__(self, path):
+        super().__init__(path, CACHE_VERSION)
+
+    @staticmethod
+    def key(source_hash, fmt, target):
+        return f"{source_hash}:{fmt}:{target}"
+
+
+@tracing.traced()
+def choose_qualities(sources, cache, fmt='jpeg', target=TARGET_SSIM, workers=None):
+    """{path: decision} for sources ({path: content hash}); uncached ones are searched in parallel"""
+    keys = {path: cache.key(source_hash, fmt, target) for path, source_hash in sources.items()}
+    cache.used.update(keys.values())
+    todo = [path for path, key in keys.items() if key not in cache.entries]
+    if todo:
+        # SSIM is pure Python, so threads would take turns on the GIL
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for path, decision in zip(todo, pool.map(choose_quality, todo, repeat(fmt), repeat(target))):
+                cache.entries[keys[path]] = decision
+    return {path: cache.entries[key] for path, key in keys.items()}
+
+
+# ========================================
+# REPORT
+# ========================================
+
+def referenced_images(data, assets_dir):
+    """Local image files the data references and that exist"""
+    paths = []
+    for ref in build_site.collect_asset_refs(data):
+        if ref.lower().endswith(build_site.IMAGE_EXTENSIONS):
+            path = build_site.resolve_asset(ref, assets_dir)
+            if os.path.isfile(path):
+                paths.append(path)
+    return paths
+
+
+def make_report(decisions):
+    """Per-image rows and totals for {path: decision}"""
+    rows = []
+    for path, decision in decisions.items():
+        original = os.path.getsize(path)
+        # An encoding larger than the source is never used
+        encoded = min(decision['bytes'], original) if decision else original
+        rows.append({
+            'path': path,
+            'originalBytes': original,
+            'encodedBytes': encoded,
+            'savedBytes': original - encoded,
+            'quality': decision['quality'] if decision and decision['bytes'] < original else None,
+            'ssim': decision['ssim'] if decision else None,
+        })
+    rows.sort(key=lambda row: -row['savedBytes'])
+    original = sum(row['originalBytes'] for row in rows)
+    saved = sum(row['savedBytes'] for row in rows)
+    return {'images': rows, 'originalBytes': original, 'savedBytes': saved}
+
+
+def print_report(report, fmt, target):
+    print(f"\n{Colors.BOLD}Encoding as {fmt} at SSIM ≥ {target}{Colors.END}")
+    for row in report['images']:
+        name = os.path.relpath(row['path'])
+        if row['quality'] is None:
+            print(f"  {Colors.YELLOW}-{Colors.END} {name}: kept ({format_bytes(row['originalBytes'])})")
+            continue
+        share = row['savedBytes'] / row['originalBytes'] if row['originalBytes'] else 0
+        print(f"  {Colors.GREEN}✓{Colors.END} {name}: {format_bytes(row['originalBytes'])} → "
+              f"{format_bytes(row['encodedBytes'])} at q{row['quality']} "
+              f"(-{share:.0%}, SSIM {row['ssim']:.3f})")
+    original, saved = report['originalBytes'], report['savedBytes']
+    share = saved / original if original else 0
+    print(f"\n{Colors.BOLD}Saved {format_bytes(saved)} of {format_bytes(original)} ({share:.0%}){Colors.END}")
+
+
+# ========================================
+# ENTRY POINT
+# ========================================
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Encode images at the lowest quality that meets an SSIM target")
+    parser.add_argument('images', nargs='*', help="Image files (default: those the data references)")
+    parser.add_argument('--data', default=build_site.DATA_FILE, help="Data file (JSON or SQLite)")
+    parser.add_argument('--assets', default=build_site.ASSETS_DIR, help="Assets root directory")
+    parser.add_argument('--format', choices=sorted(FORMATS), default='jpeg', help="Output format")
+    parser.add_argument('--target', type=float, default=TARGET_SSIM, help=f"SSIM target (default: {TARGET_SSIM})")
+    parser.add_argument('--out', help="Also write the encoded images into this directory")
+    parser.add_argument('--jobs', type=int, default=None, help="Worker processes (default: one per CPU)")
+    parser.add_argument('--cache', default=os.path.join(build_site.OUTPUT_DIR, QUALITY_CACHE),
+                        help="Decision cache (shared with the build)")
+    parser.add_argument('--json', action='store_true', help="Print the report as JSON")
+    args = parser.parse_args(argv)
+
+    if not build_site.have_qt():
+        print(f"{Colors.RED}✗ PyQt5 is required to encode images{Colors.END}")
+        return 1
+    try:
+        paths = args.images or referenced_images(storage.open_store(args.data).load(), args.assets)
+        sources = {path: buildgraph.hash_file(path) for path in dict.fromkeys(paths)}
+    except (OSError, ValueError) as e:
+        print(f"{Colors.RED}✗ {e}{Colors.END}")
+        return 1
+
+    cache = QualityCache(args.cache)
+    decisions = choose_qualities(sources, cache, args.format, args.target, args.jobs)
+    # Keep the decisions the build made for its other formats and targets
+    cache.used.update(cache.entries)
+    cache.save()
+
+    if args.out:
+        os.makedirs(args.out, exist_ok=True)
+        for path, decision in decisions.items():
+            if decision:
+                stem = os.path.splitext(os.path.basename(path))[0]
+                encode_file(path, os.path.join(args.out, stem + FORMATS[args.format][1]),
+                            args.format, decision['quality'])
+
+    report = make_report(decisions)
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print_report(report, args.format, args.target)
+    return 0
+
+
+if __name__ == '__main__':
+    tracing.enable_from_argv(sys.argv)
+    sys.exit(main())
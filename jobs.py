@@ -0,0 +1,756 @@
+#!/usr/bin/env python3
+"""
+Portfolio Background Jobs
+---------------------------
+A persistent queue for slow media work (copying, hashing, thumbnails,
+image and video optimisation) so it runs off the UI thread and survives
+restarts.
+
+Jobs live in a SQLite database: PORTFOLIO_JOBS_DB, or jobs.db in the
+directory of the data file (data/jobs.db by default).
+Each has a kind (see HANDLERS), JSON arguments, a priority (higher runs
+first) and a state: queued, running, done, failed or cancelled. Enqueuing
+a job identical to one still queued or running returns that job instead
+of adding another.
+
+A Runner works through the queue on a pool of threads. Handlers report
+progress, which is also where cancellation and shutdown reach them, and
+write their outputs through atomic_output(), so a stopped job never
+leaves a half-written file. Failed attempts are retried with backoff.
+Jobs that were running when their process stopped go back in the queue:
+at once on a clean shutdown, or LEASE seconds after their last heartbeat
+if the process died.
+
+Usage:
+    python jobs.py add copy SRC DEST               # Enqueue a job
+    python jobs.py add optimize-video SRC DEST --priority 5
+    python jobs.py add thumbnail SRC DEST 640
+    python jobs.py list                            # Unfinished and recent jobs
+    python jobs.py watch                           # Live status until the queue is empty
+    python jobs.py run --workers 2                 # Work through the queue, then exit
+    python jobs.py cancel 12
+    python jobs.py retry 12
+    python jobs.py prune                           # Forget jobs finished over a week ago
+"""
+
+import argparse
+import hashlib
+import inspect
+import json
+import os
+import shutil
+import socket
+import sqlite3
+import subprocess
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+import build_site
+import image_encode
+import tracing
+from console import Colors, format_bytes
+
+JOBS_DB_NAME = 'jobs.db'
+WORKERS = 2
+# Uploads started from a GUI go ahead of batch work
+INTERACTIVE = 10
+MAX_ATTEMPTS = 3
+RETRY_DELAY = 2.0
+LEASE = 30.0
+HEARTBEAT = 5.0
+PROGRESS_INTERVAL = 0.25
+IDLE_POLL = 1.0
+CHUNK_SIZE = 1 << 20
+KEEP_FINISHED = 7 * 24 * 3600
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    kind TEXT NOT NULL,
+    args TEXT NOT NULL,
+    dedupe_key TEXT NOT NULL,
+    priority INTEGER NOT NULL DEFAULT 0,
+    state TEXT NOT NULL DEFAULT 'queued',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    max_attempts INTEGER NOT NULL DEFAULT 3,
+    progress REAL NOT NULL DEFAULT 0,
+    message TEXT,
+    result TEXT,
+    error TEXT,
+    cancel_requested INTEGER NOT NULL DEFAULT 0,
+    not_before REAL NOT NULL DEFAULT 0,
+    worker TEXT,
+    heartbeat REAL,
+    created REAL NOT NULL,
+    started REAL,
+    finished REAL
+);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_jobs_active_key ON jobs(dedupe_key)
+    WHERE state IN ('queued', 'running');
+CREATE INDEX IF NOT EXISTS idx_jobs_next ON jobs(state, priority, id);
+"""
+
+
+def queue_path(data_file):
+    """The queue database for a data file: PORTFOLIO_JOBS_DB, or jobs.db beside the data"""
+    return os.environ.get('PORTFOLIO_JOBS_DB') or os.path.join(os.path.dirname(data_file), JOBS_DB_NAME)
+
+
+JOBS_DB = queue_path(build_site.DATA_FILE)
+
+
+class JobError(Exception):
+    """A failure that retrying won't fix, such as a missing input"""
+
+
+class Cancelled(Exception):
+    """Raised in a handler whose job was cancelled"""
+
+
+class Interrupted(Exception):
+    """Raised in a handler whose runner is shutting down"""
+
+
+def dedupe_key(kind, args):
+    return hashlib.sha256(json.dumps([kind, args], sort_keys=True).encode('utf-8')).hexdigest()
+
+
+# ========================================
+# QUEUE
+# ========================================
+
+class JobQueue:
+    """The jobs table; each thread gets its own connection"""
+
+    def __init__(self, path=JOBS_DB):
+        self.path = path
+        self._local = threading.local()
+
+    def connect(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            directory = os.path.dirname(os.path.abspath(self.path))
+            os.makedirs(directory, exist_ok=True)
+            # Autocommit; transactions are opened explicitly with BEGIN IMMEDIATE
+            conn = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            conn.executescript(SCHEMA)
+            self._local.conn = conn
+        return conn
+
+    @contextmanager
+    def transaction(self):
+        conn = self.connect()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            yield conn
+        except BaseException:
+            conn.execute('ROLLBACK')
+            raise
+        conn.execute('COMMIT')
+
+    def enqueue(self, kind, args, priority=0, max_attempts=MAX_ATTEMPTS):
+        """Add a job and return its id, or the id of the same job if it is still queued or running"""
+        if kind not in HANDLERS:
+            raise ValueError(f"Unknown job kind: {kind}")
+        try:
+            # Caught here, a wrong argument would otherwise only fail when the job runs
+            inspect.signature(HANDLERS[kind][0]).bind(None, **args)
+        except TypeError as e:
+            raise ValueError(f"{kind} takes {usage(kind)}: {e}") from None
+        key = dedupe_key(kind, args)
+        with self.transaction() as conn:
+            row = conn.execute("SELECT id, priority FROM jobs WHERE dedupe_key = ? AND state IN ('queued', 'running')",
+                               (key,)).fetchone()
+            if row:
+                if priority > row['priority']:
+                    conn.execute('UPDATE jobs SET priority = ? WHERE id = ?', (priority, row['id']))
+                return row['id']
+            return conn.execute(
+                'INSERT INTO jobs (kind, args, dedupe_key, priority, max_attempts, created) VALUES (?, ?, ?, ?, ?, ?)',
+                (kind, json.dumps(args), key, priority, max_attempts, time.time())).lastrowid
+
+    def states(self, job_ids):
+        """{id: state} for the given jobs; ids that don't exist are left out"""
+        job_ids = list(job_ids)
+        if not job_ids:
+            return {}
+        rows = self.connect().execute(f"SELECT id, state FROM jobs WHERE id IN ({', '.join('?' * len(job_ids))})",
+                                      job_ids).fetchall()
+        return {row['id']: row['state'] for row in rows}
+
+    def get(self, job_id):
+        row = self.connect().execute('SELECT * FROM jobs WHERE id = ?', (job_id,)).fetchone()
+        return job_from_row(row) if row else None
+
+    def list(self, finished=20):
+        """Unfinished jobs in the order they will run, then the most recently finished ones"""
+        conn = self.connect()
+        active = conn.execute("SELECT * FROM jobs WHERE state IN ('running', 'queued') "
+                              "ORDER BY state = 'queued', priority DESC, id").fetchall()
+        done = conn.execute("SELECT * FROM jobs WHERE state NOT IN ('running', 'queued') "
+                            "ORDER BY finished DESC LIMIT ?", (finished,)).fetchall()
+        return [job_from_row(row) for row in active + done]
+
+    def counts(self, since=0):
+        """{state: number of jobs}, counting finished jobs only if they finished after since"""
+        rows = self.connect().execute("SELECT state, COUNT(*) AS n FROM jobs "
+                                      "WHERE state IN ('queued', 'running') OR finished >= ? GROUP BY state",
+                                      (since,)).fetchall()
+        return {row['state']: row['n'] for row in rows}
+
+    def claim(self, worker):
+        """Mark the next runnable job as running for worker and return it, or None"""
+        now = time.time()
+        with self.transaction() as conn:
+            row = conn.execute("SELECT id FROM jobs WHERE state = 'queued' AND not_before <= ? "
+                               "ORDER BY priority DESC, id LIMIT 1", (now,)).fetchone()
+            if row is None:
+                return None
+            conn.execute("UPDATE jobs SET state = 'running', attempts = attempts + 1, worker = ?, heartbeat = ?, "
+                         "started = ?, progress = 0, message = NULL WHERE id = ?", (worker, now, now, row['id']))
+            return job_from_row(conn.execute('SELECT * FROM jobs WHERE id = ?', (row['id'],)).fetchone())
+
+    def update(self, job_id, progress, message=None):
+        """Record progress; returns True if the job has been asked to cancel"""
+        conn = self.connect()
+        conn.execute('UPDATE jobs SET progress = ?, message = ?, heartbeat = ? WHERE id = ?',
+                     (progress, message, time.time(), job_id))
+        row = conn.execute('SELECT cancel_requested FROM jobs WHERE id = ?', (job_id,)).fetchone()
+        return bool(row and row['cancel_requested'])
+
+    def heartbeat(self, job_ids):
+        if job_ids:
+            self.connect().execute(f"UPDATE jobs SET heartbeat = ? WHERE id IN ({','.join('?' * len(job_ids))})",
+                                   (time.time(), *job_ids))
+
+    def finish(self, job_id, state, result=None, error=None):
+        self.connect().execute(
+            "UPDATE jobs SET state = ?, result = ?, error = ?, finished = ?, worker = NULL, "
+            "progress = CASE WHEN ? = 'done' THEN 1 ELSE progress END WHERE id = ?",
+            (state, json.dumps(result) if result is not None else None, error, time.time(), state, job_id))
+
+    def retry_later(self, job_id, error, delay):
+        self.connect().execute(
+            "UPDATE jobs SET state = 'queued', error = ?, not_before = ?, worker = NULL, progress = 0 WHERE id = ?",
+            (error, time.time() + delay, job_id))
+
+    def release(self, job_id):
+        """Put a job that was interrupted by a shutdown back in the queue without using up an attempt"""
+        self.connect().execute("UPDATE jobs SET state = 'queued', attempts = attempts - 1, worker = NULL, "
+                               "progress = 0, message = NULL WHERE id = ? AND state = 'running'", (job_id,))
+
+    def recover(self):
+        """Requeue running jobs whose worker stopped sending heartbeats; returns how many"""
+        with self.transaction() as conn:
+            return conn.execute(
+                "UPDATE jobs SET worker = NULL, progress = 0, "
+                "error = 'the process running it stopped', "
+                "state = CASE WHEN attempts >= max_attempts THEN 'failed' ELSE 'queued' END, "
+                "finished = CASE WHEN attempts >= max_attempts THEN ? END "
+                "WHERE state = 'running' AND heartbeat < ?", (time.time(), time.time() - LEASE)).rowcount
+
+    def cancel(self, job_id):
+        """Cancel a queued job, or ask a running one to stop; False if it already finished"""
+        with self.transaction() as conn:
+            row = conn.execute('SELECT state FROM jobs WHERE id = ?', (job_id,)).fetchone()
+            if row is None or row['state'] not in ('queued', 'running'):
+                return False
+            if row['state'] == 'queued':
+                conn.execute("UPDATE jobs SET state = 'cancelled', finished = ? WHERE id = ?", (time.time(), job_id))
+            else:
+                conn.execute('UPDATE jobs SET cancel_requested = 1 WHERE id = ?', (job_id,))
+            return True
+
+    def retry(self, job_id):
+        """Queue a failed or cancelled job again with fresh attempts; False if it isn't either"""
+        try:
+            with self.transaction() as conn:
+                return conn.execute(
+                    "UPDATE jobs SET state = 'queued', attempts = 0, error = NULL, result = NULL, progress = 0, "
+                    "cancel_requested = 0, not_before = 0, finished = NULL "
+                    "WHERE id = ? AND state IN ('failed', 'cancelled')", (job_id,)).rowcount > 0
+        except sqlite3.IntegrityError:
+            # The same work has been queued again since
+            return False
+
+    def prune(self, age=KEEP_FINISHED):
+        """Delete jobs that finished more than age seconds ago; returns how many"""
+        with self.transaction() as conn:
+            return conn.execute("DELETE FROM jobs WHERE state NOT IN ('queued', 'running') AND finished < ?",
+                                (time.time() - age,)).rowcount
+
+
+def job_from_row(row):
+    job = dict(row)
+    job['args'] = json.loads(job['args'])
+    job['result'] = json.loads(job['result']) if job['result'] else None
+    return job
+
+
+# ========================================
+# RUNNER
+# ========================================
+
+class Job:
+    """What a handler sees of its job"""
+
+    def __init__(self, queue, record, stopping, changed=None):
+        self.id = record['id']
+        self.kind = record['kind']
+        self.args = record['args']
+        self.attempt = record['attempts']
+        self._queue = queue
+        self._stopping = stopping
+        self._changed = changed
+        self._reported = 0.0
+
+    def progress(self, fraction, message=None):
+        """Report progress (0 to 1); raises Cancelled or Interrupted when the job should stop"""
+        if self._stopping.is_set():
+            raise Interrupted()
+        now = time.monotonic()
+        if fraction < 1 and now - self._reported < PROGRESS_INTERVAL:
+            return
+        self._reported = now
+        cancel = self._queue.update(self.id, min(max(fraction, 0.0), 1.0), message)
+        if self._changed:
+            self._changed()
+        if cancel:
+            raise Cancelled()
+
+
+class Runner:
+    """Works through the queue on a pool of threads.
+
+    on_status, if given, is called from the runner's threads with a fresh
+    status_line() whenever a job starts, makes progress or ends, and every
+    HEARTBEAT seconds, so a UI can show it without querying the queue on
+    its own thread.
+    """
+
+    def __init__(self, path=JOBS_DB, workers=WORKERS, on_status=None):
+        self.queue = JobQueue(path)
+        self.workers = workers
+        self.on_status = on_status
+        # Failures from before this runner started are not reported
+        self.since = time.time()
+        self.name = f"{socket.gethostname()}:{os.getpid()}"
+        self._stopping = threading.Event()
+        self._wake = threading.Event()
+        self._running = set()
+        self._lock = threading.Lock()
+        self._threads = []
+        self._exit_when_idle = False
+
+    def start(self, exit_when_idle=False):
+        self._exit_when_idle = exit_when_idle
+        self.queue.recover()
+        for n in range(self.workers):
+            thread = threading.Thread(target=self._work, name=f'job-worker-{n + 1}', daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        threading.Thread(target=self._beat, name='job-heartbeat', daemon=True).start()
+
+    def enqueue(self, kind, args, priority=0):
+        job_id = self.queue.enqueue(kind, args, priority)
+        self._wake.set()
+        return job_id
+
+    def stop(self, timeout=5.0):
+        """Interrupt running jobs (they are queued again for next time) and wait for the workers"""
+        self._stopping.set()
+        self._wake.set()
+        self.join(timeout)
+
+    def join(self, timeout=None):
+        for thread in self._threads:
+            thread.join(timeout)
+
+    def _report(self):
+        if self.on_status:
+            self.on_status(status_line(self.queue, self.since))
+
+    def _beat(self):
+        self._report()
+        while not self._stopping.wait(HEARTBEAT):
+            with self._lock:
+                running = list(self._running)
+            self.queue.heartbeat(running)
+            # Jobs of processes that died while this one is running
+            self.queue.recover()
+            # Picks up jobs queued or run by other processes
+            self._report()
+
+    def _idle(self):
+        counts = self.queue.counts()
+        with self._lock:
+            busy = bool(self._running)
+        return not busy and not counts.get('queued') and not counts.get('running')
+
+    def _work(self):
+        while not self._stopping.is_set():
+            record = self.queue.claim(self.name)
+            if record is None:
+                if self._exit_when_idle and self._idle():
+                    break
+                self._wake.wait(IDLE_POLL)
+                self._wake.clear()
+                continue
+            with self._lock:
+                self._running.add(record['id'])
+            self._report()
+            try:
+                self._run(record)
+            finally:
+                with self._lock:
+                    self._running.discard(record['id'])
+                self._report()
+        # Wake the other workers so they notice too
+        self._wake.set()
+
+    def _run(self, record):
+        fn, _ = HANDLERS[record['kind']]
+        job = Job(self.queue, record, self._stopping, self._report)
+        with tracing.span(f"job:{record['kind']}", id=record['id']):
+            try:
+                result = fn(job, **record['args'])
+            except Interrupted:
+                self.queue.release(job.id)
+            except Cancelled:
+                self.queue.finish(job.id, 'cancelled')
+            except (JobError, FileNotFoundError, TypeError) as e:
+                self.queue.finish(job.id, 'failed', error=str(e))
+            except Exception as e:
+                error = f"{type(e).__name__}: {e}"
+                if record['attempts'] >= record['max_attempts']:
+                    self.queue.finish(job.id, 'failed', error=error)
+                else:
+                    self.queue.retry_later(job.id, error, RETRY_DELAY * 2 ** (record['attempts'] - 1))
+            else:
+                self.queue.finish(job.id, 'done', result=result)
+
+
+# ========================================
+# HANDLERS
+# ========================================
+
+# kind -> (handler, argument names in command-line order)
+HANDLERS = {}
+
+
+def handler(kind, *params):
+    def decorator(fn):
+        HANDLERS[kind] = (fn, params)
+        return fn
+    return decorator
+
+
+def required_params(fn):
+    """How many of a handler's arguments have no default"""
+    return sum(1 for param in list(inspect.signature(fn).parameters.values())[1:]
+               if param.default is inspect.Parameter.empty)
+
+
+def usage(kind):
+    """A job kind's arguments for messages, optional ones in brackets: 'SRC DEST [WIDTH]'"""
+    fn, params = HANDLERS[kind]
+    required = required_params(fn)
+    return ' '.join(name.upper() if n < required else f"[{name.upper()}]" for n, name in enumerate(params))
+
+
+@contextmanager
+def atomic_output(dest):
+    """A temporary path next to dest (same extension) that replaces dest only if the block succeeds"""
+    os.makedirs(os.path.dirname(os.path.abspath(dest)), exist_ok=True)
+    root, ext = os.path.splitext(dest)
+    tmp_path = f"{root}.part{ext}"
+    try:
+        yield tmp_path
+        os.replace(tmp_path, dest)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def require_file(path):
+    if not os.path.isfile(path):
+        raise JobError(f"No such file: {path}")
+    return os.path.getsize(path)
+
+
+@handler('copy', 'src', 'dest')
+def copy_job(job, src, dest):
+    total = require_file(src)
+    if os.path.exists(dest) and os.path.samefile(src, dest):
+        return {'bytes': 0}
+    done = 0
+    with atomic_output(dest) as tmp_path:
+        with open(src, 'rb') as fin, open(tmp_path, 'wb') as fout:
+            while True:
+                chunk = fin.read(CHUNK_SIZE)
+                if not chunk:
+                    break
+                fout.write(chunk)
+                done += len(chunk)
+                job.progress(done / max(total, 1), f"{format_bytes(done)} of {format_bytes(total)}")
+        shutil.copystat(src, tmp_path)
+    tracing.current_span().add(bytes_written=done)
+    return {'bytes': done}
+
+
+@handler('hash', 'path')
+def hash_job(job, path):
+    total = require_file(path)
+    digest = hashlib.sha256()
+    done = 0
+    with open(path, 'rb') as f:
+        while True:
+            chunk = f.read(CHUNK_SIZE)
+            if not chunk:
+                break
+            digest.update(chunk)
+            done += len(chunk)
+            job.progress(done / max(total, 1))
+    return {'sha256': digest.hexdigest(), 'bytes': done}
+
+
+@handler('thumbnail', 'src', 'dest', 'width')
+def thumbnail_job(job, src, dest, width=640):
+    require_file(src)
+    if not build_site.have_qt():
+        raise JobError("PyQt5 is required for thumbnails")
+    from PyQt5.QtCore import Qt
+    from PyQt5.QtGui import QImage
+
+    image = QImage(src)
+    if image.isNull():
+        raise JobError(f"Not an image Qt can read: {src}")
+    job.progress(0.5, "Scaling")
+    if image.width() > int(width):
+        image = image.scaledToWidth(int(width), Qt.SmoothTransformation)
+    with atomic_output(dest) as tmp_path:
+        if not image.save(tmp_path, None, 85):
+            raise JobError(f"Qt can't write {dest}")
+    return {'width': image.width(), 'height': image.height(), 'bytes': os.path.getsize(dest)}
+
+
+@handler('optimize-image', 'src', 'dest')
+def optimize_image_job(job, src, dest):
+    """A JPEG at the lowest quality that meets the SSIM target (image_encode.py)"""
+    size = require_file(src)
+    if not build_site.have_qt():
+        raise JobError("PyQt5 is required to optimise images")
+    job.progress(0, "Choosing quality")
+    decision = image_encode.choose_quality(src)
+    if decision is None:
+        raise JobError(f"Can't encode {src} as JPEG")
+    job.progress(0.9, f"Encoding at q{decision['quality']}")
+    with atomic_output(dest) as tmp_path:
+        saved = image_encode.encode_file(src, tmp_path, 'jpeg', decision['quality'])
+    return {'quality': decision['quality'], 'bytes': size - saved, 'saved': saved}
+
+
+def media_duration(path):
+    """Duration in seconds from ffprobe, or None"""
+    result = subprocess.run(['ffprobe', '-v', 'error', '-show_entries', 'format=duration', '-of', 'csv=p=0', path],
+                            capture_output=True, text=True)
+    try:
+        return float(result.stdout.strip())
+    except ValueError:
+        return None
+
+
+@handler('optimize-video', 'src', 'dest')
+def optimize_video_job(job, src, dest):
+    """Re-encode with the build's ffmpeg settings, keeping the source if that isn't smaller"""
+    size = require_file(src)
+    if shutil.which('ffmpeg') is None:
+        raise JobError("ffmpeg not found")
+    duration = media_duration(src) if shutil.which('ffprobe') else None
+    with atomic_output(dest) as tmp_path:
+        process = subprocess.Popen(
+            ['ffmpeg', '-y', '-loglevel', 'error', '-nostats', '-progress', 'pipe:1', '-i', src,
+             *build_site.VIDEO_ENCODE_ARGS, tmp_path],
+            stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+        try:
+            for line in process.stdout:
+                key, _, value = line.strip().partition('=')
+                # out_time_us is in microseconds despite older builds calling it out_time_ms
+                if key in ('out_time_us', 'out_time_ms') and duration and value.isdigit():
+                    job.progress(int(value) / 1e6 / duration, "Encoding")
+            error = process.stderr.read()
+        except BaseException:
+            process.kill()
+            process.wait()
+            raise
+        if process.wait() != 0:
+            raise RuntimeError(f"ffmpeg failed: {error.strip()[-500:]}")
+        if os.path.getsize(tmp_path) >= size:
+            shutil.copyfile(src, tmp_path)
+        encoded = os.path.getsize(tmp_path)
+    return {'bytes': encoded, 'saved': size - encoded}
+
+
+# ========================================
+# STATUS
+# ========================================
+
+STATE_COLORS = {'queued': Colors.BLUE, 'running': Colors.YELLOW, 'done': Colors.GREEN,
+                'failed': Colors.RED, 'cancelled': Colors.YELLOW}
+
+
+def describe(job):
+    """A short human description such as 'copy project1.mp4'"""
+    args = job['args']
+    target = args.get('dest') or args.get('src') or args.get('path') or ''
+    return f"{job['kind']} {os.path.basename(target)}".strip()
+
+
+def status_line(queue, since=0):
+    """One line for a status bar; empty when nothing is queued or running and nothing failed after since"""
+    jobs = queue.list(finished=0)
+    counts = queue.counts(since)
+    parts = []
+    running = [job for job in jobs if job['state'] == 'running']
+    if running:
+        job = running[0]
+        parts.append(f"{describe(job)} {job['progress']:.0%}")
+        if len(running) > 1:
+            parts.append(f"{len(running) - 1} more running")
+    queued = counts.get('queued', 0)
+    if queued:
+        parts.append(f"{queued} queued")
+    failed = counts.get('failed', 0)
+    if failed:
+        parts.append(f"{failed} failed (python jobs.py list)")
+    return " · ".join(parts)
+
+
+def pending_outputs(queue, pending):
+    """Check on the jobs in pending ({id: output path}) that a form is waiting for.
+
+    Returns (unfinished, failed) output paths. Jobs that are done, and the
+    failed ones once reported, are removed from pending.
+    """
+    states = queue.states(pending)
+    unfinished, failed = [], []
+    for job_id, dest in list(pending.items()):
+        state = states.get(job_id)
+        if state in ('queued', 'running'):
+            unfinished.append(dest)
+            continue
+        if state != 'done':
+            failed.append(dest)
+        del pending[job_id]
+    return unfinished, failed
+
+
+def print_jobs(jobs):
+    if not jobs:
+        print(f"{Colors.GREEN}✓ No jobs{Colors.END}")
+        return
+    for job in jobs:
+        color = STATE_COLORS.get(job['state'], '')
+        detail = ''
+        if job['state'] == 'running':
+            detail = f" {job['progress']:.0%}" + (f" {job['message']}" if job['message'] else '')
+        elif job['state'] == 'queued' and job['attempts']:
+            detail = f" retry {job['attempts'] + 1}/{job['max_attempts']}: {job['error']}"
+        elif job['state'] == 'failed':
+            detail = f" {job['error']}"
+        priority = f" p{job['priority']}" if job['priority'] else ''
+        print(f"  {job['id']:>5}  {color}{job['state']:<9}{Colors.END} {describe(job)}{priority}{detail}")
+
+
+def watch(queue, interval=0.5):
+    """Print status changes until nothing is queued or running"""
+    since = time.time()
+    last = None
+    while True:
+        counts = queue.counts()
+        line = status_line(queue, since)
+        if line != last:
+            print(line or f"{Colors.GREEN}✓ Queue empty{Colors.END}")
+            last = line
+        if not counts.get('queued') and not counts.get('running'):
+            return
+        time.sleep(interval)
+
+
+# ========================================
+# ENTRY POINT
+# ========================================
+
+def parse_value(text):
+    try:
+        return int(text)
+    except ValueError:
+        return text
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Queue and run background media jobs")
+    parser.add_argument('--db', default=JOBS_DB, help=f"Queue database (default: {JOBS_DB})")
+    commands = parser.add_subparsers(dest='command', required=True)
+    add = commands.add_parser('add', help="Enqueue a job")
+    add.add_argument('kind', choices=sorted(HANDLERS))
+    add.add_argument('args', nargs='*', help="Arguments in order, e.g. SRC DEST")
+    add.add_argument('--priority', type=int, default=0)
+    commands.add_parser('list', help="Show unfinished and recent jobs")
+    commands.add_parser('watch', help="Show progress until the queue is empty")
+    run = commands.add_parser('run', help="Run queued jobs until the queue is empty")
+    run.add_argument('--workers', type=int, default=WORKERS)
+    for name in ('cancel', 'retry'):
+        command = commands.add_parser(name, help=f"{name.capitalize()} a job")
+        command.add_argument('id', type=int)
+    commands.add_parser('prune', help="Delete jobs that finished over a week ago")
+    args = parser.parse_args(argv)
+
+    queue = JobQueue(args.db)
+    if args.command == 'add':
+        fn, params = HANDLERS[args.kind]
+        if not required_params(fn) <= len(args.args) <= len(params):
+            parser.error(f"{args.kind} takes {usage(args.kind)}")
+        job_id = queue.enqueue(args.kind, dict(zip(params, map(parse_value, args.args))), args.priority)
+        print(f"{Colors.GREEN}✓ Job {job_id}: {describe(queue.get(job_id))}{Colors.END}")
+    elif args.command == 'list':
+        print_jobs(queue.list())
+    elif args.command == 'watch':
+        watch(queue)
+    elif args.command == 'run':
+        started = time.time()
+        runner = Runner(args.db, args.workers)
+        runner.start(exit_when_idle=True)
+        try:
+            watch(queue)
+            runner.join()
+        except KeyboardInterrupt:
+            runner.stop()
+            print(f"\n{Colors.YELLOW}Stopped; unfinished jobs stay queued.{Colors.END}")
+        failed = [job for job in queue.list() if job['state'] == 'failed' and job['finished'] >= started]
+        if failed:
+            print_jobs(failed)
+        return 1 if failed else 0
+    elif args.command == 'cancel':
+        if not queue.cancel(args.id):
+            print(f"{Colors.RED}✗ Job {args.id} is not queued or running{Colors.END}")
+            return 1
+        print(f"{Colors.GREEN}✓ Cancelled job {args.id}{Colors.END}")
+    elif args.command == 'retry':
+        if not queue.retry(args.id):
+            print(f"{Colors.RED}✗ Job {args.id} has not failed or been cancelled{Colors.END}")
+            return 1
+        print(f"{Colors.GREEN}✓ Job {args.id} queued again{Colors.END}")
+    elif args.command == 'prune':
+        print(f"{Colors.GREEN}✓ Removed {queue.prune()} finished jobs{Colors.END}")
+    return 0
+
+
+if __name__ == '__main__':
+    tracing.enable_from_argv(sys.argv)
+    sys.exit(main())
@@ -6,18 +6,24 @@ let portfolioData = null;
 
 // Load portfolio data from JSON
 async function loadPortfolioData() {
+    const fetchStart = performance.now();
     try {
         const response = await fetch('data/portfolio-data.json');
         if (!response.ok) {
             throw new Error('Failed to load portfolio data');
         }
         portfolioData = await response.json();
+        recordMetric('data_fetch', performance.now() - fetchStart);
         if (portfolioData.config) {
             applyTheme(portfolioData.config.theme);
             updateLogo(portfolioData.config.logo);
+            initHeroBackground(portfolioData.config.hero);
+            initTelemetry(portfolioData.config.telemetry);
         }
-        populateContent();
-        initializeAnimations();
+        timeStep('render', populateContent);
+        timeStep('animation_setup', initializeAnimations);
+        initFacets();
+        initSearch();
     } catch (error) {
         console.error('Error loading portfolio data:', error);
         // Fallback to default content if JSON fails to load
@@ -45,12 +51,41 @@ function updateLogo(logo) {
     if (!logo) return;
     const logoEl = document.getElementById('nav-logo');
     if (logo.type === 'image' && logo.content) {
-        logoEl.innerHTML = `<img src="${logo.content}" alt="Logo" style="height: 40px;">`;
+        const background = logo.placeholder ?
+            ` background: ${logo.placeholder.color} url(${logo.placeholder.preview}) center / contain no-repeat;` : '';
+        logoEl.innerHTML = `<img src="${logo.content}" alt="Logo" style="height: 40px;${background}"${background ? ' onload="this.style.background=\'\'"' : ''}>`;
     } else {
         logoEl.textContent = logo.content || portfolioData.personal.name.split(' ')[0];
     }
 }
 
+// Built sites show a pre-rendered hero backdrop (hero_backdrop.py). With
+// config.hero.liveBackground, capable devices get the animated orbs back.
+function initHeroBackground(hero) {
+    if (!hero || !hero.liveBackground) return;
+    if (deviceClass() === 'high' && !reducedMotion.matches) {
+        document.documentElement.classList.add('live-hero');
+    }
+}
+
+// Fade the real thumbnail in over its placeholder once it can paint
+function revealWhenDecoded(thumbnail) {
+    const media = thumbnail.querySelector('img, video');
+    const reveal = () => thumbnail.classList.add('is-loaded');
+    if (!media) return reveal();
+    if (media.tagName === 'VIDEO') {
+        if (media.readyState >= 2) return reveal();
+        media.addEventListener('loadeddata', reveal, { once: true });
+    } else if (media.complete && media.naturalWidth) {
+        reveal();
+    } else {
+        media.addEventListener('load', () => {
+            (media.decode ? media.decode() : Promise.resolve()).catch(() => {}).then(reveal);
+        }, { once: true });
+    }
+    media.addEventListener('error', reveal, { once: true });
+}
+
 // Default data fallback
 function getDefaultData() {
     return {
@@ -134,47 +169,7 @@ function populateContent() {
     const projectsGrid = document.getElementById('projects-grid');
     projectsGrid.innerHTML = '';
     portfolioData.projects.forEach((project, index) => {
-        const card = document.createElement('div');
-        card.className = 'project-card fade-in-up';
-        card.style.animationDelay = `${index * 0.1}s`;
-        card.innerHTML = `
-            <div class="project-thumbnail">
-                ${project.videoUrl && (project.videoUrl.endsWith('.mp4') || project.videoUrl.endsWith('.webm')) ?
-                `<video src="${project.videoUrl}" muted loop playsinline onmouseover="this.play()" onmouseout="this.pause();this.currentTime=0;" style="width:100%;height:100%;object-fit:cover;"></video>` :
-                `<img src="${project.thumbnail}" alt="${project.title}" onerror="this.src='data:image/svg+xml,%3Csvg xmlns=\\'http://www.w3.org/2000/svg\\' width=\\'400\\' height=\\'300\\'%3E%3Crect fill=\\'%23E5E7EB\\' width=\\'400\\' height=\\'300\\'/%3E%3Ctext fill=\\'%236B7280\\' font-family=\\'Arial\\' font-size=\\'20\\' x=\\'50%25\\' y=\\'50%25\\' text-anchor=\\'middle\\' dy=\\'.3em\\'%3E${project.title}%3C/text%3E%3C/svg%3E'">`
-            }
-                <div class="project-overlay">
-                    <div class="play-icon">▶</div>
-                </div>
-            </div>
-            <div class="project-info">
-                <div class="project-header">
-                    <h3>${project.title}</h3>
-                    <span class="project-year">${project.year}</span>
-                </div>
-                <p class="project-description">${project.description}</p>
-                <div class="project-tags">
-                    ${project.tags.map(tag => `<span class="tag">${tag}</span>`).join('')}
-                </div>
-            </div>
-        `;
-
-        // Add click handler for video link
-        if (project.videoUrl) {
-            card.style.cursor = 'pointer';
-            card.addEventListener('click', () => {
-                // If it's an external link, open in new tab
-                if (project.videoUrl.startsWith('http')) {
-                    window.open(project.videoUrl, '_blank');
-                } else {
-                    // If it's a local video, maybe open a modal or just play it full screen?
-                    // For now, let's open it in a new tab to be safe/simple
-                    window.open(project.videoUrl, '_blank');
-                }
-            });
-        }
-
-        projectsGrid.appendChild(card);
+        projectsGrid.appendChild(createProjectCard(project, index));
     });
 
     // Contact Section
@@ -203,6 +198,103 @@ function populateContent() {
     document.getElementById('current-year').textContent = new Date().getFullYear();
 }
 
+// Build the showcase card for one project
+function createProjectCard(project, index) {
+    const card = document.createElement('div');
+    card.className = 'project-card fade-in-up';
+    card.style.animationDelay = `${index * 0.1}s`;
+    const placeholder = project.placeholder;
+    card.innerHTML = `
+        <div class="project-thumbnail${placeholder ? ' has-placeholder' : ''}"${placeholder ?
+            ` style="--placeholder: url(${placeholder.preview}); background-color: ${placeholder.color};"` : ''}>
+            ${project.videoUrl && (project.videoUrl.endsWith('.mp4') || project.videoUrl.endsWith('.webm')) ?
+            `<video src="${project.videoUrl}" muted loop playsinline onmouseover="this.play()" onmouseout="this.pause();this.currentTime=0;" style="width:100%;height:100%;object-fit:cover;"></video>` :
+            `<img src="${project.thumbnail}" alt="${project.title}" onerror="this.src='data:image/svg+xml,%3Csvg xmlns=\\'http://www.w3.org/2000/svg\\' width=\\'400\\' height=\\'300\\'%3E%3Crect fill=\\'%23E5E7EB\\' width=\\'400\\' height=\\'300\\'/%3E%3Ctext fill=\\'%236B7280\\' font-family=\\'Arial\\' font-size=\\'20\\' x=\\'50%25\\' y=\\'50%25\\' text-anchor=\\'middle\\' dy=\\'.3em\\'%3E${project.title}%3C/text%3E%3C/svg%3E'">`
+        }
+            <div class="project-overlay">
+                <div class="play-icon">▶</div>
+            </div>
+        </div>
+        <div class="project-info">
+            <div class="project-header">
+                <h3>${project.title}</h3>
+                <span class="project-year">${project.year}</span>
+            </div>
+            <p class="project-description">${project.description}</p>
+            <div class="project-tags">
+                ${project.tags.map(tag => `<span class="tag">${tag}</span>`).join('')}
+            </div>
+        </div>
+    `;
+
+    if (placeholder) revealWhenDecoded(card.querySelector('.project-thumbnail'));
+
+    // Built sites have a detail page per project; prefetch it when the
+    // visitor looks like they're about to open it
+    if (project.page) {
+        card.style.cursor = 'pointer';
+        watchPrefetchIntent(card, project);
+        card.addEventListener('click', (event) => {
+            if (event.ctrlKey || event.metaKey) {
+                window.open(project.page, '_blank');
+            } else {
+                window.location.href = project.page;
+            }
+        });
+    } else if (project.videoUrl) {
+        // Add click handler for video link
+        card.style.cursor = 'pointer';
+        card.addEventListener('click', () => {
+            // If it's an external link, open in new tab
+            if (project.videoUrl.startsWith('http')) {
+                window.open(project.videoUrl, '_blank');
+            } else {
+                // If it's a local video, maybe open a modal or just play it full screen?
+                // For now, let's open it in a new tab to be safe/simple
+                window.open(project.videoUrl, '_blank');
+            }
+        });
+    }
+
+    return card;
+}
+
+// ========================================
+// FRAME SCHEDULER
+// ========================================
+
+// DOM reads and writes are queued and run once per animation frame, reads
+// first, so scroll and reveal handlers never force extra layouts.
+const frameQueue = {
+    reads: [],
+    writes: [],
+    scheduled: false
+};
+
+function scheduleFrame() {
+    if (frameQueue.scheduled) return;
+    frameQueue.scheduled = true;
+    requestAnimationFrame(runFrame);
+}
+
+function runFrame() {
+    frameQueue.scheduled = false;
+    frameQueue.reads.splice(0).forEach((task) => task());
+    frameQueue.writes.splice(0).forEach((task) => task());
+}
+
+function readDom(task) {
+    frameQueue.reads.push(task);
+    scheduleFrame();
+}
+
+function writeDom(task) {
+    frameQueue.writes.push(task);
+    scheduleFrame();
+}
+
+const reducedMotion = window.matchMedia ? window.matchMedia('(prefers-reduced-motion: reduce)') : { matches: false };
+
 // ========================================
 // NAVIGATION
 // ========================================
@@ -213,14 +305,24 @@ function initializeNavigation() {
     const navMenu = document.getElementById('navMenu');
     const navLinks = document.querySelectorAll('.nav-link');
 
-    // Navbar scroll effect
-    window.addEventListener('scroll', () => {
-        if (window.scrollY > 50) {
-            navbar.classList.add('scrolled');
-        } else {
-            navbar.classList.remove('scrolled');
-        }
-    });
+    // Navbar scroll effect: a sentinel 50px down the page tells us when
+    // it has scrolled out of view, without listening to every scroll
+    if ('IntersectionObserver' in window) {
+        const sentinel = document.createElement('div');
+        sentinel.className = 'scroll-sentinel';
+        sentinel.setAttribute('aria-hidden', 'true');
+        document.body.prepend(sentinel);
+        new IntersectionObserver(([entry]) => {
+            writeDom(() => navbar.classList.toggle('scrolled', !entry.isIntersecting));
+        }).observe(sentinel);
+    } else {
+        window.addEventListener('scroll', () => {
+            readDom(() => {
+                const scrolled = window.scrollY > 50;
+                writeDom(() => navbar.classList.toggle('scrolled', scrolled));
+            });
+        }, { passive: true });
+    }
 
     // Mobile menu toggle
     navToggle.addEventListener('click', () => {
@@ -261,7 +363,7 @@ function initializeNavigation() {
                 const offsetTop = targetSection.offsetTop - 80;
                 window.scrollTo({
                     top: offsetTop,
-                    behavior: 'smooth'
+                    behavior: reducedMotion.matches ? 'auto' : 'smooth'
                 });
             }
         });
@@ -272,35 +374,299 @@ function initializeNavigation() {
 // ANIMATIONS
 // ========================================
 
+// Reveal an element and start its progress bar, if it has one
+function revealElement(el) {
+    el.classList.add('visible');
+    if (el.classList.contains('tool-card')) {
+        const progressBar = el.querySelector('.progress-bar');
+        if (progressBar) {
+            progressBar.style.transform = `scaleX(${progressBar.getAttribute('data-progress') / 100})`;
+        }
+    }
+}
+
+let revealObserver = null;
+
 function initializeAnimations() {
-    // Intersection Observer for fade-in animations
-    const observerOptions = {
-        threshold: 0.15,
-        rootMargin: '0px 0px -50px 0px'
-    };
+    const fadeElements = document.querySelectorAll('.fade-in-up:not(.visible)');
 
-    const observer = new IntersectionObserver((entries) => {
-        entries.forEach(entry => {
-            if (entry.isIntersecting) {
-                entry.target.classList.add('visible');
-
-                // Animate progress bars when tools section is visible
-                if (entry.target.classList.contains('tool-card')) {
-                    const progressBar = entry.target.querySelector('.progress-bar');
-                    if (progressBar) {
-                        const progress = progressBar.getAttribute('data-progress');
-                        setTimeout(() => {
-                            progressBar.style.width = `${progress}%`;
-                        }, 200);
-                    }
-                }
-            }
+    // Without motion (or an observer) everything is simply shown
+    if (reducedMotion.matches || !('IntersectionObserver' in window)) {
+        fadeElements.forEach(revealElement);
+        return;
+    }
+
+    // Intersection Observer for fade-in animations. Revealed elements are
+    // unobserved and all reveals in a frame are applied in one batch.
+    if (!revealObserver) {
+        revealObserver = new IntersectionObserver((entries) => {
+            const revealed = entries.filter((entry) => entry.isIntersecting).map((entry) => entry.target);
+            if (revealed.length === 0) return;
+            revealed.forEach((el) => revealObserver.unobserve(el));
+            writeDom(() => revealed.forEach(revealElement));
+        }, {
+            threshold: 0.15,
+            rootMargin: '0px 0px -50px 0px'
+        });
+    }
+    fadeElements.forEach((el) => revealObserver.observe(el));
+}
+
+// ========================================
+// SHOWCASE SEARCH
+// ========================================
+
+// Queries run in js/search-worker.js against data/search-index.json, which
+// only built sites have; without it the search box stays hidden.
+const search = {
+    worker: null,
+    ready: false,
+    lastId: 0,
+    pending: null
+};
+
+function initSearch() {
+    const input = document.getElementById('project-search');
+    if (!input || !window.Worker) return;
+
+    search.worker = new Worker('js/search-worker.js');
+    search.worker.addEventListener('message', (event) => {
+        const message = event.data;
+        if (message.type === 'ready') {
+            search.ready = true;
+            input.closest('.project-search').hidden = false;
+            if (search.pending !== null) runSearch(search.pending);
+        } else if (message.type === 'error') {
+            console.warn('Search unavailable:', message.message);
+            search.worker.terminate();
+        } else if (message.type === 'results' && message.id === search.lastId) {
+            showSearchResults(message.ids);
+        }
+    });
+    search.worker.postMessage({ type: 'load', url: new URL('data/search-index.json', location.href).href });
+
+    input.addEventListener('input', debounce(() => runSearch(input.value), 120));
+}
+
+function runSearch(query) {
+    if (!search.ready) {
+        search.pending = query;
+        return;
+    }
+    search.pending = null;
+    search.lastId += 1;
+    search.worker.postMessage({ type: 'query', id: search.lastId, query });
+}
+
+// ids is null for an empty query (show everything), else project ids in rank order
+function showSearchResults(ids) {
+    showcase.searchIds = ids;
+    renderShowcase();
+}
+
+// ========================================
+// SHOWCASE FILTERS
+// ========================================
+
+// The build precomputes a bitset over project ordinals for every tag and
+// year (facets.py). Chips in one facet are ORed, facets are ANDed, and
+// every chip count is a popcount, so filtering never scans the projects.
+const showcase = {
+    size: 0,
+    fields: [],          // [{ field, values: [{ value, count, bits: Uint32Array }] }]
+    selected: new Map(), // field -> Set of value indexes
+    searchIds: null
+};
+
+function decodeBitset(encoded, size) {
+    const bytes = atob(encoded);
+    const words = new Uint32Array(Math.ceil(size / 32));
+    for (let i = 0; i < bytes.length && (i >> 2) < words.length; i++) {
+        words[i >> 2] |= bytes.charCodeAt(i) << ((i & 3) * 8);
+    }
+    return words;
+}
+
+function popcount(word) {
+    word -= (word >>> 1) & 0x55555555;
+    word = (word & 0x33333333) + ((word >>> 2) & 0x33333333);
+    return (((word + (word >>> 4)) & 0x0F0F0F0F) * 0x01010101) >>> 24;
+}
+
+function fullBitset(size) {
+    const words = new Uint32Array(Math.ceil(size / 32)).fill(0xFFFFFFFF);
+    if (size % 32) words[words.length - 1] = (1 << (size % 32)) - 1;
+    return words;
+}
+
+function searchBitset() {
+    if (showcase.searchIds === null) return fullBitset(showcase.size);
+    const ordinals = new Map(portfolioData.projects.map((project, i) => [project.id, i]));
+    const words = new Uint32Array(Math.ceil(showcase.size / 32));
+    showcase.searchIds.forEach((id) => {
+        const i = ordinals.get(id);
+        if (i !== undefined) words[i >> 5] |= 1 << (i & 31);
+    });
+    return words;
+}
+
+// Projects allowed by the search and every selected facet except `skipField`
+function filterBitset(skipField) {
+    const mask = searchBitset();
+    showcase.fields.forEach(({ field, values }) => {
+        const chosen = showcase.selected.get(field);
+        if (field === skipField || !chosen || chosen.size === 0) return;
+        const union = new Uint32Array(mask.length);
+        chosen.forEach((index) => {
+            const bits = values[index].bits;
+            for (let w = 0; w < union.length; w++) union[w] |= bits[w];
+        });
+        for (let w = 0; w < mask.length; w++) mask[w] &= union[w];
+    });
+    return mask;
+}
+
+function initFacets() {
+    const container = document.getElementById('facet-chips');
+    const facets = portfolioData.facets;
+    if (!container || !facets || facets.size !== portfolioData.projects.length) return;
+
+    showcase.size = facets.size;
+    showcase.fields = facets.fields.map(({ field, values }) => ({
+        field,
+        values: values.map((entry) => ({ ...entry, bits: decodeBitset(entry.bits, facets.size) }))
+    }));
+
+    container.innerHTML = showcase.fields
+        .filter(({ values }) => values.length > 1)
+        .map(({ field, values }) => `
+            <div class="facet-group" role="group" aria-label="Filter by ${field}">
+                ${values.map((entry, index) => `
+                    <button type="button" class="facet-chip" data-field="${field}" data-index="${index}" aria-pressed="false">
+                        ${entry.value} <span class="facet-count">${entry.count}</span>
+                    </button>`).join('')}
+            </div>`).join('');
+    container.hidden = container.children.length === 0;
+
+    container.addEventListener('click', (event) => {
+        const chip = event.target.closest('.facet-chip');
+        if (!chip) return;
+        const field = chip.dataset.field;
+        const index = Number(chip.dataset.index);
+        if (!showcase.selected.has(field)) showcase.selected.set(field, new Set());
+        const chosen = showcase.selected.get(field);
+        if (chosen.has(index)) chosen.delete(index);
+        else chosen.add(index);
+        renderShowcase();
+    });
+}
+
+function updateFacetCounts() {
+    const container = document.getElementById('facet-chips');
+    if (!container || showcase.fields.length === 0) return;
+    showcase.fields.forEach(({ field, values }) => {
+        // A chip's count is what selecting it would add within its own facet
+        const mask = filterBitset(field);
+        const chosen = showcase.selected.get(field) || new Set();
+        container.querySelectorAll(`.facet-chip[data-field="${field}"]`).forEach((chip) => {
+            const index = Number(chip.dataset.index);
+            const bits = values[index].bits;
+            let count = 0;
+            for (let w = 0; w < mask.length; w++) count += popcount(bits[w] & mask[w]);
+            chip.querySelector('.facet-count').textContent = count;
+            chip.setAttribute('aria-pressed', chosen.has(index));
+            chip.disabled = count === 0 && !chosen.has(index);
         });
-    }, observerOptions);
+    });
+}
+
+// Re-render the grid from the current search and chip selection
+function renderShowcase() {
+    const projectsGrid = document.getElementById('projects-grid');
+    const status = document.getElementById('project-search-status');
+    const filtering = showcase.fields.length > 0 &&
+        [...showcase.selected.values()].some((chosen) => chosen.size > 0);
+    const size = portfolioData.projects.length;
+    const mask = showcase.fields.length > 0 ? filterBitset(null) : null;
+    const allowed = (i) => !mask || (mask[i >> 5] >>> (i & 31)) & 1;
+
+    let projects;
+    if (showcase.searchIds === null) {
+        projects = portfolioData.projects.filter((_, i) => allowed(i));
+    } else {
+        const byId = new Map(portfolioData.projects.map((project, i) => [project.id, i]));
+        projects = showcase.searchIds
+            .map((id) => byId.get(id))
+            .filter((i) => i !== undefined && i < size && allowed(i))
+            .map((i) => portfolioData.projects[i]);
+    }
+
+    const fragment = document.createDocumentFragment();
+    projects.forEach((project, index) => {
+        const card = createProjectCard(project, index);
+        card.style.animationDelay = '0s';
+        card.classList.add('visible');
+        fragment.appendChild(card);
+    });
+    projectsGrid.replaceChildren(fragment);
+    status.textContent = showcase.searchIds === null && !filtering ? '' :
+        `${projects.length} project${projects.length === 1 ? '' : 's'} found`;
+    updateFacetCounts();
+}
 
-    // Observe all fade-in-up elements
-    const fadeElements = document.querySelectorAll('.fade-in-up');
-    fadeElements.forEach(el => observer.observe(el));
+// ========================================
+// PROJECT PAGE PREFETCH
+// ========================================
+
+// Hovering a card for a moment, or touching it, fetches its detail page
+// and poster so the click lands on a warm cache. At most two fetches run
+// at once, each URL is fetched once, and nothing is prefetched for
+// visitors on Save-Data or a 2G connection.
+const PREFETCH_HOVER_MS = 65;
+const PREFETCH_MAX_ACTIVE = 2;
+const prefetch = { queue: [], active: 0, done: new Set() };
+
+function prefetchAllowed() {
+    const connection = navigator.connection;
+    if (!connection) return true;
+    return !connection.saveData && !/2g/.test(connection.effectiveType || '');
+}
+
+function watchPrefetchIntent(card, project) {
+    let timer = null;
+    const urls = [project.page];
+    if (project.thumbnail && !project.thumbnail.startsWith('http')) urls.push(project.thumbnail);
+    const start = () => urls.forEach(queuePrefetch);
+
+    card.addEventListener('pointerenter', (event) => {
+        if (event.pointerType !== 'mouse') return;
+        timer = setTimeout(start, PREFETCH_HOVER_MS);
+    });
+    card.addEventListener('pointerleave', () => clearTimeout(timer));
+    card.addEventListener('touchstart', start, { passive: true, once: true });
+}
+
+function queuePrefetch(url) {
+    if (prefetch.done.has(url) || !prefetchAllowed()) return;
+    prefetch.done.add(url);
+    prefetch.queue.push(url);
+    runPrefetchQueue();
+}
+
+function runPrefetchQueue() {
+    while (prefetch.active < PREFETCH_MAX_ACTIVE && prefetch.queue.length) {
+        const url = prefetch.queue.shift();
+        prefetch.active += 1;
+        // Reading the body lets the service worker finish caching it
+        // before the slot is given to the next URL
+        fetch(url, { credentials: 'same-origin', priority: 'low' })
+            .then((response) => response.ok ? response.blob() : null)
+            .catch(() => prefetch.done.delete(url))
+            .finally(() => {
+                prefetch.active -= 1;
+                runPrefetchQueue();
+            });
+    }
 }
 
 // ========================================
@@ -320,6 +686,189 @@ function debounce(func, wait) {
     };
 }
 
+// ========================================
+// PERFORMANCE TELEMETRY
+// ========================================
+
+// Metrics are collected from page start but only sent once the data file
+// names a collector (config.telemetry.endpoint). Without one nothing leaves
+// the browser.
+const telemetry = {
+    endpoint: null,
+    release: 'dev',
+    sampled: true,
+    queue: [],
+    cls: 0,
+    clsThumbnails: 0,
+    lcp: 0,
+    batchSize: 20
+};
+
+function deviceClass() {
+    const memory = navigator.deviceMemory || 4;
+    const cores = navigator.hardwareConcurrency || 4;
+    const connection = navigator.connection || {};
+    if (memory <= 2 || cores <= 2 || /(^|-)2g$/.test(connection.effectiveType || '')) return 'low';
+    if (memory >= 8 && cores >= 8) return 'high';
+    return 'mid';
+}
+
+function recordMetric(name, value) {
+    if (typeof value !== 'number' || !isFinite(value)) return;
+    telemetry.queue.push({ name, value: Math.round(value * 10000) / 10000, t: Math.round(performance.now()) });
+    if (telemetry.endpoint && telemetry.queue.length >= telemetry.batchSize) {
+        flushTelemetry();
+    }
+}
+
+function timeStep(name, fn) {
+    performance.mark(`${name}-start`);
+    const start = performance.now();
+    fn();
+    recordMetric(name, performance.now() - start);
+    performance.mark(`${name}-end`);
+    performance.measure(name, `${name}-start`, `${name}-end`);
+}
+
+function flushTelemetry() {
+    if (!telemetry.endpoint || !telemetry.sampled || telemetry.queue.length === 0) return;
+    const payload = JSON.stringify({
+        release: telemetry.release,
+        device: deviceClass(),
+        page: location.pathname,
+        metrics: telemetry.queue.splice(0)
+    });
+    if (navigator.sendBeacon && navigator.sendBeacon(telemetry.endpoint, payload)) return;
+    fetch(telemetry.endpoint, { method: 'POST', body: payload, keepalive: true }).catch(() => {});
+}
+
+function initTelemetry(config) {
+    if (!config || !config.endpoint) return;
+    telemetry.endpoint = config.endpoint;
+    telemetry.release = config.release || telemetry.release;
+    telemetry.sampled = Math.random() < (config.sampleRate ?? 1);
+
+    // Time from hover to the first decoded frame of a project preview video
+    document.addEventListener('mouseover', (e) => {
+        const video = e.target;
+        if (video.tagName !== 'VIDEO' || video.dataset.frameTimed) return;
+        video.dataset.frameTimed = '1';
+        const start = performance.now();
+        const done = () => recordMetric('hover_video_first_frame', performance.now() - start);
+        if (video.requestVideoFrameCallback) {
+            video.requestVideoFrameCallback(done);
+        } else {
+            video.addEventListener('playing', done, { once: true });
+        }
+    }, { capture: true, passive: true });
+}
+
+function observePerformance(type, callback) {
+    try {
+        const observer = new PerformanceObserver((list) => list.getEntries().forEach(callback));
+        observer.observe({ type, buffered: true });
+    } catch (e) {
+        // Entry type not supported by this browser
+    }
+}
+
+function startPerformanceObservers() {
+    if (!('PerformanceObserver' in window)) return;
+
+    observePerformance('navigation', (entry) => {
+        recordMetric('ttfb', entry.responseStart - entry.startTime);
+        recordMetric('dom_content_loaded', entry.domContentLoadedEventEnd - entry.startTime);
+        if (entry.loadEventEnd > 0) recordMetric('load', entry.loadEventEnd - entry.startTime);
+    });
+    observePerformance('paint', (entry) => {
+        recordMetric(entry.name.replace(/-/g, '_'), entry.startTime);
+    });
+    observePerformance('largest-contentful-paint', (entry) => {
+        telemetry.lcp = entry.startTime;
+    });
+    observePerformance('layout-shift', (entry) => {
+        if (entry.hadRecentInput) return;
+        telemetry.cls += entry.value;
+        const fromThumbnail = (entry.sources || []).some(source =>
+            source.node && source.node.closest && source.node.closest('.project-thumbnail'));
+        if (fromThumbnail) telemetry.clsThumbnails += entry.value;
+    });
+    observePerformance('resource', (entry) => {
+        if (/portfolio-data\.json/.test(entry.name)) {
+            recordMetric('data_resource', entry.duration);
+            if (entry.transferSize) recordMetric('data_transfer_bytes', entry.transferSize);
+        }
+    });
+
+    // LCP and CLS are only final when the page is hidden
+    let finalised = false;
+    const finalise = () => {
+        if (!finalised) {
+            finalised = true;
+            if (telemetry.lcp) recordMetric('lcp', telemetry.lcp);
+            recordMetric('cls', telemetry.cls);
+            recordMetric('cls_thumbnails', telemetry.clsThumbnails);
+        }
+        flushTelemetry();
+    };
+    document.addEventListener('visibilitychange', () => {
+        if (document.visibilityState === 'hidden') finalise();
+    });
+    window.addEventListener('pagehide', finalise);
+}
+
+startPerformanceObservers();
+
+// ========================================
+// OFFLINE CACHE
+// ========================================
+
+// sw.js is generated by build_site.py, so only built sites have one.
+// Registering after load keeps the precache off the critical path.
+if ('serviceWorker' in navigator && location.protocol !== 'file:') {
+    window.addEventListener('load', () => {
+        navigator.serviceWorker.register('sw.js').catch(() => {});
+    });
+}
+
+// ========================================
+// FRAME DEBUG OVERLAY
+// ========================================
+
+// Add ?debug=frames to the URL to see long frames and long tasks while
+// scrolling, e.g. when testing on a low-end phone.
+const LONG_FRAME_MS = 50;
+
+function initFrameOverlay() {
+    const overlay = document.createElement('div');
+    overlay.className = 'frame-debug';
+    document.body.appendChild(overlay);
+
+    const stats = { frames: 0, longFrames: 0, worst: 0, longTasks: 0 };
+    let last = performance.now();
+    const tick = (now) => {
+        const gap = now - last;
+        last = now;
+        // Gaps over a second are the tab being in the background
+        if (gap < 1000) {
+            stats.frames += 1;
+            if (gap > LONG_FRAME_MS) stats.longFrames += 1;
+            stats.worst = Math.max(stats.worst, gap);
+        }
+        requestAnimationFrame(tick);
+    };
+    requestAnimationFrame(tick);
+
+    observePerformance('longtask', () => {
+        stats.longTasks += 1;
+    });
+
+    setInterval(() => writeDom(() => {
+        overlay.textContent = `frames ${stats.frames} | long (>${LONG_FRAME_MS}ms) ${stats.longFrames}` +
+            ` | worst ${Math.round(stats.worst)}ms | long tasks ${stats.longTasks}`;
+    }), 500);
+}
+
 // ========================================
 // INITIALIZATION
 // ========================================
@@ -331,6 +880,10 @@ document.addEventListener('DOMContentLoaded', () => {
     // Initialize navigation
     initializeNavigation();
 
+    if (new URLSearchParams(location.search).get('debug') === 'frames') {
+        initFrameOverlay();
+    }
+
     // Add resize listener with debounce
     window.addEventListener('resize', debounce(() => {
         // Handle any responsive adjustments here
@@ -0,0 +1,129 @@
+// ========================================
+// SHOWCASE SEARCH WORKER
+// ========================================
+// Loads data/search-index.json (written by search_index.py during the
+// build) and answers queries off the main thread. Tokenising and stemming
+// mirror search_index.py; change both together.
+//
+// Messages in:  { type: 'load', url }  |  { type: 'query', id, query }
+// Messages out: { type: 'ready' } | { type: 'error', message } | { type: 'results', id, ids }
+
+const INDEX_VERSION = 1;
+const MIN_STEM = 3;
+const PREFIX_LIMIT = 50;
+
+const STOPWORDS = new Set(`
+a an and are as at be by for from in into is it its of on or the to with
+ada adalah akan dan dari dengan di ini itu juga ke untuk pada yang
+`.split(/\s+/).filter(Boolean));
+
+const ID_PARTICLES = ['nya', 'lah', 'kah', 'pun'];
+const EN_SUFFIXES = [['ings', ''], ['ing', ''], ['ies', 'y'], ['ied', 'y'], ['ed', ''], ['es', ''],
+    ['ly', ''], ['s', '']];
+const ID_SUFFIXES = ['kan', 'an', 'i'];
+const ID_PREFIXES = ['meng', 'meny', 'mem', 'men', 'me', 'peng', 'peny', 'pem', 'pen', 'pe',
+    'ber', 'be', 'ter', 'di', 'ke', 'se'];
+
+let index = null;
+let sortedTerms = [];
+
+function stripSuffix(word, suffixes) {
+    for (const suffix of suffixes) {
+        if (word.endsWith(suffix) && word.length - suffix.length >= MIN_STEM) {
+            return word.slice(0, -suffix.length);
+        }
+    }
+    return word;
+}
+
+function stem(word) {
+    word = stripSuffix(word, ID_PARTICLES);
+    for (const [suffix, replacement] of EN_SUFFIXES) {
+        if (word.endsWith(suffix) && word.length - suffix.length >= MIN_STEM) {
+            return word.slice(0, -suffix.length) + replacement;
+        }
+    }
+    word = stripSuffix(word, ID_SUFFIXES);
+    for (const prefix of ID_PREFIXES) {
+        if (word.startsWith(prefix)) {
+            if (word.length - prefix.length > MIN_STEM) return word.slice(prefix.length);
+            break;
+        }
+    }
+    return word;
+}
+
+function tokenize(text) {
+    const ascii = String(text).normalize('NFKD').replace(/[^\x00-\x7f]/g, '').toLowerCase();
+    return (ascii.match(/[a-z0-9]+/g) || []).filter((token) => !STOPWORDS.has(token));
+}
+
+// Terms are sorted (Python sorts by code point, as does < on ASCII strings)
+function termsWithPrefix(prefix) {
+    let lo = 0;
+    let hi = sortedTerms.length;
+    while (lo < hi) {
+        const mid = (lo + hi) >> 1;
+        if (sortedTerms[mid] < prefix) lo = mid + 1;
+        else hi = mid;
+    }
+    const found = [];
+    while (lo < sortedTerms.length && sortedTerms[lo].startsWith(prefix) && found.length < PREFIX_LIMIT) {
+        found.push(sortedTerms[lo++]);
+    }
+    return found;
+}
+
+function addPostings(term, matches) {
+    const entry = index.terms[term];
+    if (!entry) return;
+    const [gaps, weights] = entry;
+    let doc = 0;
+    for (let i = 0; i < gaps.length; i++) {
+        doc += gaps[i];
+        matches.set(doc, Math.max(matches.get(doc) || 0, weights[i]));
+    }
+}
+
+function search(query) {
+    const words = tokenize(query);
+    if (words.length === 0) return null;
+    let scores = null;
+    words.forEach((word, i) => {
+        const candidates = new Set([stem(word), word]);
+        if (i === words.length - 1) termsWithPrefix(word).forEach((term) => candidates.add(term));
+        const matches = new Map();
+        candidates.forEach((term) => addPostings(term, matches));
+        if (scores === null) {
+            scores = matches;
+        } else {
+            const next = new Map();
+            scores.forEach((score, doc) => {
+                if (matches.has(doc)) next.set(doc, score + matches.get(doc));
+            });
+            scores = next;
+        }
+    });
+    return [...scores.entries()]
+        .sort((a, b) => b[1] - a[1] || a[0] - b[0])
+        .map(([doc]) => index.ids[doc]);
+}
+
+self.addEventListener('message', async (event) => {
+    const message = event.data;
+    if (message.type === 'load') {
+        try {
+            const response = await fetch(message.url);
+            if (!response.ok) throw new Error(`HTTP ${response.status}`);
+            const loaded = await response.json();
+            if (loaded.version !== INDEX_VERSION) throw new Error(`unsupported index version ${loaded.version}`);
+            index = loaded;
+            sortedTerms = Object.keys(index.terms).sort();
+            self.postMessage({ type: 'ready' });
+        } catch (error) {
+            self.postMessage({ type: 'error', message: String(error) });
+        }
+    } else if (message.type === 'query' && index) {
+        self.postMessage({ type: 'results', id: message.id, ids: search(message.query) });
+    }
+});
@@ -0,0 +1,174 @@
+// ========================================
+// PORTFOLIO SERVICE WORKER
+// ========================================
+// Template: build_site.py fills in MANIFEST and writes the result to sw.js
+// in the output directory. Opening index.html from the source tree does
+// not register a worker.
+
+const MANIFEST = {/* MANIFEST */};
+
+const PREFIX = 'portfolio-';
+const SHELL_CACHE = `${PREFIX}shell-${MANIFEST.version}`;
+const DATA_CACHE = `${PREFIX}data`;
+const MEDIA_CACHE = `${PREFIX}media`;
+const PAGES_CACHE = `${PREFIX}pages`;
+const LRU_KEY = '/__media-lru__';
+
+const scopeUrl = (path) => new URL(path, self.registration.scope).href;
+
+// ========================================
+// INSTALL / ACTIVATE
+// ========================================
+
+// A new version only takes over once its whole precache is in place:
+// addAll() stores nothing if any request fails.
+self.addEventListener('install', (event) => {
+    event.waitUntil((async () => {
+        const cache = await caches.open(SHELL_CACHE);
+        await cache.addAll(MANIFEST.precache.map((entry) => new Request(scopeUrl(entry.url), { cache: 'reload' })));
+        await self.skipWaiting();
+    })());
+});
+
+self.addEventListener('activate', (event) => {
+    event.waitUntil((async () => {
+        const names = await caches.keys();
+        await Promise.all(names
+            .filter((name) => name.startsWith(`${PREFIX}shell-`) && name !== SHELL_CACHE)
+            .map((name) => caches.delete(name)));
+        // Drop the pages of projects that were removed
+        const pages = await caches.open(PAGES_CACHE);
+        const stored = await pages.keys();
+        await Promise.all(stored
+            .filter((request) => !pageUrls.has(request.url))
+            .map((request) => pages.delete(request)));
+        await self.clients.claim();
+    })());
+});
+
+// ========================================
+// ROUTING
+// ========================================
+
+self.addEventListener('fetch', (event) => {
+    const request = event.request;
+    if (request.method !== 'GET') return;
+    const url = new URL(request.url);
+    if (url.origin !== self.location.origin) return;
+
+    const path = url.href.split('#')[0];
+    // Project pages, whether navigated to or prefetched by main.js, come
+    // from their own cache and are refreshed behind the visitor's back
+    if (pageUrls.has(path.split('?')[0])) {
+        event.respondWith(staleWhileRevalidate(request, event, PAGES_CACHE));
+    } else if (shellUrls.has(path) || indexUrls.has(path.split('?')[0])) {
+        event.respondWith(cacheFirst(request));
+    } else if (request.mode === 'navigate') {
+        // Any other page or file opened directly: the network's answer,
+        // or a cached copy of that same URL when offline
+        event.respondWith(networkFirst(request));
+    } else if (dataUrls.has(path.split('?')[0])) {
+        event.respondWith(staleWhileRevalidate(request, event, DATA_CACHE));
+    } else if (mediaUrls.has(path) && !request.headers.has('range')) {
+        event.respondWith(cachedMedia(request, event));
+    }
+});
+
+const shellUrls = new Set(MANIFEST.precache.map((entry) => scopeUrl(entry.url)));
+const dataUrls = new Set(MANIFEST.data.map((url) => scopeUrl(url)));
+const mediaUrls = new Set(MANIFEST.media.map((url) => scopeUrl(url)));
+const pageUrls = new Set(MANIFEST.pages.map((url) => scopeUrl(url)));
+// Both URLs of the home page are answered with the precached index.html
+const indexUrls = new Set([scopeUrl('./'), scopeUrl('index.html')]);
+
+async function cacheFirst(request) {
+    const cache = await caches.open(SHELL_CACHE);
+    const home = indexUrls.has(request.url.split(/[?#]/)[0]);
+    const cached = await cache.match(home ? scopeUrl('index.html') : request, { ignoreSearch: home });
+    return cached || fetch(request);
+}
+
+async function networkFirst(request) {
+    try {
+        return await fetch(request);
+    } catch (error) {
+        const cached = await caches.match(request, { ignoreSearch: true });
+        if (cached) return cached;
+        throw error;
+    }
+}
+
+async function staleWhileRevalidate(request, event, cacheName) {
+    const cache = await caches.open(cacheName);
+    const cached = await cache.match(request, { ignoreSearch: true });
+    const refresh = fetch(request).then(async (response) => {
+        if (response.ok) await cache.put(request.url.split('?')[0], response.clone());
+        return response;
+    });
+    if (cached) {
+        event.waitUntil(refresh.catch(() => {}));
+        return cached;
+    }
+    return refresh;
+}
+
+// ========================================
+// MEDIA CACHE (size-capped, least recently used out first)
+// ========================================
+
+// The LRU index lives in the media cache itself so it survives worker
+// restarts; updates are chained so concurrent fetches don't lose entries.
+let lruQueue = Promise.resolve();
+
+function updateLru(change) {
+    lruQueue = lruQueue.then(async () => {
+        const cache = await caches.open(MEDIA_CACHE);
+        const stored = await cache.match(LRU_KEY);
+        const index = stored ? await stored.json() : {};
+        change(index);
+        let total = Object.values(index).reduce((sum, entry) => sum + entry.size, 0);
+        const oldestFirst = Object.keys(index).sort((a, b) => index[a].used - index[b].used);
+        for (const url of oldestFirst) {
+            if (total <= MANIFEST.mediaCacheBytes) break;
+            total -= index[url].size;
+            delete index[url];
+            await cache.delete(url);
+        }
+        await cache.put(LRU_KEY, new Response(JSON.stringify(index), {
+            headers: { 'Content-Type': 'application/json' }
+        }));
+    }).catch(() => {});
+    return lruQueue;
+}
+
+async function cachedMedia(request, event) {
+    const cache = await caches.open(MEDIA_CACHE);
+    const cached = await cache.match(request, { ignoreSearch: true });
+    if (cached) {
+        event.waitUntil(updateLru((index) => {
+            if (index[request.url]) index[request.url].used = Date.now();
+        }));
+        return cached;
+    }
+
+    const response = await fetch(request);
+    // Opaque or partial responses can't be sized or replayed
+    if (response.status === 200 && response.type === 'basic') {
+        const copy = response.clone();
+        event.waitUntil((async () => {
+            const body = await copy.blob();
+            if (body.size > MANIFEST.mediaCacheBytes) return;
+            await cache.put(request.url, new Response(body, { headers: copy.headers }));
+            await updateLru((index) => {
+                index[request.url] = { size: body.size, used: Date.now() };
+            });
+        })().catch(() => {}));
+    }
+    return response;
+}
+
+self.addEventListener('message', (event) => {
+    if (event.data === 'clear-media') {
+        event.waitUntil(caches.delete(MEDIA_CACHE));
+    }
+});
@@ -0,0 +1,411 @@
+#!/usr/bin/env python3
+"""
+Portfolio Load Test
+---------------------------
+Simulates visitors against a running copy of the site, e.g. the built
+site served with `python -m http.server -d dist 8000`. Each virtual
+visitor follows a scenario: the page, its stylesheet and script, the
+data file, the logo, the thumbnails in view and Range requests into
+hover videos, with up to six connections like a browser. Visitors are
+started gradually over the ramp-up time, and each one's download speed
+can be capped to model slow connections.
+
+Latency (time to last byte), time to first byte and throughput are
+reported per resource class, and --out writes them as JSON in the
+benchmarks' report format so runs can be compared with --baseline.
+
+Usage:
+    python loadtest.py http://localhost:8000/
+    python loadtest.py http://localhost:8000/ --users 200 --ramp 30 --duration 120
+    python loadtest.py http://localhost:8000/ --bandwidth 200      # KB/s per visitor
+    python loadtest.py http://localhost:8000/ --scenario visit.json --out run.json
+    python loadtest.py http://localhost:8000/ --baseline run.json --threshold 0.2
+
+Scenario format (paths are relative to the site URL; "from" takes the
+files from the site's portfolio-data.json):
+    {
+      "thinkTime": 2.0,
+      "steps": [
+        {"class": "html", "paths": [""]},
+        {"class": "shell", "paths": ["css/styles.css", "js/main.js"]},
+        {"class": "thumbnail", "from": "thumbnails", "limit": 6},
+        {"class": "video", "from": "videos", "limit": 2, "range": 524288, "chunks": 2}
+      ]
+    }
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import ssl
+import sys
+import time
+from urllib.parse import quote, urljoin, urlsplit
+
+import build_site
+import tracing
+from console import Colors
+from benchmarks.harness import compare, format_seconds, make_report
+from telemetry import percentile
+
+# Browsers open about six connections per host
+CONNECTIONS_PER_VISITOR = 6
+READ_CHUNK = 64 * 1024
+NO_BODY_STATUSES = (204, 304)
+TIMEOUT = 30
+
+DEFAULT_SCENARIO = {
+    'thinkTime': 2.0,
+    'steps': [
+        {'class': 'html', 'paths': ['']},
+        {'class': 'shell', 'paths': ['css/styles.css', 'js/main.js']},
+        {'class': 'data', 'paths': [build_site.SITE_DATA_PATH]},
+        {'class': 'logo', 'from': 'logo'},
+        # Two rows of cards on a desktop screen
+        {'class': 'thumbnail', 'from': 'thumbnails', 'limit': 6},
+        # Hovering a card plays its video; the browser streams it in ranges
+        {'class': 'video', 'from': 'videos', 'limit': 2, 'range': 512 * 1024, 'chunks': 2},
+    ],
+}
+
+
+# ========================================
+# HTTP
+# ========================================
+
+class Throttle:
+    """Caps one visitor's download rate across all of its connections"""
+
+    def __init__(self, bytes_per_second):
+        self.rate = bytes_per_second
+        self.started = time.perf_counter()
+        self.received = 0
+
+    async def consume(self, size):
+        if not self.rate:
+            return
+        self.received += size
+        ahead = self.received / self.rate - (time.perf_counter() - self.started)
+        if ahead > 0:
+            await asyncio.sleep(ahead)
+
+
+class Connection:
+    """One keep-alive HTTP/1.1 connection; reopened when the server closes it"""
+
+    def __init__(self, base, throttle):
+        self.base = base
+        self.throttle = throttle
+        self.reader = self.writer = None
+
+    async def open(self):
+        port = self.base.port or (443 if self.base.scheme == 'https' else 80)
+        context = ssl.create_default_context() if self.base.scheme == 'https' else None
+        self.reader, self.writer = await asyncio.open_connection(self.base.hostname, port, ssl=context)
+
+    def close(self):
+        if self.writer:
+            self.writer.close()
+        self.reader = self.writer = None
+
+    async def get(self, path, headers=None, body=None):
+        """(status, body bytes, seconds to first byte) for a GET of path;
+        the body itself is appended to the body bytearray when one is given"""
+        if self.writer is None:
+            await self.open()
+        lines = [f"GET {path} HTTP/1.1", f"Host: {self.base.netloc}", "User-Agent: portfolio-loadtest",
+                 "Accept-Encoding: identity"]
+        lines += [f"{name}: {value}" for name, value in (headers or {}).items()]
+        started = time.perf_counter()
+        self.writer.write(('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1'))
+        await self.writer.drain()
+
+        ttfb = None
+        while True:
+            status_line = await self.reader.readline()
+            if not status_line:
+                raise ConnectionError("server closed the connection")
+            if ttfb is None:
+                ttfb = time.perf_counter() - started
+            version, status = status_line.split()[:2]
+            status = int(status)
+            response = {}
+            while True:
+                line = await self.reader.readline()
+                if line in (b'\r\n', b'\n', b''):
+                    break
+                name, _, value = line.decode('latin-1').partition(':')
+                response[name.strip().lower()] = value.strip()
+            # 1xx responses are interim; the real one follows
+            if not 100 <= status < 200:
+                break
+
+        if status in NO_BODY_STATUSES:
+            size = 0
+        elif response.get('transfer-encoding', '').lower() == 'chunked':
+            size = await self._read_chunked(body)
+        elif 'content-length' in response:
+            size = await self._read(int(response['content-length']), body)
+        else:
+            size = await self._read(None, body)
+        if version == b'HTTP/1.0' or response.get('connection', '').lower() == 'close' \
+                or status not in NO_BODY_STATUSES and 'content-length' not in response \
+                and 'transfer-encoding' not in response:
+            self.close()
+        return status, size, ttfb
+
+    async def _read(self, length, body=None):
+        size = 0
+        while length is None or size < length:
+            chunk = await self.reader.read(READ_CHUNK if length is None else min(READ_CHUNK, length - size))
+            if not chunk:
+                if length is None:
+                    break
+                raise ConnectionError("response ended early")
+            size += len(chunk)
+            if body is not None:
+                body += chunk
+            await self.throttle.consume(len(chunk))
+        return size
+
+    async def _read_chunked(self, body=None):
+        size = 0
+        while True:
+            length = int((await self.reader.readline()).split(b';')[0], 16)
+            if length == 0:
+                await self.reader.readline()
+                return size
+            size += await self._read(length, body)
+            await self.reader.readline()
+
+
+# ========================================
+# SCENARIO
+# ========================================
+
+def site_paths(data, source):
+    """Relative URLs of the logo, thumbnails or card videos in a portfolio"""
+    if source == 'logo':
+        logo = data.get('config', {}).get('logo', {})
+        refs = [logo.get('content', '')] if logo.get('type') == 'image' else []
+    elif source == 'thumbnails':
+        refs = [p.get('thumbnail', '') for p in data.get('projects', [])
+                if not p.get('videoUrl', '').endswith(('.mp4', '.webm'))]
+    elif source == 'videos':
+        refs = [p.get('videoUrl', '') for p in data.get('projects', [])
+                if p.get('videoUrl', '').endswith(('.mp4', '.webm'))]
+    else:
+        raise ValueError(f"Unknown scenario source: {source}")
+    return [ref for ref in dict.fromkeys(refs) if build_site.is_local_ref(ref)]
+
+
+def resolve_steps(scenario, data):
+    """Scenario steps with their "from" lists expanded into paths"""
+    steps = []
+    for step in scenario['steps']:
+        paths = step.get('paths') or site_paths(data, step['from'])
+        if step.get('limit') is not None:
+            paths = paths[:step['limit']]
+        if paths:
+            steps.append(dict(step, paths=paths))
+    return steps
+
+
+class Results:
+    def __init__(self):
+        self.classes = {}
+        self.visits = 0
+
+    def record(self, name, status, size, seconds, ttfb, error=None):
+        entry = self.classes.setdefault(name, {'latency': [], 'ttfb': [], 'bytes': 0, 'errors': 0,
+                                               'statuses': {}})
+        if error or status >= 400:
+            entry['errors'] += 1
+        key = str(status) if status else type(error).__name__
+        entry['statuses'][key] = entry['statuses'].get(key, 0) + 1
+        if not error:
+            entry['latency'].append(seconds)
+            entry['ttfb'].append(ttfb)
+            entry['bytes'] += size
+
+    def summary(self, elapsed):
+        summary = {}
+        for name, entry in sorted(self.classes.items()):
+            latency = sorted(entry['latency'])
+            requests = sum(entry['statuses'].values())
+            summary[name] = {
+                # 'median' and 'min' let benchmarks.harness.compare() read the report
+                'median': percentile(latency, 50) or 0.0,
+                'min': latency[0] if latency else 0.0,
+                'p95': percentile(latency, 95) or 0.0,
+                'p99': percentile(latency, 99) or 0.0,
+                'ttfbMedian': percentile(sorted(entry['ttfb']), 50) or 0.0,
+                'requests': requests,
+                'errors': entry['errors'],
+                'statuses': entry['statuses'],
+                'bytes': entry['bytes'],
+                'requestsPerSecond': requests / elapsed if elapsed else 0.0,
+                'bytesPerSecond': entry['bytes'] / elapsed if elapsed else 0.0,
+            }
+        return summary
+
+
+async def fetch(pool, base, path, name, results, headers=None):
+    connection = await pool.get()
+    started = time.perf_counter()
+    try:
+        status, size, ttfb = await asyncio.wait_for(connection.get(urljoin(base.path, quote(path)), headers),
+                                                    TIMEOUT)
+        results.record(name, status, size, time.perf_counter() - started, ttfb)
+    except (OSError, asyncio.TimeoutError, ValueError) as e:
+        connection.close()
+        results.record(name, 0, 0, 0, 0, error=e)
+    finally:
+        pool.put_nowait(connection)
+
+
+async def visit(base, steps, throttle, results):
+    pool = asyncio.Queue()
+    for _ in range(CONNECTIONS_PER_VISITOR):
+        pool.put_nowait(Connection(base, throttle))
+    try:
+        for step in steps:
+            if step.get('range'):
+                # Each video plays in sequential ranges, but videos load side by side
+                async def stream(path, step=step):
+                    for chunk in range(step.get('chunks', 1)):
+                        start = chunk * step['range']
+                        await fetch(pool, base, path, step['class'], results,
+                                    {'Range': f"bytes={start}-{start + step['range'] - 1}"})
+                await asyncio.gather(*(stream(path) for path in step['paths']))
+            else:
+                await asyncio.gather(*(fetch(pool, base, path, step['class'], results) for path in step['paths']))
+    finally:
+        while not pool.empty():
+            pool.get_nowait().close()
+    results.visits += 1
+
+
+async def visitor(base, steps, scenario, delay, deadline, bandwidth, results):
+    await asyncio.sleep(delay)
+    while time.perf_counter() < deadline:
+        await visit(base, steps, Throttle(bandwidth), results)
+        # Spread repeat visits so visitors don't move in lockstep
+        await asyncio.sleep(scenario.get('thinkTime', 0) * random.uniform(0.5, 1.5))
+
+
+async def load_site_data(base):
+    """The site's portfolio-data.json, for the scenario's "from" steps"""
+    connection = Connection(base, Throttle(0))
+    path = urljoin(base.path, build_site.SITE_DATA_PATH)
+    body = bytearray()
+    try:
+        status, _, _ = await asyncio.wait_for(connection.get(path, body=body), TIMEOUT)
+    finally:
+        connection.close()
+    if status != 200:
+        raise ValueError(f"Could not load {path}: HTTP {status}")
+    return json.loads(body)
+
+
+@tracing.traced()
+def run(url, scenario=DEFAULT_SCENARIO, users=50, ramp=10.0, duration=60.0, bandwidth=0):
+    """Run the scenario; returns (per-class summary, visits, elapsed seconds)"""
+    base = urlsplit(url if url.endswith('/') else url + '/')
+    if base.scheme not in ('http', 'https'):
+        raise ValueError(f"Not an http(s) URL: {url}")
+
+    async def main():
+        data = await load_site_data(base)
+        steps = resolve_steps(scenario, data)
+        results = Results()
+        started = time.perf_counter()
+        deadline = started + duration
+        await asyncio.gather(*(visitor(base, steps, scenario, ramp * i / users, deadline, bandwidth, results)
+                               for i in range(users)))
+        elapsed = time.perf_counter() - started
+        return results.summary(elapsed), results.visits, elapsed
+
+    return asyncio.run(main())
+
+
+# ========================================
+# CLI
+# ========================================
+
+def format_rate(bytes_per_second):
+    return f"{bytes_per_second / 1024 / 1024:.1f} MB/s"
+
+
+def print_report(summary, visits, elapsed):
+    print(f"\n{Colors.BOLD}{visits} visits in {elapsed:.1f}s{Colors.END}\n")
+    print(f"{'class':<12} {'requests':>8} {'errors':>7} {'p50':>10} {'p95':>10} {'p99':>10} {'ttfb':>10} "
+          f"{'req/s':>8} {'throughput':>11}")
+    for name, stats in summary.items():
+        color = Colors.RED if stats['errors'] else ''
+        print(f"{color}{name:<12} {stats['requests']:>8} {stats['errors']:>7} "
+              f"{format_seconds(stats['median']):>10} {format_seconds(stats['p95']):>10} "
+              f"{format_seconds(stats['p99']):>10} {format_seconds(stats['ttfbMedian']):>10} "
+              f"{stats['requestsPerSecond']:>8.1f} {format_rate(stats['bytesPerSecond']):>11}"
+              f"{Colors.END if color else ''}")
+    video = summary.get('video')
+    if video and '206' not in video['statuses']:
+        print(f"\n{Colors.YELLOW}⚠ The server ignored Range requests; every hover downloaded the whole "
+              f"video{Colors.END}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load-test a running copy of the portfolio site")
+    parser.add_argument('url', help="Site URL, e.g. http://localhost:8000/")
+    parser.add_argument('--scenario', help="Scenario JSON file (default: a typical visit)")
+    parser.add_argument('--users', type=int, default=50, help="Concurrent visitors (default: 50)")
+    parser.add_argument('--ramp', type=float, default=10.0, help="Seconds to start all visitors over")
+    parser.add_argument('--duration', type=float, default=60.0, help="Seconds to run (default: 60)")
+    parser.add_argument('--bandwidth', type=float, default=0, help="KB/s per visitor (default: unlimited)")
+    parser.add_argument('--seed', type=int, default=None, help="Seed for think-time jitter")
+    parser.add_argument('--out', help="Write results JSON here")
+    parser.add_argument('--baseline', help="Compare median latencies with an earlier --out file")
+    parser.add_argument('--threshold', type=float, default=0.15, help="Allowed slowdown (default: 0.15)")
+    args = parser.parse_args(argv)
+
+    scenario = DEFAULT_SCENARIO
+    if args.scenario:
+        with open(args.scenario, 'r', encoding='utf-8') as f:
+            scenario = json.load(f)
+    random.seed(args.seed)
+
+    try:
+        summary, visits, elapsed = run(args.url, scenario, args.users, args.ramp, args.duration,
+                                       args.bandwidth * 1024)
+    except (OSError, ValueError) as e:
+        print(f"{Colors.RED}✗ {e}{Colors.END}")
+        return 1
+    print_report(summary, visits, elapsed)
+
+    params = {'url': args.url, 'users': args.users, 'ramp': args.ramp, 'duration': args.duration,
+              'bandwidth': args.bandwidth, 'scenario': scenario}
+    report = make_report(summary, params)
+    report['meta']['visits'] = visits
+    if args.out:
+        with open(args.out, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"\nResults written to {args.out}")
+
+    failed = any(stats['errors'] for stats in summary.values())
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        rows, regressions = compare(report, baseline, args.threshold)
+        print()
+        for name, median, base, change in rows:
+            change_text = f"{change:+.1%}" if change is not None else 'new'
+            flag = '  ✗ REGRESSION' if name in regressions else ''
+            print(f"{name:<12} {format_seconds(median):>12} {format_seconds(base):>12} {change_text:>8}{flag}")
+        failed = failed or bool(regressions)
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    tracing.enable_from_argv(sys.argv)
+    sys.exit(main())
@@ -0,0 +1,169 @@
+"""
+Structural three-way merge for portfolio documents.
+
+Used by the storage backends when a save finds that someone else has
+written the data file since it was loaded. Edits are merged per entity:
+projects are matched by id, skills by name and social links by platform,
+so two writers touching different entities never conflict. Only when
+both sides changed the same field of the same entity in different ways
+is a conflict reported. Two different entities added on both sides
+under the same numeric id (both writers took max(id) + 1) are both
+kept; ours is given the next free id.
+"""
+
+# Lists of entities and the field that identifies each entity
+ENTITY_KEYS = {
+    ('projects',): 'id',
+    ('skills',): 'name',
+    ('contact', 'social'): 'platform',
+}
+
+_MISSING = object()
+
+
+def three_way_merge(base, ours, theirs):
+    """Merge two edited copies of a document against their common ancestor.
+
+    Returns (merged, conflicts) where conflicts is a list of human-readable
+    paths that could not be merged automatically. On conflict the merged
+    document keeps the other writer's value for that path.
+    """
+    conflicts = []
+    merged = _merge_value(base, ours, theirs, (), conflicts)
+    return merged, conflicts
+
+
+def free_id(taken):
+    """The integer after the largest integer id in taken"""
+    return max((i for i in taken if isinstance(i, int) and not isinstance(i, bool)), default=0) + 1
+
+
+def renumber(entity, key, taken):
+    """A copy of entity under the next free id, which is added to taken"""
+    new_id = free_id(taken)
+    taken.add(new_id)
+    return {**entity, key: new_id}
+
+
+def _format_path(path):
+    return '.'.join(str(p) for p in path) or '<root>'
+
+
+def _merge_value(base, ours, theirs, path, conflicts):
+    if ours == theirs:
+        return ours
+    if ours == base:
+        return theirs
+    if theirs == base:
+        return ours
+
+    if isinstance(ours, dict) and isinstance(theirs, dict):
+        return _merge_dict(base if isinstance(base, dict) else {}, ours, theirs, path, conflicts)
+
+    if isinstance(ours, list) and isinstance(theirs, list):
+        base_list = base if isinstance(base, list) else []
+        key = ENTITY_KEYS.get(tuple(p for p in path if not p.startswith('[')))
+        if key and _has_unique_keys(key, base_list, ours, theirs):
+            return _merge_entities(key, base_list, ours, theirs, path, conflicts)
+        if all(_is_scalar(v) for v in base_list + ours + theirs):
+            return _merge_scalar_list(base_list, ours, theirs)
+
+    conflicts.append(_format_path(path))
+    return theirs
+
+
+def _merge_dict(base, ours, theirs, path, conflicts):
+    merged = {}
+    # Keep their key order, then append keys only we added
+    keys = list(theirs.keys()) + [k for k in ours.keys() if k not in theirs]
+    for key in keys:
+        b = base.get(key, _MISSING)
+        o = ours.get(key, _MISSING)
+        t = theirs.get(key, _MISSING)
+        if o is _MISSING and t is _MISSING:
+            continue
+        if o is _MISSING:
+            # We deleted it; fine unless they changed it meanwhile
+            if b is _MISSING:
+                merged[key] = t
+            elif t != b:
+                conflicts.append(_format_path(path + (key,)))
+                merged[key] = t
+            continue
+        if t is _MISSING:
+            # They deleted it; fine unless we changed it meanwhile
+            if b is _MISSING:
+                merged[key] = o
+            elif o != b:
+                conflicts.append(_format_path(path + (key,)))
+            continue
+        merged[key] = _merge_value(None if b is _MISSING else b, o, t, path + (key,), conflicts)
+    return merged
+
+
+def _is_scalar(value):
+    return isinstance(value, (str, int, float, bool)) or value is None
+
+
+def _has_unique_keys(key, *lists):
+    for items in lists:
+        if not all(isinstance(item, dict) for item in items):
+            return False
+        keys = [item.get(key) for item in items]
+        if len(keys) != len(set(map(repr, keys))):
+            return False
+    return True
+
+
+def _merge_scalar_list(base, ours, theirs):
+    """Apply our additions and removals to their list, keeping their order"""
+    removed = [v for v in base if v not in ours]
+    added = [v for v in ours if v not in base]
+    merged = [v for v in theirs if v not in removed]
+    merged.extend(v for v in added if v not in merged)
+    return merged
+
+
+def _merge_entities(key, base, ours, theirs, path, conflicts):
+    base_map = {repr(e.get(key)): e for e in base}
+    ours_map = {repr(e.get(key)): e for e in ours}
+    theirs_map = {repr(e.get(key)): e for e in theirs}
+
+    # If only we reordered, keep our order; otherwise theirs wins on order
+    ours_keys = [repr(e.get(key)) for e in ours]
+    base_keys = [repr(e.get(key)) for e in base]
+    theirs_keys = [repr(e.get(key)) for e in theirs]
+    if theirs_keys == base_keys:
+        order = ours_keys + [k for k in theirs_keys if k not in ours_map]
+    else:
+        order = theirs_keys + [k for k in ours_keys if k not in theirs_map]
+
+    merged = []
+    renumbered = []
+    taken = {e.get(key) for e in base + ours + theirs}
+    for k in order:
+        b = base_map.get(k, _MISSING)
+        o = ours_map.get(k, _MISSING)
+        t = theirs_map.get(k, _MISSING)
+        entity_path = path + (f"[{key}={k}]",)
+        if b is _MISSING and o is not _MISSING and t is not _MISSING and o != t \
+                and isinstance(o.get(key), int) and not isinstance(o.get(key), bool):
+            # Both sides added a record under the same new id; they are different records
+            merged.append(t)
+            renumbered.append(renumber(o, key, taken))
+            continue
+        if o is _MISSING:
+            if b is not _MISSING and t != b:
+                conflicts.append(_format_path(entity_path))
+                merged.append(t)
+            elif b is _MISSING:
+                merged.append(t)
+            continue
+        if t is _MISSING:
+            if b is not _MISSING and o != b:
+                conflicts.append(_format_path(entity_path))
+            elif b is _MISSING:
+                merged.append(o)
+            continue
+        merged.append(_merge_value(None if b is _MISSING else b, o, t, entity_path, conflicts))
+    return merged + renumbered
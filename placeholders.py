@@ -0,0 +1,86 @@
+"""
+Low-quality image placeholders for thumbnails and the logo.
+
+Each placeholder is a ~20px JPEG preview as a data URI plus the image's
+dominant colour. The page paints them (blurred) while the real image
+downloads, so the showcase doesn't pop in. Placeholders are cached by the
+source file's content hash and only recomputed when an image changes.
+"""
+
+from collections import Counter
+
+import storage
+
+PREVIEW_SIZE = 20
+PREVIEW_QUALITY = 50
+CACHE_VERSION = 1
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png')
+
+
+def dominant_color(image):
+    """Mean colour of the most common 4-bit-per-channel bucket in a (small) QImage"""
+    buckets = Counter()
+    sums = {}
+    for y in range(image.height()):
+        for x in range(image.width()):
+            pixel = image.pixel(x, y)
+            if (pixel >> 24) & 0xFF < 128:
+                continue
+            r, g, b = (pixel >> 16) & 0xFF, (pixel >> 8) & 0xFF, pixel & 0xFF
+            key = (r >> 4, g >> 4, b >> 4)
+            buckets[key] += 1
+            total = sums.setdefault(key, [0, 0, 0])
+            total[0] += r
+            total[1] += g
+            total[2] += b
+    if not buckets:
+        return '#e5e7eb'
+    key, count = buckets.most_common(1)[0]
+    r, g, b = (round(c / count) for c in sums[key])
+    return f"#{r:02x}{g:02x}{b:02x}"
+
+
+def compute_placeholder(path):
+    """Preview data URI, dominant colour and full size of an image; None if Qt can't read it"""
+    from PyQt5.QtCore import QBuffer, QByteArray, QIODevice, Qt
+    from PyQt5.QtGui import QImage, QPainter
+
+    image = QImage(path)
+    if image.isNull():
+        return None
+    small = image.scaled(PREVIEW_SIZE, PREVIEW_SIZE, Qt.KeepAspectRatio, Qt.SmoothTransformation)
+    small = small.convertToFormat(QImage.Format_ARGB32)
+
+    # JPEG has no alpha; flatten onto white like the page background
+    flat = QImage(small.size(), QImage.Format_RGB32)
+    flat.fill(Qt.white)
+    painter = QPainter(flat)
+    painter.drawImage(0, 0, small)
+    painter.end()
+
+    encoded = QByteArray()
+    buffer = QBuffer(encoded)
+    buffer.open(QIODevice.WriteOnly)
+    flat.save(buffer, 'JPG', PREVIEW_QUALITY)
+    buffer.close()
+    preview = bytes(encoded.toBase64()).decode('ascii')
+    return {
+        'preview': f"data:image/jpeg;base64,{preview}",
+        'color': dominant_color(small),
+        'width': image.width(),
+        'height': image.height(),
+    }
+
+
+class PlaceholderCache(storage.JsonCache):
+    """Placeholders keyed by the source image's content hash"""
+
+    def __init__(self, path):
+        super().__init__(path, CACHE_VERSION)
+
+    def get(self, source_hash, path):
+        """The placeholder for a file, computing it only when its hash is new"""
+        self.used.add(source_hash)
+        if source_hash not in self.entries:
+            self.entries[source_hash] = compute_placeholder(path)
+        return self.entries[source_hash]
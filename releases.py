@@ -0,0 +1,274 @@
+#!/usr/bin/env python3
+"""
+Portfolio Releases
+---------------------------
+Publishes a built site (see build_site.py) as an immutable release and
+serves it through a symlink, so visitors always get one complete version
+of the site and going back is a single switch.
+
+    <root>/releases/<id>/     one directory per release, never modified
+    <root>/current            symlink to the release being served
+    <root>/history.json       every switch of current, oldest first
+
+A release id is the hash of the build's file manifest, so publishing the
+same build twice reuses its release. Files that are unchanged from an
+earlier release are hard-linked rather than copied, and releases beyond
+the retention count are pruned (the served one never is). Releases are
+ordered by when they were last served, so republishing an older build
+makes it the newest, and rollback returns to the release served before. Point the web
+server's document root at <root>/current; the host must support symlinks.
+
+Usage:
+    python releases.py publish --root /srv/portfolio            # Release dist/
+    python releases.py publish --root /srv/portfolio --build    # Build first
+    python releases.py list --root /srv/portfolio
+    python releases.py rollback --root /srv/portfolio           # Back to the release served before
+    python releases.py rollback 3f2a9c1d --root /srv/portfolio  # To a given release
+    python releases.py prune --root /srv/portfolio --keep 3
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import sys
+import time
+from datetime import datetime
+
+import build_site
+import buildgraph
+import deploy
+import tracing
+from console import Colors, format_bytes
+
+SOURCE_DIR = build_site.OUTPUT_DIR
+RELEASES_DIR = 'releases'
+CURRENT_LINK = 'current'
+RELEASE_FILE = '.release.json'
+HISTORY_FILE = 'history.json'
+KEEP = 5
+ID_LENGTH = 12
+
+
+class ReleaseError(Exception):
+    """A release could not be found or switched to"""
+
+
+def release_id(files):
+    """Content hash of a {rel: {'hash', 'size'}} manifest"""
+    digest = hashlib.sha256()
+    for rel in sorted(files):
+        digest.update(f"{rel}\0{files[rel]['hash']}\n".encode('utf-8'))
+    return digest.hexdigest()[:ID_LENGTH]
+
+
+def load_release(path):
+    try:
+        with open(os.path.join(path, RELEASE_FILE), 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return None
+
+
+def read_history(root):
+    """[{'id', 'served'}] for every switch of the current link, oldest first"""
+    try:
+        with open(os.path.join(root, HISTORY_FILE), 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return []
+
+
+def write_history(root, history):
+    path = os.path.join(root, HISTORY_FILE)
+    with open(f"{path}.tmp", 'w', encoding='utf-8') as f:
+        json.dump(history, f, indent=2)
+    os.replace(f"{path}.tmp", path)
+
+
+def list_releases(root):
+    """Release records, least recently served first (never-served ones by creation time)"""
+    directory = os.path.join(root, RELEASES_DIR)
+    if not os.path.isdir(directory):
+        return []
+    found = []
+    for name in os.listdir(directory):
+        record = load_release(os.path.join(directory, name))
+        # Half-written releases (.<id>.tmp) have no record yet
+        if record and not name.startswith('.'):
+            found.append(record)
+    served = {entry['id']: entry['served'] for entry in read_history(root)}
+    return sorted(found, key=lambda record: max(record['created'], served.get(record['id'], '')))
+
+
+def current_release(root):
+    link = os.path.join(root, CURRENT_LINK)
+    if not os.path.islink(link):
+        return None
+    return os.path.basename(os.readlink(link))
+
+
+def find_release(root, prefix):
+    matches = [record for record in list_releases(root) if record['id'].startswith(prefix)]
+    if not matches:
+        raise ReleaseError(f"No release matches {prefix}")
+    if len(matches) > 1:
+        raise ReleaseError(f"{prefix} matches {len(matches)} releases; give more characters")
+    return matches[0]
+
+
+def switch(root, release):
+    """Point the current link at a release, atomically by rename, and record it in the history"""
+    link = os.path.join(root, CURRENT_LINK)
+    tmp_link = f"{link}.tmp"
+    if os.path.lexists(tmp_link):
+        os.remove(tmp_link)
+    os.symlink(os.path.join(RELEASES_DIR, release), tmp_link, target_is_directory=True)
+    os.replace(tmp_link, link)
+    history = read_history(root)
+    history.append({'id': release, 'served': datetime.now().isoformat(timespec='milliseconds')})
+    write_history(root, history)
+
+
+def known_files(root):
+    """{hash: path} of the files already held by releases, to hard-link from"""
+    known = {}
+    for record in list_releases(root):
+        base = os.path.join(root, RELEASES_DIR, record['id'])
+        for rel, info in record['files'].items():
+            known.setdefault(info['hash'], os.path.join(base, *rel.split('/')))
+    return known
+
+
+def link_or_copy(src, dest, existing):
+    os.makedirs(os.path.dirname(dest), exist_ok=True)
+    if existing:
+        try:
+            os.link(existing, dest)
+            return True
+        except OSError:
+            pass  # Another file system, or no hard links; fall back to a copy
+    shutil.copy2(src, dest)
+    return False
+
+
+@tracing.traced()
+def publish(source=SOURCE_DIR, root=None, keep=KEEP, jobs=None, log=print):
+    """Create (or reuse) the release for source, switch to it and prune; returns its record"""
+    if not os.path.isdir(source):
+        raise FileNotFoundError(f"{source} does not exist; run build_site.py first")
+    files = deploy.hash_tree(source, deploy.list_files(source), jobs)
+    rid = release_id(files)
+    target = os.path.join(root, RELEASES_DIR, rid)
+    record = load_release(target)
+
+    if record:
+        log(f"Release {rid} already exists")
+    else:
+        started = time.perf_counter()
+        os.makedirs(os.path.join(root, RELEASES_DIR), exist_ok=True)
+        known = known_files(root)
+        tmp_dir = os.path.join(root, RELEASES_DIR, f".{rid}.tmp")
+        # Left behind by an interrupted publish
+        for leftover in (tmp_dir, target):
+            if os.path.isdir(leftover):
+                shutil.rmtree(leftover)
+        linked = copied_bytes = 0
+        with tracing.span('releases.write', files=len(files)):
+            for rel, info in files.items():
+                src = os.path.join(source, *rel.split('/'))
+                if link_or_copy(src, os.path.join(tmp_dir, *rel.split('/')), known.get(info['hash'])):
+                    linked += 1
+                else:
+                    copied_bytes += info['size']
+        record = {'id': rid, 'created': datetime.now().isoformat(timespec='milliseconds'), 'files': files}
+        with open(os.path.join(tmp_dir, RELEASE_FILE), 'w', encoding='utf-8') as f:
+            json.dump(record, f, indent=2, sort_keys=True)
+        # The release appears under its id complete or not at all
+        os.replace(tmp_dir, target)
+        log(f"Created release {rid}: {len(files) - linked} file(s) copied "
+            f"({format_bytes(copied_bytes)}), {linked} hard-linked, "
+            f"in {time.perf_counter() - started:.2f}s")
+
+    switch(root, rid)
+    log(f"Serving release {rid}")
+    prune(root, keep, log)
+    return record
+
+
+def rollback(root, prefix=None, log=print):
+    """Switch to the given release, or to the one served before the current release"""
+    current = current_release(root)
+    if prefix:
+        rid = find_release(root, prefix)['id']
+    else:
+        ids = {record['id'] for record in list_releases(root)}
+        earlier = [entry['id'] for entry in read_history(root) if entry['id'] != current and entry['id'] in ids]
+        if not earlier:
+            # Roots published before the history was kept: fall back to creation order
+            created = [record['id'] for record in sorted(list_releases(root), key=lambda r: r['created'])]
+            earlier = created[:created.index(current)] if current in created else []
+        if not earlier:
+            raise ReleaseError("There is no earlier release to roll back to")
+        rid = earlier[-1]
+    switch(root, rid)
+    log(f"Serving release {rid} (was {current})")
+    return rid
+
+
+def prune(root, keep=KEEP, log=print):
+    """Delete the least recently served releases beyond keep, never the served one"""
+    current = current_release(root)
+    releases = [record['id'] for record in list_releases(root)]
+    removed = []
+    for rid in releases[:max(len(releases) - keep, 0)]:
+        if rid == current:
+            continue
+        # Hard-linked files live on in the releases that still use them
+        shutil.rmtree(os.path.join(root, RELEASES_DIR, rid))
+        removed.append(rid)
+        log(f"Pruned release {rid}")
+    if removed:
+        write_history(root, [entry for entry in read_history(root) if entry['id'] not in removed])
+    return removed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Publish the built site as immutable releases")
+    parser.add_argument('command', choices=['publish', 'list', 'rollback', 'prune'])
+    parser.add_argument('release', nargs='?', help="Release id (or a prefix of it) for rollback")
+    parser.add_argument('--root', required=True, help="Directory holding releases/ and the current link")
+    parser.add_argument('--source', default=SOURCE_DIR, help="Built site to publish (default: dist)")
+    parser.add_argument('--build', action='store_true', help="Run build_site.py into --source first")
+    parser.add_argument('--keep', type=int, default=KEEP, help=f"Releases to keep (default: {KEEP})")
+    parser.add_argument('--jobs', type=int, default=None, help="Parallel hashing (default: automatic)")
+    args = parser.parse_args(argv)
+
+    try:
+        if args.command == 'publish':
+            if args.build:
+                build_site.build_site(output_dir=args.source, jobs=args.jobs)
+            publish(args.source, args.root, args.keep, args.jobs)
+        elif args.command == 'list':
+            current = current_release(args.root)
+            served = {entry['id']: entry['served'] for entry in read_history(args.root)}
+            for record in reversed(list_releases(args.root)):
+                marker = f"{Colors.GREEN}*{Colors.END}" if record['id'] == current else ' '
+                size = sum(info['size'] for info in record['files'].values())
+                print(f"{marker} {Colors.BOLD}{record['id']}{Colors.END}  {record['created']}  "
+                      f"served {served.get(record['id'], 'never')}  "
+                      f"{len(record['files'])} files  {format_bytes(size)}")
+        elif args.command == 'rollback':
+            rollback(args.root, args.release)
+        else:
+            prune(args.root, args.keep)
+    except (buildgraph.BuildError, ReleaseError, OSError) as e:
+        print(f"{Colors.RED}✗ {e}{Colors.END}")
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    tracing.enable_from_argv(sys.argv)
+    sys.exit(main())
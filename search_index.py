@@ -0,0 +1,151 @@
+"""
+Inverted index for the showcase search.
+
+The build writes data/search-index.json from the projects' titles,
+descriptions and tags. js/search-worker.js loads it and answers queries
+off the main thread. Tokenising and stemming are mirrored in the worker,
+so change both together (and bump INDEX_VERSION).
+
+Index format:
+    {
+      "version": 1,
+      "ids": [<project id>, ...],            # document number -> project id
+      "terms": {"<term>": [[<gaps>], [<weights>]], ...}
+    }
+
+Postings are document numbers in ascending order stored as gaps from the
+previous one; weights add up title (3), tag (2) and description (1) hits.
+"""
+
+import re
+import unicodedata
+
+INDEX_VERSION = 1
+FIELD_WEIGHTS = (('title', 3), ('tags', 2), ('description', 1))
+MIN_STEM = 3
+
+STOPWORDS = frozenset("""
+a an and are as at be by for from in into is it its of on or the to with
+ada adalah akan dan dari dengan di ini itu juga ke untuk pada yang
+""".split())
+
+_TOKEN_RE = re.compile(r'[a-z0-9]+')
+
+# Indonesian particles and possessives come off first, then either an
+# English inflection or an Indonesian suffix, then the longest Indonesian
+# prefix that leaves enough of the word
+_ID_PARTICLES = ('nya', 'lah', 'kah', 'pun')
+_EN_SUFFIXES = (('ings', ''), ('ing', ''), ('ies', 'y'), ('ied', 'y'), ('ed', ''), ('es', ''),
+                ('ly', ''), ('s', ''))
+_ID_SUFFIXES = ('kan', 'an', 'i')
+_ID_PREFIXES = ('meng', 'meny', 'mem', 'men', 'me', 'peng', 'peny', 'pem', 'pen', 'pe',
+                'ber', 'be', 'ter', 'di', 'ke', 'se')
+
+
+def _strip_suffix(word, suffixes):
+    for suffix in suffixes:
+        if word.endswith(suffix) and len(word) - len(suffix) >= MIN_STEM:
+            return word[:-len(suffix)]
+    return word
+
+
+def stem(word):
+    """Light stemmer for mixed Indonesian and English text"""
+    word = _strip_suffix(word, _ID_PARTICLES)
+    for suffix, replacement in _EN_SUFFIXES:
+        if word.endswith(suffix) and len(word) - len(suffix) >= MIN_STEM:
+            return word[:-len(suffix)] + replacement
+    word = _strip_suffix(word, _ID_SUFFIXES)
+    for prefix in _ID_PREFIXES:
+        if word.startswith(prefix):
+            if len(word) - len(prefix) > MIN_STEM:
+                return word[len(prefix):]
+            break
+    return word
+
+
+def tokenize(text):
+    """Lowercase, accent-free word tokens without stopwords"""
+    text = unicodedata.normalize('NFKD', str(text)).encode('ascii', 'ignore').decode('ascii').lower()
+    return [t for t in _TOKEN_RE.findall(text) if t not in STOPWORDS]
+
+
+def terms(text):
+    """Index terms for a text: each token's stem, plus the token itself when
+    stemming changed it so prefix queries still find the surface form"""
+    result = []
+    for token in tokenize(text):
+        result.append(stem(token))
+        if result[-1] != token:
+            result.append(token)
+    return result
+
+
+def build_index(projects):
+    """Index a list of project dicts; returns the JSON-ready index"""
+    postings = {}
+    for doc, project in enumerate(projects):
+        weights = {}
+        for field, weight in FIELD_WEIGHTS:
+            value = project.get(field, '')
+            text = ' '.join(value) if isinstance(value, list) else value
+            for term in terms(text):
+                weights[term] = weights.get(term, 0) + weight
+        for term, weight in weights.items():
+            postings.setdefault(term, []).append((doc, weight))
+
+    encoded = {}
+    for term in sorted(postings):
+        gaps, weights, previous = [], [], 0
+        for doc, weight in postings[term]:
+            gaps.append(doc - previous)
+            weights.append(weight)
+            previous = doc
+        encoded[term] = [gaps, weights]
+    return {
+        'version': INDEX_VERSION,
+        'ids': [project.get('id') for project in projects],
+        'terms': encoded,
+    }
+
+
+def decode_postings(entry):
+    """{doc: weight} from one term's [gaps, weights]"""
+    docs, doc = {}, 0
+    for gap, weight in zip(*entry):
+        doc += gap
+        docs[doc] = weight
+    return docs
+
+
+def search(index, query, prefix_limit=50):
+    """Project ids matching every query term, best first; the last term also matches as a prefix.
+
+    Mirrors the worker, for testing queries from the command line.
+    """
+    words = tokenize(query)
+    if not words:
+        return []
+    scores = None
+    for i, word in enumerate(words):
+        matches = {}
+        candidates = {stem(word), word}
+        if i == len(words) - 1:
+            candidates.update([t for t in index['terms'] if t.startswith(word)][:prefix_limit])
+        for term in candidates:
+            for doc, weight in decode_postings(index['terms'].get(term, [[], []])).items():
+                matches[doc] = max(matches.get(doc, 0), weight)
+        scores = matches if scores is None else {
+            doc: score + matches[doc] for doc, score in scores.items() if doc in matches}
+    return [index['ids'][doc] for doc, _ in sorted(scores.items(), key=lambda kv: (-kv[1], kv[0]))]
+
+
+if __name__ == '__main__':
+    import json
+    import sys
+
+    if len(sys.argv) != 3:
+        print("Usage: python search_index.py dist/data/search-index.json \"query\"")
+        sys.exit(2)
+    with open(sys.argv[1], 'r', encoding='utf-8') as f:
+        print(search(json.load(f), sys.argv[2]))
@@ -0,0 +1,684 @@
+#!/usr/bin/env python3
+"""
+Portfolio Storage Backends
+---------------------------
+Storage layer shared by the CLI and both GUIs. The data file is either
+the classic portfolio-data.json document or an SQLite database (WAL mode)
+with one row per project, tag, skill and social link. The backend is
+picked from the file extension, so pointing DATA_FILE (or the
+PORTFOLIO_DATA_FILE environment variable) at a .db file is all it takes
+to switch.
+
+With the SQLite backend the site-facing portfolio-data.json is only
+written at publish time, and saving an edit only touches the rows that
+actually changed.
+
+Both backends remember the version stamp (content hash + generation) of
+what they loaded. Writes happen under an advisory lock, and if the stamp
+on disk moved in the meantime the save is three-way merged against the
+loaded copy (see merge.py) instead of overwriting the other writer.
+
+Usage:
+    python storage.py --migrate data/portfolio-data.json data/portfolio.db
+    python storage.py --export data/portfolio.db data/portfolio-data.json
+"""
+
+import copy
+import hashlib
+import json
+import os
+import shutil
+import sqlite3
+import sys
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+import merge
+import streamjson
+import tracing
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+SQLITE_EXTENSIONS = ('.db', '.sqlite', '.sqlite3')
+
+# Top-level sections that are stored as whole JSON documents. Everything
+# else (skills, projects, social links) gets its own table.
+SECTION_ORDER = ['config', 'personal', 'about', 'skills', 'projects', 'contact']
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS sections (
+    name TEXT PRIMARY KEY,
+    position INTEGER NOT NULL,
+    body TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS projects (
+    pk INTEGER PRIMARY KEY,
+    id INTEGER NOT NULL,
+    position INTEGER NOT NULL,
+    title TEXT NOT NULL DEFAULT '',
+    description TEXT NOT NULL DEFAULT '',
+    thumbnail TEXT NOT NULL DEFAULT '',
+    video_url TEXT NOT NULL DEFAULT '',
+    year,
+    extra TEXT NOT NULL DEFAULT '{}'
+);
+CREATE INDEX IF NOT EXISTS idx_projects_id ON projects(id);
+CREATE INDEX IF NOT EXISTS idx_projects_position ON projects(position);
+CREATE TABLE IF NOT EXISTS project_tags (
+    project_pk INTEGER NOT NULL REFERENCES projects(pk) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    tag TEXT NOT NULL,
+    PRIMARY KEY (project_pk, position)
+);
+CREATE INDEX IF NOT EXISTS idx_project_tags_tag ON project_tags(tag);
+CREATE TABLE IF NOT EXISTS skills (
+    pk INTEGER PRIMARY KEY,
+    position INTEGER NOT NULL,
+    name TEXT NOT NULL DEFAULT '',
+    category TEXT NOT NULL DEFAULT '',
+    proficiency INTEGER NOT NULL DEFAULT 0,
+    icon TEXT NOT NULL DEFAULT '',
+    extra TEXT NOT NULL DEFAULT '{}'
+);
+CREATE INDEX IF NOT EXISTS idx_skills_name ON skills(name);
+CREATE INDEX IF NOT EXISTS idx_skills_category ON skills(category);
+CREATE TABLE IF NOT EXISTS socials (
+    pk INTEGER PRIMARY KEY,
+    position INTEGER NOT NULL,
+    platform TEXT NOT NULL DEFAULT '',
+    url TEXT NOT NULL DEFAULT '',
+    icon TEXT NOT NULL DEFAULT '',
+    extra TEXT NOT NULL DEFAULT '{}'
+);
+CREATE INDEX IF NOT EXISTS idx_socials_platform ON socials(platform);
+"""
+
+PROJECT_FIELDS = ['title', 'description', 'thumbnail', 'videoUrl', 'year']
+PROJECT_COLUMNS = ['title', 'description', 'thumbnail', 'video_url', 'year']
+SKILL_FIELDS = ['name', 'category', 'proficiency', 'icon']
+SOCIAL_FIELDS = ['platform', 'url', 'icon']
+
+
+def is_sqlite_path(path):
+    """Return True when the path should be handled by the SQLite backend"""
+    return os.path.splitext(path)[1].lower() in SQLITE_EXTENSIONS
+
+
+def open_store(path):
+    """Return the storage backend for a data file path"""
+    if is_sqlite_path(path):
+        return SqliteStore(path)
+    return JsonStore(path)
+
+
+def write_json_atomic(path, data, indent=2):
+    """Write a JSON document through a temp file so readers never see half a file"""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=indent, ensure_ascii=False,
+                  separators=None if indent else (',', ':'))
+    os.replace(tmp_path, path)
+
+
+class JsonCache:
+    """Entries computed from file contents, persisted as versioned JSON.
+
+    Subclasses add entries and mark the keys they look up in used; save()
+    keeps only those, so the file follows what the data references. A
+    file written with another version is ignored.
+    """
+
+    def __init__(self, path, version):
+        self.path = path
+        self.version = version
+        self.entries = {}
+        self.used = set()
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                cached = json.load(f)
+            if cached.get('version') == version:
+                self.entries = cached.get('entries', {})
+        except (FileNotFoundError, ValueError):
+            pass
+
+    def save(self):
+        """Write the cache back, dropping entries that were not looked up"""
+        entries = {k: v for k, v in self.entries.items() if k in self.used}
+        write_json_atomic(os.path.abspath(self.path), {'version': self.version, 'entries': entries}, indent=None)
+
+
+def _timestamp():
+    return datetime.now().strftime('%Y%m%d_%H%M%S')
+
+
+def document_hash(data):
+    """Hash of the canonical JSON form of a document"""
+    canonical = json.dumps(data, ensure_ascii=False, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+
+class LockTimeout(Exception):
+    """Another writer held the data file lock for too long"""
+
+
+class ConflictError(Exception):
+    """Concurrent edits touched the same fields and could not be merged"""
+
+    def __init__(self, conflicts, theirs=None):
+        self.conflicts = conflicts
+        self.theirs = theirs
+        super().__init__("Conflicting edits in: " + ", ".join(conflicts))
+
+
+@contextmanager
+def file_lock(path, timeout=10.0):
+    """Hold an exclusive advisory lock on <path>.lock"""
+    fd = os.open(f"{path}.lock", os.O_RDWR | os.O_CREAT, 0o644)
+    deadline = time.monotonic() + timeout
+    try:
+        while True:
+            try:
+                if fcntl:
+                    fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                else:
+                    msvcrt.locking(fd, msvcrt.LK_NBLCK, 1)
+                break
+            except OSError:
+                if time.monotonic() > deadline:
+                    raise LockTimeout(f"Timed out waiting for lock on {path}")
+                time.sleep(0.05)
+        yield
+    finally:
+        try:
+            if fcntl:
+                fcntl.flock(fd, fcntl.LOCK_UN)
+            else:
+                os.lseek(fd, 0, os.SEEK_SET)
+                msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+        except OSError:
+            pass
+        os.close(fd)
+
+
+class VersionedStore:
+    """Tracks the stamp and content of the last load so saves can detect and merge concurrent writes"""
+
+    def __init__(self, path):
+        self.path = path
+        self.stamp = None
+        self.base = None
+
+    def _remember(self, data, stamp):
+        self.base = copy.deepcopy(data)
+        self.stamp = stamp
+
+    def _reconcile(self, data, current_stamp, read_current, force):
+        """Return the document to write, merging with the on-disk copy if it moved"""
+        if force or self.stamp is None or current_stamp == self.stamp:
+            return data
+        theirs = read_current()
+        with tracing.span('merge.three_way_merge'):
+            merged, conflicts = merge.three_way_merge(self.base, data, theirs)
+        if conflicts:
+            raise ConflictError(conflicts, theirs)
+        return merged
+
+
+# ========================================
+# JSON BACKEND
+# ========================================
+
+class JsonStore(VersionedStore):
+    """The original single-document backend"""
+
+    kind = 'json'
+
+    @property
+    def stamp_path(self):
+        return f"{self.path}.version"
+
+    def _read_generation(self):
+        try:
+            with open(self.stamp_path, 'r', encoding='utf-8') as f:
+                return json.load(f).get('generation', 0)
+        except (FileNotFoundError, ValueError):
+            return 0
+
+    def _read_stamp(self, raw):
+        return {'generation': self._read_generation(), 'sha256': hashlib.sha256(raw).hexdigest()}
+
+    def _read(self):
+        with tracing.span('JsonStore.read', path=self.path) as span:
+            with open(self.path, 'rb') as f:
+                raw = f.read()
+            span.add(bytes_read=len(raw))
+            return json.loads(raw.decode('utf-8')), self._read_stamp(raw)
+
+    def load(self):
+        if not os.path.exists(self.path):
+            raise FileNotFoundError(self.path)
+        with file_lock(self.path):
+            data, stamp = self._read()
+        self._remember(data, stamp)
+        return data
+
+    def save(self, data, force=False):
+        """Write the document and return what was written (merged if someone else saved first).
+
+        Raises ConflictError when the edits cannot be merged; pass force=True
+        to overwrite the other writer's changes instead.
+        """
+        with file_lock(self.path):
+            current_stamp = None
+            if os.path.exists(self.path):
+                _, current_stamp = self._read()
+            data = self._reconcile(data, current_stamp, lambda: self._read()[0], force)
+
+            with tracing.span('JsonStore.write', path=self.path) as span:
+                write_json_atomic(self.path, data)
+                with open(self.path, 'rb') as f:
+                    raw = f.read()
+                span.add(bytes_written=len(raw))
+            generation = (current_stamp or {}).get('generation', 0) + 1
+            with open(self.stamp_path, 'w', encoding='utf-8') as f:
+                json.dump({'generation': generation}, f)
+            self._remember(data, {'generation': generation, 'sha256': hashlib.sha256(raw).hexdigest()})
+        return data
+
+    def open_lazy(self):
+        """Map the document without parsing its projects (see streamjson.py); close() it when done"""
+        if not os.path.exists(self.path):
+            raise FileNotFoundError(self.path)
+        with file_lock(self.path), tracing.span('JsonStore.open_lazy', path=self.path) as span:
+            doc = streamjson.LazyDocument(self.path)
+            span.add(bytes_indexed=len(doc.buf), projects=len(doc.records))
+        return doc
+
+    def save_lazy(self, doc, force=False):
+        """Write the edits made to a LazyDocument in one streaming pass.
+
+        Untouched projects are copied from the file as it is now, so
+        projects added or changed meanwhile by someone else are kept.
+        Sections and projects both sides changed are three-way merged;
+        ConflictError is raised as in save(). doc is closed afterwards.
+        """
+        edited, removed, added = doc['projects'].changes()
+        sections = doc.changed_sections()
+        with file_lock(self.path):
+            current = streamjson.LazyDocument(self.path)
+            try:
+                moved = current.sha256() != doc.sha256()
+                # Edits are keyed by project id so they apply to the current file
+                ours = {doc.records[i][2][0]: (doc.parse_record(i), record) for i, record in edited.items()}
+                dropped = {doc.records[i][2][0]: i for i in removed}
+                conflicts = []
+                if moved and not force:
+                    for key, value in list(sections.items()):
+                        if key in current and key in doc.file_keys and current.raw_section(key) != doc.raw_section(key):
+                            sections[key], found = merge.three_way_merge(
+                                json.loads(doc.raw_section(key)), value, current[key])
+                            conflicts += [f"{key}.{path}" for path in found]
+                    for project_id, (base, record) in list(ours.items()):
+                        index = current.find_record(project_id)
+                        theirs = current.parse_record(index) if index is not None else None
+                        if theirs is not None and theirs != base:
+                            merged, found = merge.three_way_merge(base, record, theirs)
+                            ours[project_id] = (base, merged)
+                            conflicts += [f"projects.{project_id}.{path}" for path in found]
+                    # Deleting a project someone else has since edited would lose their edit
+                    for project_id, source in dropped.items():
+                        index = current.find_record(project_id)
+                        if index is not None and current.parse_record(index) != doc.parse_record(source):
+                            conflicts.append(f"projects.[id={project_id!r}]")
+                if conflicts:
+                    raise ConflictError(conflicts)
+
+                taken = {summary[0] for _, _, summary in current.records}
+                for position, record in enumerate(added):
+                    # Someone else may have used the same new id
+                    if record.get('id') in taken:
+                        added[position] = record = merge.renumber(record, 'id', taken)
+                    taken.add(record.get('id'))
+
+                def records():
+                    for index, (_, _, summary) in enumerate(current.records):
+                        project_id = summary[0]
+                        if project_id in dropped:
+                            continue
+                        yield ours[project_id][1] if project_id in ours else current.raw_record(index)
+                    yield from added
+
+                def section(key):
+                    return sections[key] if key in sections else current.raw_section(key)
+
+                keys = current.keys + [key for key in doc.keys if key not in current.keys]
+                tmp_path = f"{self.path}.tmp"
+                with tracing.span('JsonStore.write_streaming', path=self.path) as span, open(tmp_path, 'wb') as f:
+                    streamjson.write_document(f, keys, section, records())
+                    span.add(bytes_written=f.tell())
+                generation = self._read_generation() + 1
+            finally:
+                current.close()
+                # A mapped file cannot be replaced on Windows
+                doc.close()
+            os.replace(tmp_path, self.path)
+            with open(self.stamp_path, 'w', encoding='utf-8') as f:
+                json.dump({'generation': generation}, f)
+
+    def backup(self, backup_dir):
+        os.makedirs(backup_dir, exist_ok=True)
+        backup_file = f"{backup_dir}/portfolio-data_{_timestamp()}.json"
+        with file_lock(self.path), tracing.span('JsonStore.backup', path=backup_file) as span:
+            shutil.copy2(self.path, backup_file)
+            span.add(bytes_written=os.path.getsize(backup_file))
+        return backup_file
+
+    def export_json(self, out_path):
+        """Write the site-facing JSON document"""
+        if os.path.abspath(out_path) == os.path.abspath(self.path):
+            return out_path
+        with file_lock(self.path):
+            data, _ = self._read()
+        write_json_atomic(out_path, data)
+        return out_path
+
+
+# ========================================
+# SQLITE BACKEND
+# ========================================
+
+class SqliteStore(VersionedStore):
+    """Row-per-entity backend; saves are diffed so an edit only touches its rows"""
+
+    kind = 'sqlite'
+
+    def connect(self, create=False):
+        if not create and not os.path.exists(self.path):
+            raise FileNotFoundError(self.path)
+        conn = sqlite3.connect(self.path, timeout=10)
+        conn.row_factory = sqlite3.Row
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        conn.execute('PRAGMA foreign_keys=ON')
+        conn.executescript(SCHEMA)
+        return conn
+
+    def load(self):
+        with tracing.span('SqliteStore.read', path=self.path):
+            conn = self.connect()
+            try:
+                # A read transaction gives a consistent snapshot of rows and stamp
+                conn.execute('BEGIN')
+                data = self._read(conn)
+                stamp = self._read_stamp(conn)
+                conn.rollback()
+            finally:
+                conn.close()
+        self._remember(data, stamp)
+        return data
+
+    def save(self, data, force=False):
+        """Write the document and return what was written (merged if someone else saved first).
+
+        Raises ConflictError when the edits cannot be merged; pass force=True
+        to overwrite the other writer's changes instead.
+        """
+        conn = self.connect(create=True)
+        try:
+            with conn:
+                # BEGIN IMMEDIATE takes the database write lock up front
+                conn.execute('BEGIN IMMEDIATE')
+                current_stamp = self._read_stamp(conn)
+                if current_stamp['generation'] == 0:
+                    current_stamp = None
+                data = self._reconcile(data, current_stamp, lambda: self._read(conn), force)
+                with tracing.span('SqliteStore.write', path=self.path) as span:
+                    span.add(rows_written=self._write(conn, data))
+                generation = (current_stamp or {}).get('generation', 0) + 1
+                stamp = {'generation': generation, 'sha256': document_hash(data)}
+                conn.executemany('INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)',
+                                 [(k, str(v)) for k, v in stamp.items()])
+        finally:
+            conn.close()
+        self._remember(data, stamp)
+        return data
+
+    def backup(self, backup_dir):
+        os.makedirs(backup_dir, exist_ok=True)
+        backup_file = f"{backup_dir}/portfolio-data_{_timestamp()}.db"
+        src = self.connect()
+        dest = sqlite3.connect(backup_file)
+        try:
+            with tracing.span('SqliteStore.backup', path=backup_file):
+                src.backup(dest)
+        finally:
+            dest.close()
+            src.close()
+        return backup_file
+
+    def export_json(self, out_path):
+        """Write the site-facing JSON document"""
+        conn = self.connect()
+        try:
+            conn.execute('BEGIN')
+            data = self._read(conn)
+            conn.rollback()
+        finally:
+            conn.close()
+        write_json_atomic(out_path, data)
+        return out_path
+
+    # ---- reading ----
+
+    @staticmethod
+    def _read_stamp(conn):
+        meta = {r['key']: r['value'] for r in conn.execute('SELECT key, value FROM meta')}
+        return {'generation': int(meta.get('generation', 0)), 'sha256': meta.get('sha256', '')}
+
+    def _read(self, conn):
+        sections = conn.execute('SELECT name, body FROM sections ORDER BY position').fetchall()
+        data = {}
+        for row in sections:
+            data[row['name']] = json.loads(row['body'])
+
+        if 'skills' in data:
+            data['skills'] = [self._skill_from_row(r) for r in
+                              conn.execute('SELECT * FROM skills ORDER BY position')]
+
+        if 'projects' in data:
+            tags = {}
+            for r in conn.execute('SELECT project_pk, tag FROM project_tags ORDER BY project_pk, position'):
+                tags.setdefault(r['project_pk'], []).append(r['tag'])
+            data['projects'] = [self._project_from_row(r, tags.get(r['pk'], [])) for r in
+                                conn.execute('SELECT * FROM projects ORDER BY position')]
+
+        if isinstance(data.get('contact'), dict) and 'social' in data['contact']:
+            data['contact']['social'] = [self._social_from_row(r) for r in
+                                         conn.execute('SELECT * FROM socials ORDER BY position')]
+        return data
+
+    @staticmethod
+    def _merge_extra(entity, extra_json):
+        extra = json.loads(extra_json)
+        order = extra.pop('__order__', None)
+        entity.update(extra)
+        if order:
+            entity = {key: entity[key] for key in order if key in entity}
+        return entity
+
+    def _project_from_row(self, row, tags):
+        project = {'id': row['id']}
+        for field, column in zip(PROJECT_FIELDS, PROJECT_COLUMNS):
+            project[field] = row[column]
+        project['tags'] = tags
+        return self._merge_extra(project, row['extra'])
+
+    def _skill_from_row(self, row):
+        skill = {field: row[field] for field in SKILL_FIELDS}
+        return self._merge_extra(skill, row['extra'])
+
+    def _social_from_row(self, row):
+        social = {field: row[field] for field in SOCIAL_FIELDS}
+        return self._merge_extra(social, row['extra'])
+
+    # ---- writing ----
+
+    @staticmethod
+    def _extra(entity, known):
+        extra = {k: v for k, v in entity.items() if k not in known}
+        extra['__order__'] = list(entity.keys())
+        return json.dumps(extra, ensure_ascii=False, sort_keys=True)
+
+    def _write(self, conn, data):
+        """Apply the document as a diff against the stored rows; returns the number of rows written"""
+        written = 0
+        keys = list(data.keys())
+        stored = {r['name']: r for r in conn.execute('SELECT name, position, body FROM sections')}
+
+        for position, name in enumerate(keys):
+            value = data[name]
+            if name in ('skills', 'projects'):
+                value = []
+            elif name == 'contact' and isinstance(value, dict) and 'social' in value:
+                value = dict(value, social=[])
+            body = json.dumps(value, ensure_ascii=False, sort_keys=True)
+            old = stored.pop(name, None)
+            if old is None:
+                conn.execute('INSERT INTO sections (name, position, body) VALUES (?, ?, ?)',
+                             (name, position, body))
+                written += 1
+            elif old['body'] != body or old['position'] != position:
+                conn.execute('UPDATE sections SET position = ?, body = ? WHERE name = ?',
+                             (position, body, name))
+                written += 1
+        for name in stored:
+            conn.execute('DELETE FROM sections WHERE name = ?', (name,))
+            written += 1
+
+        written += self._sync_projects(conn, data.get('projects', []))
+        written += self._sync_simple(conn, 'skills', 'name', SKILL_FIELDS,
+                                     data.get('skills', []))
+        social = data.get('contact', {}).get('social', []) if isinstance(data.get('contact'), dict) else []
+        written += self._sync_simple(conn, 'socials', 'platform', SOCIAL_FIELDS, social)
+        return written
+
+    @staticmethod
+    def _match_rows(existing, key_of, entities):
+        """Pair incoming entities with stored rows by natural key, falling back to position"""
+        by_key = {}
+        for row in existing:
+            by_key.setdefault(key_of(row), []).append(row)
+        matched = []
+        for entity_key in entities:
+            candidates = by_key.get(entity_key)
+            matched.append(candidates.pop(0) if candidates else None)
+        leftover = [row for rows in by_key.values() for row in rows]
+        return matched, leftover
+
+    def _sync_projects(self, conn, projects):
+        written = 0
+        existing = conn.execute('SELECT * FROM projects').fetchall()
+        tags_by_pk = {}
+        for r in conn.execute('SELECT project_pk, tag FROM project_tags ORDER BY project_pk, position'):
+            tags_by_pk.setdefault(r['project_pk'], []).append(r['tag'])
+
+        matched, leftover = self._match_rows(existing, lambda r: r['id'],
+                                             [p.get('id') for p in projects])
+        for row in leftover:
+            conn.execute('DELETE FROM projects WHERE pk = ?', (row['pk'],))
+            written += 1
+
+        known = set(PROJECT_FIELDS) | {'id', 'tags'}
+        for position, (project, row) in enumerate(zip(projects, matched)):
+            values = [project.get(f, '' if f != 'year' else None) for f in PROJECT_FIELDS]
+            extra = self._extra(project, known)
+            tags = list(project.get('tags', []))
+            if row is None:
+                cur = conn.execute(
+                    'INSERT INTO projects (id, position, title, description, thumbnail, video_url, year, extra) '
+                    'VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                    [project.get('id', 0), position] + values + [extra])
+                pk = cur.lastrowid
+                written += 1
+            else:
+                pk = row['pk']
+                current = [row[c] for c in PROJECT_COLUMNS]
+                if row['position'] != position or current != values or row['extra'] != extra:
+                    conn.execute(
+                        'UPDATE projects SET position = ?, title = ?, description = ?, thumbnail = ?, '
+                        'video_url = ?, year = ?, extra = ? WHERE pk = ?',
+                        [position] + values + [extra, pk])
+                    written += 1
+                if tags_by_pk.get(pk, []) == tags:
+                    continue
+                conn.execute('DELETE FROM project_tags WHERE project_pk = ?', (pk,))
+            conn.executemany('INSERT INTO project_tags (project_pk, position, tag) VALUES (?, ?, ?)',
+                             [(pk, i, tag) for i, tag in enumerate(tags)])
+            written += len(tags)
+        return written
+
+    def _sync_simple(self, conn, table, key_field, fields, entities):
+        written = 0
+        existing = conn.execute(f'SELECT * FROM {table}').fetchall()
+        matched, leftover = self._match_rows(existing, lambda r: r[key_field],
+                                             [e.get(key_field) for e in entities])
+        for row in leftover:
+            conn.execute(f'DELETE FROM {table} WHERE pk = ?', (row['pk'],))
+            written += 1
+
+        known = set(fields)
+        columns = ', '.join(fields)
+        placeholders = ', '.join('?' for _ in fields)
+        assignments = ', '.join(f'{f} = ?' for f in fields)
+        for position, (entity, row) in enumerate(zip(entities, matched)):
+            values = [entity.get(f, 0 if f == 'proficiency' else '') for f in fields]
+            extra = self._extra(entity, known)
+            if row is None:
+                conn.execute(f'INSERT INTO {table} (position, {columns}, extra) VALUES (?, {placeholders}, ?)',
+                             [position] + values + [extra])
+                written += 1
+            elif (row['position'] != position or [row[f] for f in fields] != values
+                  or row['extra'] != extra):
+                conn.execute(f'UPDATE {table} SET position = ?, {assignments}, extra = ? WHERE pk = ?',
+                             [position] + values + [extra, row['pk']])
+                written += 1
+        return written
+
+
+# ========================================
+# MIGRATION
+# ========================================
+
+def migrate_json_to_sqlite(json_path, db_path):
+    """Import an existing portfolio-data.json into a new SQLite store"""
+    with open(json_path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    store = SqliteStore(db_path)
+    store.save(data)
+    if store.load() != data:
+        raise ValueError("Round-trip check failed: the SQLite copy differs from the JSON source")
+    return store
+
+
+if __name__ == '__main__':
+    if len(sys.argv) == 4 and sys.argv[1] == '--migrate':
+        migrate_json_to_sqlite(sys.argv[2], sys.argv[3])
+        print(f"✓ Migrated {sys.argv[2]} -> {sys.argv[3]}")
+    elif len(sys.argv) == 4 and sys.argv[1] == '--export':
+        open_store(sys.argv[2]).export_json(sys.argv[3])
+        print(f"✓ Exported {sys.argv[2]} -> {sys.argv[3]}")
+    else:
+        print(__doc__)
+        sys.exit(1)
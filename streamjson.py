@@ -0,0 +1,331 @@
+"""
+Lazy reading and streaming writing of the portfolio JSON document.
+
+json.load() needs the whole file in memory several times over (bytes,
+text, objects) before anything can be shown. LazyDocument instead maps
+the file and scans it once for the byte range of every top-level section
+and of every record in the projects array, noting the id, title and year
+of each record on the way. The small sections are parsed; a project is
+parsed only when it is opened, so a list of titles costs one scan.
+
+write_document() writes a document back section by section and record by
+record. Records that were not touched are copied as bytes from the
+original file, so memory stays flat however many projects there are. The
+output matches write_json_atomic(..., indent=2) byte for byte.
+
+    doc = LazyDocument('data/portfolio-data.json')
+    for summary in doc['projects'].summaries():
+        print(summary['title'])
+    project = doc['projects'][3]      # Parsed here
+    project['year'] = 2025
+    doc['projects'][3] = project
+    doc.close()
+"""
+
+import hashlib
+import json
+import mmap
+import os
+import re
+from collections.abc import MutableSequence
+
+PROJECTS_KEY = 'projects'
+# Record fields kept in the index for listing without parsing the records
+SUMMARY_FIELDS = ('id', 'title', 'year')
+INDENT = 2
+
+_STRUCTURE = re.compile(rb'["{}\[\],:]')
+_STRING_END = re.compile(rb'[^"\\]*(?:\\.[^"\\]*)*"', re.S)
+_SPACE = re.compile(rb'\s*')
+# Everything up to the next bracket, with strings (which may hold brackets) skipped whole
+_FLAT = re.compile(rb'[^"{}\[\]]*(?:"[^"\\]*(?:\\.[^"\\]*)*"[^"{}\[\]]*)*', re.S)
+# Escaped quotes inside string values can't produce a match
+_SUMMARY = re.compile(rb'"(' + '|'.join(SUMMARY_FIELDS).encode('ascii') +
+                      rb')"\s*:\s*("[^"\\]*(?:\\.[^"\\]*)*"|-?[0-9][0-9.eE+-]*|true|false|null)', re.S)
+# Starts of a record's keys and string values, and of nested containers
+_RECORD_TOKEN = re.compile(rb'["{\[]')
+
+
+class FormatError(ValueError):
+    """The file is not a JSON object with a projects array"""
+
+
+def _value_end(buf, start, end):
+    """End of a value whose following delimiter is at end, without trailing whitespace"""
+    while end > start and buf[end - 1] in b' \t\r\n':
+        end -= 1
+    return end
+
+
+def _container_end(buf, pos):
+    """Offset just past the object or array starting at pos"""
+    depth = 0
+    while True:
+        char = buf[pos:pos + 1]
+        if char in (b'{', b'['):
+            depth += 1
+        elif char in (b'}', b']'):
+            depth -= 1
+            if depth == 0:
+                return pos + 1
+        else:
+            raise FormatError("unexpected end of document")
+        pos = _FLAT.match(buf, pos + 1).end()
+
+
+def _decode(raw):
+    # Most values are plain strings and integers; json.loads is slow per call
+    if raw[:1] == b'"' and b'\\' not in raw:
+        return raw[1:-1].decode('utf-8')
+    if raw.isdigit():
+        return int(raw)
+    return json.loads(raw)
+
+
+def _summary(buf, start, end):
+    """The SUMMARY_FIELDS of a record as a tuple, read from its top-level keys only"""
+    found = {}
+    pos = start + 1
+    while len(found) < len(SUMMARY_FIELDS):
+        match = _RECORD_TOKEN.search(buf, pos, end - 1)
+        if not match:
+            break
+        pos = match.start()
+        if buf[pos:pos + 1] != b'"':
+            # Nested objects and arrays may hold keys of the same names
+            pos = _container_end(buf, pos)
+            continue
+        field = _SUMMARY.match(buf, pos, end)
+        if field:
+            found.setdefault(field.group(1).decode('ascii'), field.group(2))
+        pos = _STRING_END.match(buf, pos + 1).end()
+    return tuple(_decode(found[field]) if field in found else None for field in SUMMARY_FIELDS)
+
+
+def scan(buf):
+    """Index a portfolio document.
+
+    Returns (sections, records): sections is [(key, start, end)] in file
+    order; records is [(start, end, summary)] for the projects array,
+    summary being a tuple of the record's SUMMARY_FIELDS.
+    Only the top two levels are walked token by token; each project is
+    skipped from bracket to bracket.
+    """
+    sections, records = [], []
+    stack = []          # [kind, expecting key] per open container
+    key = None          # Last key read in the innermost object
+    member = None       # (key, value start) of the top-level member being read
+    pos = _SPACE.match(buf, 0).end()
+    if buf[pos:pos + 1] != b'{':
+        raise FormatError("the document is not a JSON object")
+
+    while True:
+        match = _STRUCTURE.search(buf, pos)
+        if not match:
+            raise FormatError("unexpected end of document")
+        pos = match.start()
+        char = buf[pos:pos + 1]
+        depth = len(stack)
+
+        if char == b'"':
+            end = _STRING_END.match(buf, pos + 1).end()
+            if stack and stack[-1][0] == b'{' and stack[-1][1]:
+                key = json.loads(buf[pos:end])
+            pos = end
+            continue
+
+        if char == b':':
+            stack[-1][1] = False
+            if depth == 1:
+                member = (key, _SPACE.match(buf, pos + 1).end())
+        elif char in (b'{', b'['):
+            if depth >= 2:
+                # Below the sections only project records need their offsets
+                end = _container_end(buf, pos)
+                if depth == 2 and char == b'{' and member[0] == PROJECTS_KEY:
+                    records.append((pos, end, _summary(buf, pos, end)))
+                pos = end
+                continue
+            stack.append([char, char == b'{'])
+        elif char in (b'}', b']'):
+            stack.pop()
+            if depth == 1:
+                if member:
+                    sections.append((member[0], member[1], _value_end(buf, member[1], pos)))
+                return sections, records
+        elif char == b',':
+            if depth == 1:
+                sections.append((member[0], member[1], _value_end(buf, member[1], pos)))
+                member = None
+            if stack[-1][0] == b'{':
+                stack[-1][1] = True
+        pos += 1
+
+
+def dumps(value, level):
+    """value as write_json_atomic would format it, nested level containers deep"""
+    text = json.dumps(value, indent=INDENT, ensure_ascii=False)
+    return text.replace('\n', '\n' + ' ' * (INDENT * level))
+
+
+class LazyProjects(MutableSequence):
+    """The projects array of a LazyDocument; records are parsed on first access"""
+
+    def __init__(self, doc, records):
+        self._doc = doc
+        # Each item is [index into doc.records or None for a new record, parsed record or None]
+        self._items = [[i, None] for i in range(len(records))]
+
+    def __len__(self):
+        return len(self._items)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        item = self._items[index]
+        if item[1] is None:
+            item[1] = self._doc.parse_record(item[0])
+        return item[1]
+
+    def __setitem__(self, index, record):
+        self._items[index][1] = record
+
+    def __delitem__(self, index):
+        del self._items[index]
+
+    def insert(self, index, record):
+        self._items.insert(index, [None, record])
+
+    def __iter__(self):
+        # Records that were never opened are parsed one at a time and not kept
+        for source, record in self._items:
+            yield record if record is not None else self._doc.parse_record(source)
+
+    def summaries(self):
+        """id, title and year of every project, without parsing the records"""
+        for source, record in self._items:
+            if record is not None:
+                yield {field: record.get(field) for field in SUMMARY_FIELDS}
+            else:
+                yield dict(zip(SUMMARY_FIELDS, self._doc.records[source][2]))
+
+    def changes(self):
+        """(edited, removed, added) relative to the file.
+
+        edited maps a record index to its new value, removed is a set of
+        record indexes, added a list of new records.
+        """
+        edited, added = {}, []
+        kept = set()
+        for source, record in self._items:
+            if source is None:
+                added.append(record)
+                continue
+            kept.add(source)
+            if record is not None and record != self._doc.parse_record(source):
+                edited[source] = record
+        removed = set(range(len(self._doc.records))) - kept
+        return edited, removed, added
+
+
+class LazyDocument:
+    """A memory-mapped portfolio document with lazily parsed projects"""
+
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, 'rb')
+        try:
+            # mmap cannot map an empty file
+            self.buf = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) \
+                if os.fstat(self._file.fileno()).st_size else b''
+            self.sections, self.records = scan(self.buf)
+        except Exception:
+            self.close()
+            raise
+        self.file_keys = [key for key, _, _ in self.sections]
+        self.keys = list(self.file_keys)
+        self._spans = {key: (start, end) for key, start, end in self.sections}
+        self._values = {key: json.loads(self.raw_section(key)) for key in self.keys if key != PROJECTS_KEY}
+        self._values[PROJECTS_KEY] = LazyProjects(self, self.records)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        if isinstance(getattr(self, 'buf', None), mmap.mmap):
+            self.buf.close()
+        self._file.close()
+
+    def __getitem__(self, key):
+        return self._values[key]
+
+    def __setitem__(self, key, value):
+        if key not in self._values:
+            self.keys.append(key)
+        self._values[key] = value
+
+    def __contains__(self, key):
+        return key in self._values
+
+    def get(self, key, default=None):
+        return self._values.get(key, default)
+
+    def sha256(self):
+        return hashlib.sha256(self.buf).hexdigest()
+
+    def raw_section(self, key):
+        start, end = self._spans[key]
+        return self.buf[start:end]
+
+    def raw_record(self, index):
+        start, end, _ = self.records[index]
+        return self.buf[start:end]
+
+    def parse_record(self, index):
+        return json.loads(self.raw_record(index))
+
+    def find_record(self, project_id):
+        """Index of the record with this id, or None"""
+        for index, (_, _, summary) in enumerate(self.records):
+            if summary[0] == project_id:
+                return index
+        return None
+
+    def changed_sections(self):
+        """{key: value} of the sections (other than projects) that differ from the file"""
+        changed = {}
+        for key in self.keys:
+            if key == PROJECTS_KEY:
+                continue
+            if key not in self.file_keys or self._values[key] != json.loads(self.raw_section(key)):
+                changed[key] = self._values[key]
+        return changed
+
+
+def write_document(f, keys, section, records):
+    """Stream a document into the binary file f.
+
+    section(key) returns either bytes already formatted for the top level
+    or a value to serialise; records yields bytes of formatted records or
+    record values, in order.
+    """
+    def encode(value, level):
+        return value if isinstance(value, (bytes, mmap.mmap)) else dumps(value, level).encode('utf-8')
+
+    pad = b' ' * INDENT
+    f.write(b'{')
+    for n, key in enumerate(keys):
+        f.write((',\n' if n else '\n').encode('utf-8') + pad + json.dumps(key, ensure_ascii=False).encode('utf-8')
+                + b': ')
+        if key != PROJECTS_KEY:
+            f.write(encode(section(key), 1))
+            continue
+        empty = True
+        for record in records:
+            f.write((b'[\n' if empty else b',\n') + pad * 2 + encode(record, 2))
+            empty = False
+        f.write(b'[]' if empty else b'\n' + pad + b']')
+    f.write(b'\n}' if keys else b'}')
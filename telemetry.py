@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+"""
+Portfolio Telemetry Collector
+---------------------------
+Stand-in for the real-user metrics endpoint that js/main.js reports to.
+`serve` accepts the page's beacons on /collect and appends them to daily
+JSON Lines files; it can also serve a built site so page and collector
+share an origin. `report` aggregates p50/p95/p99 per metric, device class
+and release.
+
+Enable reporting in the data file:
+    "config": {"telemetry": {"endpoint": "/collect", "release": "2025-12-01"}}
+
+Usage:
+    python telemetry.py serve                      # Collector on :8000, serving dist/
+    python telemetry.py serve --port 9000 --root .
+    python telemetry.py report                     # All collected metrics
+    python telemetry.py report --release 2025-12-01 --since 20251201
+"""
+
+import argparse
+import json
+import os
+import sys
+from datetime import datetime
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+TELEMETRY_DIR = 'data/telemetry'
+MAX_PAYLOAD = 64 * 1024
+DEVICE_CLASSES = ('low', 'mid', 'high')
+
+
+# ========================================
+# COLLECTOR
+# ========================================
+
+def normalise_beacon(payload, received_at):
+    """Turn one beacon payload into metric records, dropping anything malformed"""
+    release = str(payload.get('release', 'unknown'))[:64]
+    device = payload.get('device')
+    if device not in DEVICE_CLASSES:
+        device = 'unknown'
+    page = str(payload.get('page', '/'))[:200]
+    records = []
+    for metric in payload.get('metrics', []):
+        if not isinstance(metric, dict):
+            continue
+        name, value = metric.get('name'), metric.get('value')
+        if not isinstance(name, str) or not isinstance(value, (int, float)) or isinstance(value, bool):
+            continue
+        records.append({'ts': received_at, 'release': release, 'device': device,
+                        'page': page, 'metric': name[:64], 'value': value})
+    return records
+
+
+class CollectorHandler(SimpleHTTPRequestHandler):
+    """Serves static files and accepts beacons on /collect"""
+
+    telemetry_dir = TELEMETRY_DIR
+
+    def end_headers(self):
+        if self.path.startswith('/collect'):
+            self.send_header('Access-Control-Allow-Origin', '*')
+            self.send_header('Access-Control-Allow-Headers', 'Content-Type')
+        super().end_headers()
+
+    def do_OPTIONS(self):
+        self.send_response(204)
+        self.send_header('Access-Control-Allow-Methods', 'POST, OPTIONS')
+        self.end_headers()
+
+    def do_POST(self):
+        if not self.path.startswith('/collect'):
+            self.send_error(404)
+            return
+        length = int(self.headers.get('Content-Length') or 0)
+        if length <= 0 or length > MAX_PAYLOAD:
+            self.send_error(413 if length > MAX_PAYLOAD else 400)
+            return
+        try:
+            payload = json.loads(self.rfile.read(length).decode('utf-8'))
+        except (ValueError, UnicodeDecodeError):
+            self.send_error(400)
+            return
+
+        now = datetime.now()
+        records = normalise_beacon(payload if isinstance(payload, dict) else {}, now.isoformat(timespec='seconds'))
+        if records:
+            os.makedirs(self.telemetry_dir, exist_ok=True)
+            path = os.path.join(self.telemetry_dir, f"{now.strftime('%Y%m%d')}.jsonl")
+            lines = ''.join(json.dumps(r, ensure_ascii=False) + '\n' for r in records)
+            # One write per beacon keeps concurrent appends from interleaving
+            with open(path, 'a', encoding='utf-8') as f:
+                f.write(lines)
+        self.send_response(204)
+        self.end_headers()
+
+    def log_message(self, format, *args):
+        if not self.path.startswith('/collect'):
+            super().log_message(format, *args)
+
+
+def serve(port, root, telemetry_dir):
+    handler = partial(CollectorHandler, directory=root)
+    CollectorHandler.telemetry_dir = telemetry_dir
+    server = ThreadingHTTPServer(('', port), handler)
+    print(f"Serving {root} on http://localhost:{port} (beacons -> {telemetry_dir})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+# ========================================
+# REPORT
+# ========================================
+
+def percentile(sorted_values, pct):
+    """Linear-interpolated percentile of an already sorted list"""
+    if not sorted_values:
+        return None
+    k = (len(sorted_values) - 1) * pct / 100
+    lo = int(k)
+    hi = min(lo + 1, len(sorted_values) - 1)
+    return sorted_values[lo] + (sorted_values[hi] - sorted_values[lo]) * (k - lo)
+
+
+def read_records(telemetry_dir, since=None, release=None):
+    if not os.path.isdir(telemetry_dir):
+        return
+    for name in sorted(os.listdir(telemetry_dir)):
+        if not name.endswith('.jsonl') or (since and name[:8] < since):
+            continue
+        with open(os.path.join(telemetry_dir, name), 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+                if release and record.get('release') != release:
+                    continue
+                yield record
+
+
+def aggregate(records):
+    """{(metric, device, release): sorted values}"""
+    groups = {}
+    for r in records:
+        groups.setdefault((r['metric'], r['device'], r['release']), []).append(r['value'])
+    for values in groups.values():
+        values.sort()
+    return groups
+
+
+def print_report(groups):
+    if not groups:
+        print("No telemetry collected yet.")
+        return
+    headers = ['Metric', 'Device', 'Release', 'Count', 'p50', 'p95', 'p99']
+    rows = []
+    for (metric, device, release), values in sorted(groups.items()):
+        rows.append([metric, device, release, str(len(values))]
+                    + [f"{percentile(values, p):.4g}" for p in (50, 95, 99)])
+    widths = [max(len(h), *(len(row[i]) for row in rows)) for i, h in enumerate(headers)]
+    print('  '.join(h.ljust(w) for h, w in zip(headers, widths)))
+    for row in rows:
+        print('  '.join(cell.ljust(w) for cell, w in zip(row, widths)))
+    print("\nTimes are in ms; cls values are layout-shift scores; *_bytes are bytes.")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Collect and report real-user performance metrics")
+    sub = parser.add_subparsers(dest='command', required=True)
+    serve_parser = sub.add_parser('serve', help="Run the collector (and serve a site)")
+    serve_parser.add_argument('--port', type=int, default=8000)
+    serve_parser.add_argument('--root', default='dist', help="Directory to serve (default: dist)")
+    serve_parser.add_argument('--dir', default=TELEMETRY_DIR, help="Where to store beacons")
+    report_parser = sub.add_parser('report', help="Aggregate percentiles")
+    report_parser.add_argument('--dir', default=TELEMETRY_DIR)
+    report_parser.add_argument('--since', help="Only files from this day on (YYYYMMDD)")
+    report_parser.add_argument('--release', help="Only this release")
+    report_parser.add_argument('--json', action='store_true', help="Print JSON instead of a table")
+    args = parser.parse_args(argv)
+
+    if args.command == 'serve':
+        serve(args.port, args.root, os.path.abspath(args.dir))
+        return 0
+
+    groups = aggregate(read_records(args.dir, args.since, args.release))
+    if args.json:
+        print(json.dumps([
+            {'metric': m, 'device': d, 'release': r, 'count': len(v),
+             'p50': percentile(v, 50), 'p95': percentile(v, 95), 'p99': percentile(v, 99)}
+            for (m, d, r), v in sorted(groups.items())
+        ], indent=2))
+    else:
+        print_report(groups)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
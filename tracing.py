@@ -0,0 +1,191 @@
+"""
+Lightweight span tracing for the CLI and both GUIs.
+
+Enable with `--trace out.json` on any of the tools, or by setting
+PORTFOLIO_TRACE=out.json. Spans record their duration, thread and any
+byte counts reported while they were open. On exit they are written as
+Chrome trace-event JSON (open it in chrome://tracing or ui.perfetto.dev)
+and the slowest spans are printed.
+
+When tracing is off, span() returns a shared no-op object and @traced
+functions only test a flag before calling through, so instrumented code
+pays next to nothing. The flag is checked on every call, so tracing can
+be enabled after the instrumented modules are imported.
+"""
+
+import atexit
+import functools
+import json
+import os
+import sys
+import threading
+import time
+
+TRACE_ENV = 'PORTFOLIO_TRACE'
+TOP_N = 10
+
+_enabled = False
+_output_path = None
+_events = []
+_events_lock = threading.Lock()
+_local = threading.local()
+_origin = time.perf_counter()
+
+
+def is_enabled():
+    return _enabled
+
+
+def enable(output_path, top_n=TOP_N):
+    """Start recording spans; they are written to output_path at exit"""
+    global _enabled, _output_path
+    if _enabled:
+        return
+    _enabled = True
+    _output_path = output_path
+    atexit.register(_finish, top_n)
+
+
+def enable_from_argv(argv):
+    """Enable from a `--trace PATH` argument (removed from argv) or the environment"""
+    if '--trace' in argv:
+        i = argv.index('--trace')
+        if i + 1 < len(argv):
+            enable(argv[i + 1])
+            del argv[i:i + 2]
+            return
+    if os.environ.get(TRACE_ENV):
+        enable(os.environ[TRACE_ENV])
+
+
+class _NullSpan:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def add(self, **counters):
+        pass
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class Span:
+    def __init__(self, name, args):
+        self.name = name
+        self.args = dict(args)
+
+    def __enter__(self):
+        stack = getattr(_local, 'stack', None)
+        if stack is None:
+            stack = _local.stack = []
+        self.depth = len(stack)
+        stack.append(self)
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        end = time.perf_counter()
+        _local.stack.pop()
+        if exc_type is not None:
+            self.args['error'] = exc_type.__name__
+        event = {
+            'name': self.name,
+            'ph': 'X',
+            'ts': (self.start - _origin) * 1e6,
+            'dur': (end - self.start) * 1e6,
+            'pid': os.getpid(),
+            'tid': threading.get_ident(),
+            'args': self.args,
+        }
+        with _events_lock:
+            _events.append(event)
+        return False
+
+    def add(self, **counters):
+        """Accumulate counters such as bytes_read / bytes_written on the span"""
+        for key, value in counters.items():
+            self.args[key] = self.args.get(key, 0) + value
+
+
+def span(name, **args):
+    """Context manager timing a block: `with tracing.span('x') as s: s.add(bytes_read=n)`"""
+    if not _enabled:
+        return _NULL_SPAN
+    return Span(name, args)
+
+
+def current_span():
+    """The innermost open span on this thread (a no-op span when there is none)"""
+    stack = getattr(_local, 'stack', None)
+    return stack[-1] if stack else _NULL_SPAN
+
+
+def traced(name=None):
+    """Decorator recording a span per call while tracing is on"""
+    def decorator(fn):
+        span_name = name or fn.__qualname__
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return fn(*args, **kwargs)
+            with Span(span_name, {}):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+# ========================================
+# OUTPUT
+# ========================================
+
+def _thread_names():
+    return {t.ident: t.name for t in threading.enumerate()}
+
+
+def write_trace(path):
+    with _events_lock:
+        events = list(_events)
+    names = _thread_names()
+    metadata = [{'name': 'thread_name', 'ph': 'M', 'pid': os.getpid(), 'tid': tid,
+                 'args': {'name': names.get(tid, f'thread-{tid}')}}
+                for tid in {e['tid'] for e in events}]
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({'traceEvents': metadata + events, 'displayTimeUnit': 'ms'}, f)
+    return len(events)
+
+
+def summary_lines(top_n=TOP_N):
+    """The slowest individual spans and the totals per span name"""
+    with _events_lock:
+        events = list(_events)
+    lines = [f"Slowest {min(top_n, len(events))} of {len(events)} spans:"]
+    for e in sorted(events, key=lambda e: e['dur'], reverse=True)[:top_n]:
+        extra = ', '.join(f"{k}={v}" for k, v in e['args'].items())
+        lines.append(f"  {e['dur'] / 1000:10.2f} ms  {e['name']}" + (f"  ({extra})" if extra else ''))
+
+    totals = {}
+    for e in events:
+        count, total = totals.get(e['name'], (0, 0.0))
+        totals[e['name']] = (count + 1, total + e['dur'])
+    lines.append("Total time per span:")
+    for name, (count, total) in sorted(totals.items(), key=lambda kv: kv[1][1], reverse=True)[:top_n]:
+        lines.append(f"  {total / 1000:10.2f} ms  {name} x{count}")
+    return lines
+
+
+def _finish(top_n):
+    try:
+        count = write_trace(_output_path)
+    except OSError as e:
+        print(f"⚠ Failed to write trace: {e}", file=sys.stderr)
+        return
+    for line in summary_lines(top_n):
+        print(line, file=sys.stderr)
+    print(f"Trace with {count} spans written to {_output_path}", file=sys.stderr)
@@ -0,0 +1,303 @@
+#!/usr/bin/env python3
+"""
+UI Stall Watchdog
+---------------------------
+Finds out what froze a GUI. The Qt or Tk event loop sends a heartbeat
+every HEARTBEAT_MS; a background thread checks it. When the UI thread
+misses beats for longer than THRESHOLD seconds, the watchdog takes the
+main thread's Python stack (sys._current_frames()) and writes a stall
+record: duration, stack and the last thing the user clicked or typed
+into. Records go to a rotating JSON-lines log. The first record is
+written while the stall is still going on, so it survives a force-quit;
+a second one with the full duration follows when the UI recovers.
+
+Enable it with `--watchdog` on either GUI (or PORTFOLIO_WATCHDOG=path).
+When it is off, attach_qt()/attach_tk() do nothing.
+
+Usage:
+    python gui_app.py --watchdog            # Record stalls to logs/stalls.jsonl
+    python ui_watchdog.py                   # Worst offenders in the log
+    python ui_watchdog.py --top 5 --json    # Machine-readable summary
+"""
+
+import argparse
+import itertools
+import json
+import logging
+import logging.handlers
+import os
+import sys
+import threading
+import time
+from datetime import datetime
+
+import tracing
+from console import Colors
+
+WATCHDOG_ENV = 'PORTFOLIO_WATCHDOG'
+DEFAULT_LOG = os.path.join('logs', 'stalls.jsonl')
+THRESHOLD = 0.5
+HEARTBEAT_MS = 100
+LOG_MAX_BYTES = 1024 * 1024
+LOG_BACKUPS = 3
+STACK_DEPTH = 40
+TOP_N = 10
+
+CODE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+_watchdog = None
+
+
+# ========================================
+# WATCHDOG
+# ========================================
+
+def main_stack(thread_id):
+    """[file, line, function] frames of a thread's Python stack, innermost last"""
+    frame = sys._current_frames().get(thread_id)
+    stack = []
+    while frame is not None and len(stack) < STACK_DEPTH:
+        stack.append([frame.f_code.co_filename, frame.f_lineno, frame.f_code.co_name])
+        frame = frame.f_back
+    return stack[::-1]
+
+
+class Watchdog:
+    """Watches heartbeats from the UI thread and logs stack samples of stalls"""
+
+    def __init__(self, log_path=DEFAULT_LOG, threshold=THRESHOLD):
+        self.log_path = log_path
+        self.threshold = threshold
+        self.tool = os.path.basename(sys.argv[0]) if sys.argv and sys.argv[0] else 'python'
+        self.main_thread = threading.main_thread().ident
+        self.last_beat = time.monotonic()
+        # (description, monotonic time) of the latest click or key press
+        self.last_action = None
+        self._ids = itertools.count(1)
+        self._stop = threading.Event()
+
+        directory = os.path.dirname(log_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.logger = logging.getLogger(f'ui_watchdog.{id(self)}')
+        self.logger.propagate = False
+        self.logger.setLevel(logging.INFO)
+        handler = logging.handlers.RotatingFileHandler(log_path, maxBytes=LOG_MAX_BYTES,
+                                                       backupCount=LOG_BACKUPS, encoding='utf-8')
+        handler.setFormatter(logging.Formatter('%(message)s'))
+        self.logger.addHandler(handler)
+        self.thread = threading.Thread(target=self._run, name='ui-watchdog', daemon=True)
+
+    def start(self):
+        self.thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def beat(self):
+        """Called from the UI thread's event loop"""
+        self.last_beat = time.monotonic()
+
+    def action(self, description):
+        """Note what the user just did, for the next stall record"""
+        self.last_action = (description, time.monotonic())
+
+    def _record(self, stall_id, started, stack, ongoing):
+        action = None
+        if self.last_action:
+            description, at = self.last_action
+            action = {'what': description, 'secondsBefore': round(max(started - at, 0), 3)}
+        self.logger.info(json.dumps({
+            'id': f"{os.getpid()}-{stall_id}",
+            'time': datetime.now().isoformat(timespec='seconds'),
+            'tool': self.tool,
+            'duration': round(time.monotonic() - started, 3),
+            'ongoing': ongoing,
+            'action': action,
+            'stack': stack,
+        }))
+
+    def _run(self):
+        poll = self.threshold / 4
+        while not self._stop.wait(poll):
+            started = self.last_beat
+            if time.monotonic() - started < self.threshold:
+                continue
+            stall_id = next(self._ids)
+            stack = main_stack(self.main_thread)
+            self._record(stall_id, started, stack, ongoing=True)
+            while self.last_beat == started and not self._stop.wait(poll):
+                pass
+            self._record(stall_id, started, stack, ongoing=False)
+
+
+def is_enabled():
+    return _watchdog is not None
+
+
+def enable(log_path=DEFAULT_LOG, threshold=THRESHOLD):
+    """Start the watchdog thread; beats come from attach_qt() or attach_tk()"""
+    global _watchdog
+    if _watchdog is None:
+        _watchdog = Watchdog(log_path, threshold)
+        _watchdog.start()
+    return _watchdog
+
+
+def enable_from_argv(argv):
+    """Enable from a `--watchdog` argument (removed from argv) or the environment"""
+    if '--watchdog' in argv:
+        argv.remove('--watchdog')
+        enable(os.environ.get(WATCHDOG_ENV) or DEFAULT_LOG)
+    elif os.environ.get(WATCHDOG_ENV):
+        enable(os.environ[WATCHDOG_ENV])
+
+
+def attach_qt(app):
+    """Heartbeat from a QApplication's event loop and note clicks and key presses"""
+    if _watchdog is None:
+        return
+    from PyQt5.QtCore import QEvent, QObject, QTimer
+    from PyQt5.QtWidgets import QAbstractButton
+
+    class ActionFilter(QObject):
+        def eventFilter(self, obj, event):
+            if event.type() in (QEvent.MouseButtonPress, QEvent.KeyPress) and obj.isWidgetType():
+                # Button captions only; what was typed into fields stays out of the log
+                label = obj.text() if isinstance(obj, QAbstractButton) else ''
+                kind = 'click' if event.type() == QEvent.MouseButtonPress else 'key'
+                _watchdog.action(f"{kind} {type(obj).__name__} {obj.objectName() or label[:40]!r}".strip())
+            return False
+
+    timer = QTimer(app)
+    timer.timeout.connect(_watchdog.beat)
+    timer.start(HEARTBEAT_MS)
+    # Kept on the app so neither is garbage collected
+    app._watchdog_filter = ActionFilter(app)
+    app.installEventFilter(app._watchdog_filter)
+    app.aboutToQuit.connect(_watchdog.stop)
+
+
+def attach_tk(root):
+    """Heartbeat from a Tk root's event loop and note clicks and key presses"""
+    if _watchdog is None:
+        return
+    import tkinter as tk
+
+    def tick():
+        _watchdog.beat()
+        root.after(HEARTBEAT_MS, tick)
+
+    def note(kind):
+        def handler(event):
+            widget = event.widget
+            try:
+                label = str(widget.cget('text'))[:40]
+            except (AttributeError, tk.TclError):
+                label = ''
+            _watchdog.action(f"{kind} {type(widget).__name__} {label!r}")
+        return handler
+
+    root.bind_all('<ButtonPress>', note('click'), add='+')
+    root.bind_all('<KeyPress>', note('key'), add='+')
+    root.after(HEARTBEAT_MS, tick)
+
+
+# ========================================
+# SUMMARY
+# ========================================
+
+def read_log(log_path=DEFAULT_LOG):
+    """Stall records from the log and its rotated backups; one per stall, with its longest duration"""
+    stalls = {}
+    paths = [f"{log_path}.{n}" for n in range(LOG_BACKUPS, 0, -1)] + [log_path]
+    for path in paths:
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        continue
+                    known = stalls.get(record.get('id'))
+                    if known is None or record.get('duration', 0) >= known.get('duration', 0):
+                        stalls[record.get('id')] = record
+        except FileNotFoundError:
+            continue
+    return list(stalls.values())
+
+
+def culprit(stack):
+    """The innermost frame in this project's code, which is what to fix, as 'function (file:line)'"""
+    for filename, line, function in reversed(stack):
+        path = os.path.abspath(filename)
+        if path.startswith(CODE_DIR + os.sep) and 'site-packages' not in path:
+            return f"{function} ({os.path.relpath(filename, CODE_DIR)}:{line})"
+    if stack:
+        filename, line, function = stack[-1]
+        return f"{function} ({os.path.basename(filename)}:{line})"
+    return 'unknown'
+
+
+def summarize(stalls, top_n=TOP_N):
+    """Stalls grouped by culprit, worst total time first"""
+    groups = {}
+    for stall in stalls:
+        group = groups.setdefault(culprit(stall.get('stack', [])), {
+            'count': 0, 'totalSeconds': 0.0, 'worstSeconds': 0.0, 'unfinished': 0, 'actions': {}, 'stack': None})
+        duration = stall.get('duration', 0)
+        group['count'] += 1
+        group['totalSeconds'] += duration
+        if stall.get('ongoing'):
+            # The app was closed or killed before it recovered
+            group['unfinished'] += 1
+        if duration >= group['worstSeconds']:
+            group['worstSeconds'] = duration
+            group['stack'] = stall.get('stack')
+        what = (stall.get('action') or {}).get('what')
+        if what:
+            group['actions'][what] = group['actions'].get(what, 0) + 1
+    ranked = sorted(groups.items(), key=lambda kv: kv[1]['totalSeconds'], reverse=True)[:top_n]
+    return [dict(group, culprit=name, totalSeconds=round(group['totalSeconds'], 3),
+                 actions=sorted(group['actions'], key=group['actions'].get, reverse=True)[:3])
+            for name, group in ranked]
+
+
+def print_summary(summary, stalls):
+    total = sum(stall.get('duration', 0) for stall in stalls)
+    print(f"\n{Colors.BOLD}{len(stalls)} stalls, {total:.1f} s frozen in total{Colors.END}")
+    for group in summary:
+        color = Colors.RED if group['worstSeconds'] >= 5 else Colors.YELLOW
+        print(f"\n{color}{group['totalSeconds']:8.1f} s{Colors.END}  {Colors.BOLD}{group['culprit']}{Colors.END}"
+              f"  x{group['count']}, worst {group['worstSeconds']:.1f} s")
+        if group['unfinished']:
+            print(f"            {Colors.RED}{group['unfinished']} never recovered (force-quit?){Colors.END}")
+        if group['actions']:
+            print(f"            after: {', '.join(group['actions'])}")
+        for filename, line, function in (group['stack'] or [])[-4:]:
+            print(f"              {os.path.basename(filename)}:{line} {function}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Summarise the UI stalls recorded by the watchdog")
+    parser.add_argument('log', nargs='?', default=os.environ.get(WATCHDOG_ENV) or DEFAULT_LOG,
+                        help=f"Stall log (default: {DEFAULT_LOG})")
+    parser.add_argument('--top', type=int, default=TOP_N, help="Number of culprits to show")
+    parser.add_argument('--json', action='store_true', help="Print the summary as JSON")
+    args = parser.parse_args(argv)
+
+    stalls = read_log(args.log)
+    if not stalls:
+        print(f"{Colors.GREEN}✓ No stalls recorded in {args.log}{Colors.END}")
+        return 0
+    summary = summarize(stalls, args.top)
+    if args.json:
+        print(json.dumps(summary, indent=2))
+    else:
+        print_summary(summary, stalls)
+    return 0
+
+
+if __name__ == '__main__':
+    tracing.enable_from_argv(sys.argv)
+    sys.exit(main())
@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+Portfolio Workspace
+---------------------------
+Runs build, validation and media optimisation for many portfolios at
+once. A registry file lists the sites; every task runs in its own worker
+process, writes a per-site log and ends up in a summary table.
+
+Usage:
+    python workspace.py build                      # All sites in workspace.json
+    python workspace.py validate --sites a,b       # Only some sites
+    python workspace.py optimize --jobs 4          # Limit the process pool
+    python workspace.py all --registry clients.json
+
+Registry format (paths are relative to the registry file):
+    {
+      "logDir": "logs",
+      "sites": [
+        {"name": "amici", "dataFile": "data/portfolio-data.json",
+         "assetsDir": "assets", "outputDir": "dist/amici"}
+      ]
+    }
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+
+import build_site
+from console import Colors
+
+REGISTRY_FILE = 'workspace.json'
+TASKS = ['validate', 'build', 'optimize']
+
+
+def load_registry(path):
+    """Read the registry and resolve site paths against its directory"""
+    with open(path, 'r', encoding='utf-8') as f:
+        registry = json.load(f)
+    root = os.path.dirname(os.path.abspath(path))
+    sites = []
+    for entry in registry.get('sites', []):
+        sites.append({
+            'name': entry['name'],
+            'dataFile': os.path.join(root, entry.get('dataFile', 'data/portfolio-data.json')),
+            'assetsDir': os.path.join(root, entry.get('assetsDir', 'assets')),
+            'outputDir': os.path.join(root, entry.get('outputDir', os.path.join('dist', entry['name']))),
+        })
+    log_dir = os.path.join(root, registry.get('logDir', 'logs'))
+    return sites, log_dir
+
+
+def run_site(site, tasks, log_path):
+    """Worker entry point: run the tasks for one site and return its result row"""
+    os.makedirs(os.path.dirname(log_path), exist_ok=True)
+    result = {'name': site['name'], 'status': 'ok', 'timings': {}, 'problems': 0,
+              'outputBytes': 0, 'outputFiles': 0, 'log': log_path}
+
+    with open(log_path, 'a', encoding='utf-8') as log_file:
+        def log(message):
+            log_file.write(f"{datetime.now().isoformat(timespec='seconds')} {message}\n")
+            log_file.flush()
+
+        log(f"== {site['name']}: {', '.join(tasks)}")
+        for task in tasks:
+            started = time.perf_counter()
+            try:
+                if task == 'validate':
+                    result['problems'] = len(build_site.validate_site(site['dataFile'], site['assetsDir'], log))
+                    if result['problems']:
+                        result['status'] = 'invalid'
+                elif task == 'build':
+                    build_site.build_site(site['dataFile'], site['assetsDir'], site['outputDir'], log)
+                elif task == 'optimize':
+                    build_site.build_site(site['dataFile'], site['assetsDir'], site['outputDir'], log,
+                                          optimize=True)
+            except Exception as e:
+                log(f"{task} failed: {e!r}")
+                result['status'] = f'{task} failed'
+                result['timings'][task] = time.perf_counter() - started
+                break
+            result['timings'][task] = time.perf_counter() - started
+            log(f"{task} finished in {result['timings'][task]:.2f}s")
+
+    if os.path.isdir(site['outputDir']):
+        result['outputBytes'], result['outputFiles'] = build_site.directory_size(site['outputDir'])
+    return result
+
+
+def run_workspace(sites, tasks, log_dir, jobs=None):
+    """Run the tasks for all sites across a process pool; returns result rows in registry order"""
+    results = {}
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        futures = {
+            pool.submit(run_site, site, tasks, os.path.join(log_dir, f"{site['name']}.log")): site['name']
+            for site in sites
+        }
+        for future in as_completed(futures):
+            name = futures[future]
+            try:
+                results[name] = future.result()
+            except Exception as e:
+                results[name] = {'name': name, 'status': f'crashed: {e!r}', 'timings': {},
+                                 'problems': 0, 'outputBytes': 0, 'outputFiles': 0, 'log': ''}
+            row = results[name]
+            color = Colors.GREEN if row['status'] == 'ok' else Colors.RED
+            print(f"{color}{'✓' if row['status'] == 'ok' else '✗'} {name}: {row['status']}{Colors.END}")
+    return [results[site['name']] for site in sites]
+
+
+def print_summary(results, tasks):
+    """Print a table of per-task timings and output sizes"""
+    headers = ['Site', 'Status'] + [t.capitalize() for t in tasks] + ['Files', 'Size (MB)']
+    rows = []
+    for r in results:
+        rows.append([r['name'], r['status']]
+                    + [f"{r['timings'][t]:.2f}s" if t in r['timings'] else '-' for t in tasks]
+                    + [str(r['outputFiles']), f"{r['outputBytes'] / 1_048_576:.2f}"])
+    widths = [max(len(h), *(len(row[i]) for row in rows)) if rows else len(h) for i, h in enumerate(headers)]
+
+    print(f"\n{Colors.BOLD}" + '  '.join(h.ljust(w) for h, w in zip(headers, widths)) + Colors.END)
+    for row in rows:
+        print('  '.join(cell.ljust(w) for cell, w in zip(row, widths)))
+    total = sum(r['outputBytes'] for r in results)
+    print(f"\n{len(results)} site(s), {total / 1_048_576:.2f} MB total output")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build, validate and optimise many portfolio sites in parallel")
+    parser.add_argument('command', choices=TASKS + ['all'])
+    parser.add_argument('--registry', default=REGISTRY_FILE, help="Workspace registry file")
+    parser.add_argument('--sites', help="Comma-separated site names (default: all)")
+    parser.add_argument('--jobs', type=int, default=None, help="Worker processes (default: CPU count)")
+    args = parser.parse_args(argv)
+
+    sites, log_dir = load_registry(args.registry)
+    if args.sites:
+        wanted = set(args.sites.split(','))
+        unknown = wanted - {s['name'] for s in sites}
+        if unknown:
+            parser.error(f"Unknown site(s): {', '.join(sorted(unknown))}")
+        sites = [s for s in sites if s['name'] in wanted]
+
+    tasks = TASKS if args.command == 'all' else [args.command]
+    results = run_workspace(sites, tasks, log_dir, args.jobs)
+    print_summary(results, tasks)
+    return 0 if all(r['status'] == 'ok' for r in results) else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())